@@ -0,0 +1,111 @@
+"""
+Seeded synthetic task graphs
+
+Every generator returns the tasks as dicts in the input JSON format,
+listed in topological order, and is deterministic for a given seed
+"""
+
+from collections.abc import Callable
+import numpy as np
+
+
+def _tasks(rng: np.random.Generator, predecessors: list[list[int]]) -> list[dict]:
+    n = len(predecessors)
+    optimistic = np.round(rng.uniform(1, 10, n), 2)
+    most_likely = np.round(optimistic + rng.uniform(0, 5, n), 2)
+    pessimistic = np.round(most_likely + rng.uniform(0, 10, n), 2)
+    return [
+        {
+            "label": f"T{i}",
+            "name": f"Task {i}",
+            "optimistic_estimate": o,
+            "most_likely_estimate": m,
+            "pessimistic_estimate": p,
+            "predecessors": [f"T{j}" for j in preds],
+        }
+        for i, (o, m, p, preds) in enumerate(
+            zip(
+                optimistic.tolist(),
+                most_likely.tolist(),
+                pessimistic.tolist(),
+                predecessors,
+            )
+        )
+    ]
+
+
+def chain(n: int, seed: int = 0) -> list[dict]:
+    """
+    T0 -> T1 -> ... -> Tn-1, the deepest possible graph
+    """
+    rng = np.random.default_rng(seed)
+    return _tasks(rng, [[]] + [[i - 1] for i in range(1, n)])
+
+
+def fan(n: int, seed: int = 0) -> list[dict]:
+    """
+    One source fanning out to n - 2 tasks that all join in one sink
+    """
+    rng = np.random.default_rng(seed)
+    if n < 3:
+        return chain(n, seed)
+    middle = list(range(1, n - 1))
+    return _tasks(rng, [[]] + [[0] for _ in middle] + [middle])
+
+
+def layered(n: int, seed: int = 0, max_fan_in: int = 3) -> list[dict]:
+    """
+    Random layers of about sqrt(n) tasks, every task depends on 1 to
+    max_fan_in random tasks of the previous layer
+    """
+    rng = np.random.default_rng(seed)
+    width = max(1, int(n**0.5))
+    predecessors: list[list[int]] = []
+    previous: range = range(0)
+    start = 0
+    while start < n:
+        size = min(n - start, int(rng.integers(max(1, width // 2), width + 1)))
+        for _ in range(size):
+            if len(previous) == 0:
+                predecessors.append([])
+                continue
+            k = int(rng.integers(1, min(max_fan_in, len(previous)) + 1))
+            picks = rng.choice(len(previous), size=k, replace=False)
+            predecessors.append(sorted(previous.start + int(j) for j in picks))
+        previous = range(start, start + size)
+        start += size
+    return _tasks(rng, predecessors)
+
+
+def series_parallel(
+    n: int, seed: int = 0, max_branches: int = 6, max_branch_length: int = 5
+) -> list[dict]:
+    """
+    A series composition of parallel blocks, each block is 1 to
+    max_branches chains of 1 to max_branch_length tasks. Every chain of a
+    block starts after all chain ends of the block before it
+    """
+    rng = np.random.default_rng(seed)
+    predecessors: list[list[int]] = []
+    previous_ends: list[int] = []
+    while len(predecessors) < n:
+        ends = []
+        for _ in range(int(rng.integers(1, max_branches + 1))):
+            length = int(rng.integers(1, max_branch_length + 1))
+            length = min(length, n - len(predecessors))
+            if length == 0:
+                break
+            predecessors.append(list(previous_ends))
+            for _ in range(length - 1):
+                predecessors.append([len(predecessors) - 1])
+            ends.append(len(predecessors) - 1)
+        previous_ends = ends
+    return _tasks(rng, predecessors)
+
+
+GENERATORS: dict[str, Callable[[int, int], list[dict]]] = {
+    "chain": chain,
+    "fan": fan,
+    "layered": layered,
+    "series_parallel": series_parallel,
+}
@@ -0,0 +1,75 @@
+"""
+Startup cost of the CLI calculate path
+
+Imports the modules `main.py calculate` needs in a fresh interpreter and
+fails when one of the heavy optional dependencies gets imported with them
+or the import takes longer than --max-seconds
+
+    python -m benchmarks.import_time
+"""
+
+import sys
+import json
+import subprocess
+import click
+
+# what a plain `calculate` without table or graph has to import
+CALCULATE_IMPORTS = ("main", "pert_model_cal.interface.cli.cli_handler")
+# only loaded on the code path that uses them
+LAZY_MODULES = (
+    "scipy",
+    "pandas",
+    "matplotlib",
+    "networkx",
+    "openpyxl",
+    "fastapi",
+    "uvicorn",
+)
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": sorted(m for m in {lazy!r} if m in sys.modules),
+}}))
+"""
+
+
+def probe(runs: int) -> tuple[float, list[str]]:
+    """
+    Return the fastest of `runs` cold imports and the lazy modules loaded
+    """
+    imports = "\n".join(f"import {module}" for module in CALCULATE_IMPORTS)
+    code = PROBE.format(imports=imports, lazy=LAZY_MODULES)
+    best, loaded = float("inf"), []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        report = json.loads(output.stdout)
+        best = min(best, report["seconds"])
+        loaded = report["loaded"]
+    return best, loaded
+
+
+@click.command()
+@click.option("--runs", default=5, help="Number of fresh interpreters")
+@click.option("--max-seconds", default=1.0, help="Fail above this import time")
+def main(runs: int, max_seconds: float):
+    seconds, loaded = probe(runs)
+    click.echo(f"calculate imports: {seconds * 1000:.0f} ms (best of {runs})")
+    failed = False
+    if loaded:
+        click.echo(f"eagerly imported: {', '.join(loaded)}", err=True)
+        failed = True
+    if seconds > max_seconds:
+        click.echo(f"slower than {max_seconds:g} s", err=True)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
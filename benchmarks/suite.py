@@ -0,0 +1,226 @@
+"""
+Phase-by-phase benchmark of the PERT pipeline on synthetic graphs
+
+    python -m benchmarks.suite run --sizes 100,10000,1000000 -o current.json
+    python -m benchmarks.suite compare baseline.json current.json
+
+Every case runs in a fresh process, so peak RSS is per case
+
+reference/deep_200k.json holds the deepest shapes, chain and
+series_parallel at 200k tasks, which bound the per-level overhead of the
+CPM engine; rerun them after engine changes with
+
+    python -m benchmarks.suite run --shapes chain,series_parallel \
+        --sizes 200000 --repeat 1 --legacy-max 0 -o current.json
+    python -m benchmarks.suite compare benchmarks/reference/deep_200k.json current.json
+"""
+
+import sys
+import json
+import time
+import platform
+import resource
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import click
+import numpy as np
+import orjson
+from .generators import GENERATORS
+
+PHASES = (
+    "parse",  # JSON file -> TaskTable
+    "init",  # TaskList init, estimates and CPM engine
+    "forward",
+    "backward",
+    "slack",  # slack and critical flags
+    "critical_path",  # expected time, probability and critical path
+    "graph",  # layered layout
+    "legacy_graph",  # PERT._graph, only up to --legacy-max tasks
+    "result",  # PERTResult.lazy over a TaskColumns snapshot, as calculate_pert
+    "table",  # IOUtils.generate_table, csv
+    "svg",  # IOUtils.generate_graph_svg, streaming renderer
+)
+
+
+def run_case(shape: str, size: int, seed: int, repeat: int, legacy_max: int) -> dict:
+    """
+    Time every phase `repeat` times and keep the fastest run of each
+    """
+    from pert_model_cal.core.layout import layered_layout
+    from pert_model_cal.core.model.output import PERTResult, TaskColumns
+    from pert_model_cal.core.pert_calculator import PERT
+    from pert_model_cal.interface.functions import IOUtils
+
+    best = dict.fromkeys(PHASES, float("inf"))
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        json_path = work_dir / "tasks.json"
+        json_path.write_bytes(orjson.dumps(GENERATORS[shape](size, seed)))
+
+        for _ in range(repeat):
+            timings: dict[str, float] = {}
+
+            def timed(phase: str, fn, *args, **kwargs):
+                start = time.perf_counter()
+                value = fn(*args, **kwargs)
+                timings[phase] = time.perf_counter() - start
+                return value
+
+            table = timed("parse", IOUtils.load_tasks_from_json, json_path)
+            pert = timed("init", PERT, table)
+            timed("forward", pert._earliest_time)
+            timed("backward", pert._latest_time)
+
+            def slack():
+                pert._slack_time()
+                pert._critical()
+
+            def critical_path():
+                pert._expected_time()
+                pert._probability(time=pert.expected_time)
+                pert._critical_path()
+
+            timed("slack", slack)
+            timed("critical_path", critical_path)
+            graph_data = timed("graph", layered_layout, pert.table, pert.engine)
+            if size <= legacy_max:
+                timed("legacy_graph", pert._graph)
+            # the task rows are built by the exporters that stream them
+            result = timed(
+                "result",
+                lambda: PERTResult.lazy(
+                    critical_path=pert.critical_path,
+                    expected_duration=pert.expected_time,
+                    expected_probability=pert.expected_probability,
+                    columns=TaskColumns.from_table(pert.table),
+                    graph_data=graph_data,
+                ),
+            )
+            timed("table", IOUtils.generate_table, result, ["csv"], work_dir)
+            timed("svg", IOUtils.generate_graph_svg, result, work_dir)
+
+            for phase, seconds in timings.items():
+                best[phase] = min(best[phase], seconds)
+
+    phases = {phase: s for phase, s in best.items() if s != float("inf")}
+    return {
+        "shape": shape,
+        "size": size,
+        "edges": int(table.graph.edge_count),
+        "phases": phases,
+        "total": sum(phases.values()),
+        # kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+@click.group()
+def cli():
+    """PERT benchmark suite"""
+    pass
+
+
+@cli.command("run")
+@click.option(
+    "--shapes",
+    default=",".join(GENERATORS),
+    help=f"Comma-separated graph shapes: {', '.join(GENERATORS)}",
+)
+@click.option(
+    "--sizes", default="100,1000,10000,100000", help="Comma-separated task counts"
+)
+@click.option("--seed", default=0, help="Seed of the graph generators")
+@click.option("--repeat", default=3, help="Runs per case, the fastest is kept")
+@click.option("--legacy-max", default=10000, help="Largest size timed with PERT._graph")
+@click.option(
+    "-o", "--output", type=click.Path(dir_okay=False), help="Write results as JSON"
+)
+def run(shapes, sizes, seed, repeat, legacy_max, output):
+    shape_list = shapes.split(",")
+    for shape in shape_list:
+        if shape not in GENERATORS:
+            raise click.BadParameter(f"Unknown shape '{shape}'", param_hint="--shapes")
+    size_list = [int(size) for size in sizes.split(",")]
+
+    results = []
+    # spawn: a clean interpreter per case, nothing inherited in RSS
+    context = multiprocessing.get_context("spawn")
+    for shape in shape_list:
+        for size in size_list:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                case = executor.submit(
+                    run_case, shape, size, seed, repeat, legacy_max
+                ).result()
+            results.append(case)
+            click.echo(
+                f"{shape:>16} {size:>9}  {case['total'] * 1000:10.1f} ms  "
+                f"{case['peak_rss_mb']:8.1f} MB  "
+                + " ".join(f"{p}={s * 1000:.1f}" for p, s in case["phases"].items())
+            )
+
+    report = {
+        "meta": {
+            "created_at": time.time(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+@cli.command("compare")
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("current", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threshold", default=0.2, help="Relative slowdown counted as a regression"
+)
+@click.option(
+    "--min-seconds",
+    default=0.005,
+    help="Ignore phases faster than this in both runs, they are mostly noise",
+)
+def compare(baseline, current, threshold, min_seconds):
+    """
+    Exit with status 1 if a phase of CURRENT regressed against BASELINE
+    """
+    with open(baseline) as f:
+        base = {(r["shape"], r["size"]): r for r in json.load(f)["results"]}
+    with open(current) as f:
+        cases = json.load(f)["results"]
+
+    regressions = 0
+    for case in cases:
+        old = base.get((case["shape"], case["size"]))
+        if old is None:
+            continue
+        metrics = [(p, old["phases"].get(p), s) for p, s in case["phases"].items()]
+        metrics.append(("peak_rss_mb", old["peak_rss_mb"], case["peak_rss_mb"]))
+        for metric, before, after in metrics:
+            if before is None:
+                continue
+            if metric != "peak_rss_mb" and max(before, after) < min_seconds:
+                continue
+            change = (after - before) / before if before else 0.0
+            flag = change > threshold
+            regressions += flag
+            if flag or abs(change) > threshold:
+                click.echo(
+                    f"{'REGRESSION' if flag else 'improved':>10} "
+                    f"{case['shape']:>16} {case['size']:>9} {metric:>14}: "
+                    f"{before:.4g} -> {after:.4g} ({change:+.0%})"
+                )
+
+    click.echo(f"{regressions} regression(s) above {threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,60 @@
+"""
+Memory per task of the columnar TaskTable compared with a list of Task objects
+
+    python -m benchmarks.task_table_memory --tasks 500000
+"""
+
+import gc
+import tracemalloc
+import click
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.model.task_data import Task, TaskTable
+
+
+def make_task_inputs(n: int, fan_in: int = 2) -> list[TaskInput]:
+    return [
+        TaskInput(
+            label=f"T{i}",
+            name=f"Task {i}",
+            optimistic_estimate=1.0 + i % 5,
+            most_likely_estimate=2.0 + i % 7,
+            pessimistic_estimate=4.0 + i % 11,
+            predecessors=[f"T{j}" for j in range(max(0, i - fan_in), i)],
+        )
+        for i in range(n)
+    ]
+
+
+def measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+@click.command()
+@click.option("--tasks", "n", default=100000, help="Number of tasks")
+@click.option("--fan-in", default=2, help="Predecessors per task")
+def main(n: int, fan_in: int):
+    # the task objects as InputParser used to keep them, TaskInput included
+    tasks, task_bytes = measure(
+        lambda: [Task(task_input) for task_input in make_task_inputs(n, fan_in)]
+    )
+    del tasks
+
+    # the TaskInput batches are dropped once the table is built
+    table, table_bytes = measure(
+        lambda: TaskTable.from_task_inputs([make_task_inputs(n, fan_in)])
+    )
+    assert isinstance(table, TaskTable)
+
+    click.echo(f"tasks: {n}, predecessors per task: {fan_in}")
+    click.echo(f"list[Task]: {task_bytes / n:8.1f} bytes/task")
+    click.echo(f"TaskTable:  {table_bytes / n:8.1f} bytes/task")
+    click.echo(f"  arrays:   {table.nbytes() / n:8.1f} bytes/task")
+
+
+if __name__ == "__main__":
+    main()
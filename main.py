@@ -1,9 +1,7 @@
 import click
-import uvicorn
+from contextlib import nullcontext
 from rich.console import Console
 from rich.table import Table
-from pert_model_cal.interface.cli.cli_handler import CLIHandler
-from pert_model_cal.server import app
 
 
 @click.group()
@@ -13,7 +11,7 @@ def cli():
 
 
 @click.command("calculate")
-@click.argument("json_path", type=click.Path(exists=True))
+@click.argument("json_paths", nargs=-1, required=True)
 @click.option("--save-graph", is_flag=True, default=False, help="Show the PERT diagram")
 @click.option(
     "--show-table", is_flag=True, default=False, help="Show the task table and summary"
@@ -21,7 +19,16 @@ def cli():
 @click.option(
     "--table-format",
     type=click.STRING,
-    help="Output format of the table (comma-separated list of formats, e.g., 'csv,excel')",
+    help=(
+        "Output format of the table (comma-separated list of csv, excel, "
+        "parquet, arrow, e.g., 'csv,parquet')"
+    ),
+)
+@click.option(
+    "--max-rows",
+    type=int,
+    default=40,
+    help="Rows of the task table shown by --show-table, the rest is elided",
 )
 @click.option(
     "--probability",
@@ -29,10 +36,102 @@ def cli():
     default=None,
     help="Calculate the probability of finishing tasks less than the expected time",
 )
-def calculate(json_path, save_graph, show_table, table_format, probability):
+@click.option(
+    "--layout",
+    type=click.Choice(["layered", "legacy"]),
+    default="layered",
+    help="Layout of the PERT diagram",
+)
+@click.option(
+    "--renderer",
+    type=click.Choice(["svg", "matplotlib"]),
+    default="svg",
+    help="Renderer of the PERT diagram",
+)
+@click.option(
+    "--capacity",
+    "capacities",
+    multiple=True,
+    help=(
+        "Units of a resource available at any time, as NAME=UNITS, repeat for "
+        "every resource; makes a resource-constrained schedule"
+    ),
+)
+@click.option(
+    "--priority",
+    type=click.Choice(["latest_start", "latest_finish", "slack", "earliest_start"]),
+    default="latest_start",
+    help="Order in which the resource-constrained schedule starts tasks",
+)
+@click.option(
+    "--components",
+    "show_components",
+    is_flag=True,
+    default=False,
+    help="Show the duration and critical path of every independent sub-network",
+)
+@click.option(
+    "--slack-tolerance",
+    type=click.FloatRange(min=0),
+    default=0,
+    help="Tasks with at most this much slack count as critical",
+)
+@click.option(
+    "--paths",
+    "k_paths",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Show the K longest paths with their durations and variances",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Processes calculating the files of a batch, the CPU count by default",
+)
+@click.option(
+    "--profile",
+    "profile_phases",
+    is_flag=True,
+    default=False,
+    help="Print the time and memory of every phase (memory tracing slows it down)",
+)
+def calculate(
+    json_paths,
+    save_graph,
+    show_table,
+    table_format,
+    probability,
+    layout,
+    renderer,
+    profile_phases,
+    max_rows,
+    capacities,
+    priority,
+    show_components,
+    slack_tolerance,
+    k_paths,
+    workers,
+):
     """
     CLI to handle PERT calculations.
+
+    JSON_PATHS are task files, directories of them or glob patterns. More
+    than one file is a batch: the files are calculated in parallel and every
+    file gets a result directory of its own.
     """
+    from pert_model_cal.interface.cli.batch import is_batch, expand_paths
+
+    batch = is_batch(list(json_paths))
+    try:
+        paths = expand_paths(json_paths)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="JSON_PATHS")
+    if batch and (profile_phases or show_components or k_paths):
+        raise click.UsageError(
+            "--profile, --components and --paths work with one file only"
+        )
+
     console = Console()
     config_table = Table(
         title="Configuration", show_header=True, header_style="bold cyan"
@@ -40,41 +139,275 @@ def calculate(json_path, save_graph, show_table, table_format, probability):
     config_table.add_column("Option", justify="right", style="cyan", no_wrap=True)
     config_table.add_column("Value", justify="left", style="magenta")
 
-    config_table.add_row("Processing File", json_path)
+    if batch:
+        config_table.add_row("Processing Files", str(len(paths)))
+    else:
+        config_table.add_row("Processing File", json_paths[0])
     config_table.add_row("Save Graph", str(save_graph))
     config_table.add_row("Show Table", str(show_table))
     config_table.add_row("Table Format", table_format)
     if probability:
         config_table.add_row("Probability less than", str(probability))
+    capacity_map = {}
+    for capacity in capacities:
+        name, _, units = capacity.partition("=")
+        try:
+            capacity_map[name] = float(units)
+        except ValueError:
+            raise click.BadParameter(
+                f"'{capacity}' is not NAME=UNITS", param_hint="--capacity"
+            )
+    if capacity_map:
+        config_table.add_row("Capacities", ", ".join(capacities))
+        config_table.add_row("Priority", priority)
+    if slack_tolerance:
+        config_table.add_row("Slack Tolerance", str(slack_tolerance))
 
     console.print(config_table)
+    from pert_model_cal.core.profiling import profile
+    from pert_model_cal.interface.cli.cli_handler import CLIHandler
+
     table_formats = table_format.split(",") if table_format else ["csv"]
 
-    CLIHandler.init(
-        json_path=json_path,
-        save_graph=save_graph,
-        show_table=show_table,
-        table_format=table_formats,
+    if batch:
+        import os
+        from pert_model_cal.interface.cli.batch import BatchOptions, run_batch
+        from pert_model_cal.interface.functions import IOUtils
+
+        options = BatchOptions(
+            probability=probability,
+            layout=layout,
+            renderer=renderer,
+            save_graph=save_graph,
+            write_tables=show_table,
+            table_format=table_formats,
+            capacities=capacity_map or None,
+            priority=priority,
+            slack_tolerance=slack_tolerance,
+        )
+
+        finished = 0
+
+        def progress(row: dict):
+            nonlocal finished
+            finished += 1
+            status = "done" if row["status"] == "done" else "[red]failed[/red]"
+            console.print(f"{finished}/{len(paths)} {status} {row['file']}")
+
+        rows = run_batch(
+            paths,
+            IOUtils.create_dir("result"),
+            options,
+            workers=workers or os.cpu_count() or 1,
+            on_done=progress,
+        )
+        CLIHandler.print_batch_summary(rows, max_rows=max_rows)
+        failed = sum(row["status"] != "done" for row in rows)
+        if failed:
+            raise click.ClickException(f"{failed} of {len(rows)} file(s) failed")
+        return
+
+    with profile(trace_memory=True) if profile_phases else nullcontext() as profiler:
+        try:
+            handler = CLIHandler(
+                json_path=paths[0],
+                save_graph=save_graph,
+                show_table=show_table,
+                table_format=table_formats,
+                slack_tolerance=slack_tolerance,
+            )
+            handler.calculate_pert(
+                time=probability,
+                layout=layout,
+                capacities=capacity_map or None,
+                priority=priority,
+                components=show_components,
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        if show_components:
+            handler.print_components(max_rows=max_rows)
+
+        if k_paths:
+            handler.print_paths(k_paths)
+
+        if show_table:
+            console.print("Generating Table...")
+            handler.generate_table(max_rows=max_rows)
+
+        if save_graph:
+            console.print("Generating Graph...")
+            handler.generate_graph_svg(renderer=renderer)
+
+    if profiler is not None:
+        CLIHandler.print_profile(profiler)
+
+
+@click.command("sensitivity")
+@click.argument("json_path", type=click.Path(exists=True))
+@click.option(
+    "--field",
+    type=click.Choice(["optimistic", "most_likely", "pessimistic", "all"]),
+    default="pessimistic",
+    help="Estimate that is scaled, 'all' scales all three",
+)
+@click.option(
+    "--factor",
+    "factors",
+    type=float,
+    multiple=True,
+    default=(1.2,),
+    help="Scaling factor, repeat for a low and high bar, e.g. --factor 0.8 --factor 1.2",
+)
+@click.option(
+    "--scenarios",
+    type=click.Path(exists=True, dir_okay=False),
+    help='JSON file of named scenarios, {"name": {"label": factor, ...}, ...}',
+)
+@click.option("--top", type=int, default=20, help="Number of tasks shown")
+def sensitivity(json_path, field, factors, scenarios, top):
+    """
+    Rank tasks by how much scaling their estimate moves the project end.
+    """
+    import orjson
+    from pert_model_cal.interface.cli.cli_handler import CLIHandler
+
+    scenario_map = None
+    if scenarios:
+        with open(scenarios, "rb") as f:
+            scenario_map = orjson.loads(f.read())
+
+    try:
+        handler = CLIHandler(json_path=json_path, save_graph=False, show_table=False)
+        handler.calculate_pert(time=None)
+        handler.sensitivity(
+            field=field, factors=list(factors), scenarios=scenario_map, top=top
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+@click.command("validate")
+@click.argument("json_path", type=click.Path(exists=True))
+@click.option("--max-errors", type=int, default=20, help="Number of errors listed")
+def validate(json_path, max_errors):
+    """
+    Check a task file for duplicate labels, unknown predecessors and cycles.
+    """
+    import json
+    from pydantic import ValidationError
+    from pert_model_cal.core.input_parser import InputParser
+    from pert_model_cal.core.validation import validate_inputs
+    from pert_model_cal.interface.cli.cli_handler import CLIHandler
+
+    try:
+        report = validate_inputs(InputParser.iter_task_batches(json_path))
+    except (ValidationError, json.JSONDecodeError) as e:
+        raise click.ClickException(f"Invalid JSON file: {e}")
+
+    CLIHandler.print_validation(report, max_errors=max_errors)
+    if not report.ok:
+        raise click.ClickException(f"{json_path} is not a valid task graph")
+
+
+@click.command("compile")
+@click.argument("json_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False),
+    help="Plan file to write, JSON_PATH with a .plan extension by default",
+)
+def compile_plan(json_path, output):
+    """
+    Compile a task file into a memory-mappable plan for fast loading.
+    """
+    from pathlib import Path
+    from pert_model_cal.core.cpm_engine import find_cycles
+    from pert_model_cal.core.plan_file import EXTENSION, source_stamp, write_plan
+    from pert_model_cal.core.validation import ValidationReport, cycle_labels
+    from pert_model_cal.interface.functions import IOUtils
+
+    json_path = Path(json_path)
+    output = Path(output) if output else json_path.with_suffix(EXTENSION)
+    try:
+        table = IOUtils.load_tasks_from_json(json_path)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    cycles = find_cycles(table.graph)
+    if cycles:
+        report = ValidationReport(
+            tasks=len(table),
+            edges=table.graph.edge_count,
+            cycles=cycle_labels(table.labels, cycles),
+        )
+        raise click.ClickException(report.message())
+    write_plan(table, output, source=source_stamp(json_path))
+    Console().print(
+        f"Compiled {len(table)} tasks and {table.graph.edge_count} edges to {output}"
     )
-    CLIHandler.calculate_pert(time=probability)
 
-    if show_table:
-        console.print("Generating Table...")
-        CLIHandler.generate_table()
 
-    if save_graph:
-        console.print("Generating Graph...")
-        CLIHandler.generate_graph_svg()
+@click.command("inspect")
+@click.argument("plan_path", type=click.Path(exists=True, dir_okay=False))
+def inspect_plan(plan_path):
+    """
+    Show the header and arrays of a compiled plan.
+    """
+    from pathlib import Path
+    from pert_model_cal.core.plan_file import plan_header
+    from pert_model_cal.interface.cli.cli_handler import CLIHandler
+
+    try:
+        header = plan_header(Path(plan_path))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    CLIHandler.print_plan(Path(plan_path), header)
 
 
 @click.command("start-server")
 @click.option("--host", default="127.0.0.1", help="Host to run server on")
 @click.option("--port", default=8080, help="Port to run server on")
-def start_server(host, port):
+@click.option("--workers", default=2, help="Number of processes running calculations")
+@click.option(
+    "--queue-depth",
+    default=32,
+    help="Maximum number of calculations queued or running at once",
+)
+@click.option(
+    "--cache-memory-entries",
+    type=click.IntRange(min=0),
+    default=256,
+    help="Cached results kept in memory",
+)
+@click.option(
+    "--cache-disk-entries",
+    type=click.IntRange(min=0),
+    default=1024,
+    help="Cached results kept on disk under cache/results, least recently used "
+    "are evicted first",
+)
+def start_server(
+    host, port, workers, queue_depth, cache_memory_entries, cache_disk_entries
+):
+    import uvicorn
+    from pert_model_cal.server import app, configure
+
+    configure(
+        workers=workers,
+        queue_depth=queue_depth,
+        cache_memory_entries=cache_memory_entries,
+        cache_disk_entries=cache_disk_entries,
+    )
     uvicorn.run(app, host=host, port=port)
 
 
 if __name__ == "__main__":
     cli.add_command(calculate)
+    cli.add_command(sensitivity)
+    cli.add_command(validate)
+    cli.add_command(compile_plan)
+    cli.add_command(inspect_plan)
     cli.add_command(start_server)
     cli()
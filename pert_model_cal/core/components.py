@@ -0,0 +1,86 @@
+"""
+Independent sub-networks of one plan
+
+Portfolio files hold many sub-projects without dependencies between them.
+Their tasks are split into weakly connected components and every
+component is scheduled against its own end instead of the end of the
+whole plan: earliest times do not depend on the end, so the forward pass
+is shared, and one backward pass with a per-task project end gives every
+component its latest times, slack and critical path at once. The
+level-by-level passes already advance all components together, so the
+cost is that of a single plan of the same size
+"""
+
+import math
+import numpy as np
+from .cpm_engine import SLACK_TOLERANCE, CPMEngine, CSRGraph
+from .model.task_data import TaskTable
+from .model.output import ComponentResult, TaskColumns
+
+
+def weak_components(graph: CSRGraph) -> tuple[int, np.ndarray]:
+    """
+    Return the number of components and the component of every task,
+    components are numbered in input order of their first task
+    """
+    n = graph.n
+    if graph.edge_count == 0:
+        return n, np.arange(n, dtype=np.int64)
+
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    matrix = csr_matrix(
+        (
+            np.ones(graph.succ_index.size, dtype=np.int8),
+            graph.succ_index,
+            graph.succ_offsets,
+        ),
+        shape=(n, n),
+    )
+    count, component = connected_components(matrix, directed=True, connection="weak")
+    _, first = np.unique(component, return_index=True)
+    rank = np.empty(count, dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(count, dtype=np.int64)
+    return int(count), rank[component]
+
+
+def split_components(
+    engine: CPMEngine,
+    schedule: TaskTable | TaskColumns,
+    slack_tolerance: float = 0,
+) -> list[ComponentResult]:
+    """
+    schedule: a calculated TaskTable or a TaskColumns snapshot of one
+    slack_tolerance: see PERT, measured against the end of each component
+    Return the result of every component, in input order of its first task
+    """
+    count, component = weak_components(engine.graph)
+    end = np.zeros(count, dtype=np.float64)
+    np.maximum.at(end, component, schedule.earliest_finish)
+    latest_start, _ = engine.backward(schedule.estimate, end[component])
+    critical = latest_start - schedule.earliest_start <= (
+        slack_tolerance + SLACK_TOLERANCE * np.maximum(end[component], 1.0)
+    )
+
+    tasks = np.bincount(component, minlength=count)
+    variance = np.bincount(
+        component[critical], weights=schedule.variance[critical], minlength=count
+    )
+    # critical tasks grouped by component, in input order within each
+    ids = np.flatnonzero(critical)
+    ids = ids[np.argsort(component[ids], kind="stable")]
+    bounds = np.searchsorted(component[ids], np.arange(count + 1)).tolist()
+    labels = schedule.labels
+    ids = ids.tolist()
+    return [
+        ComponentResult.model_construct(
+            tasks=task_count,
+            expected_duration=duration,
+            std_duration=math.sqrt(spread),
+            critical_path=[labels[i] for i in ids[bounds[c] : bounds[c + 1]]],
+        )
+        for c, (task_count, duration, spread) in enumerate(
+            zip(tasks.tolist(), end.tolist(), variance.tolist())
+        )
+    ]
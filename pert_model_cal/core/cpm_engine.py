@@ -0,0 +1,667 @@
+"""
+Array-backed critical path engine
+
+Tasks are addressed by integer ids (their position in the input), the
+dependency graph is kept as CSR-style offset/index arrays and the forward and
+backward passes run over NumPy float arrays. A topological level with at
+least SCALAR_WIDTH tasks is one vectorized step; runs of narrower levels,
+where the fixed cost of the NumPy calls would dominate, are walked task by
+task over plain Python lists. The work is O(V + E) either way and the
+number of NumPy calls is bounded by the number of wide levels, so neither
+long chains nor wide plans pay per-level overhead.
+
+Both passes accept a duration array of shape (n,) or (n, samples), which lets
+Monte Carlo and what-if sweeps share the same code path.
+"""
+
+import heapq
+from dataclasses import dataclass
+import numpy as np
+
+# levels with fewer tasks are processed task by task instead of vectorized
+SCALAR_WIDTH = 64
+# slack below which a task counts as critical, relative to the project end,
+# absorbs the rounding of the (o + 4m + p) / 6 estimates along a path
+SLACK_TOLERANCE = 1e-9
+# share of the tasks CPMEngine.updated walks one by one before a full
+# topological sort is cheaper
+LOCAL_UPDATE_SHARE = 1 / 32
+
+
+@dataclass
+class CSRGraph:
+    """
+    Compressed sparse row adjacency of a task DAG
+    predecessors of task i: pred_index[pred_offsets[i]:pred_offsets[i + 1]]
+    successors of task i: succ_index[succ_offsets[i]:succ_offsets[i + 1]]
+    """
+
+    n: int
+    pred_offsets: np.ndarray
+    pred_index: np.ndarray
+    succ_offsets: np.ndarray
+    succ_index: np.ndarray
+
+    @classmethod
+    def from_edges(cls, n: int, src, dst) -> "CSRGraph":
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+
+        pred_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=pred_offsets[1:])
+        pred_index = src[np.argsort(dst, kind="stable")]
+
+        succ_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=succ_offsets[1:])
+        succ_index = dst[np.argsort(src, kind="stable")]
+
+        return cls(
+            n=n,
+            pred_offsets=pred_offsets,
+            pred_index=pred_index,
+            succ_offsets=succ_offsets,
+            succ_index=succ_index,
+        )
+
+    @classmethod
+    def from_labels(
+        cls, labels: list[str], predecessors: list[list[str] | None]
+    ) -> "CSRGraph":
+        index = {label: i for i, label in enumerate(labels)}
+        src: list[int] = []
+        dst: list[int] = []
+        for i, preds in enumerate(predecessors):
+            if preds:
+                src.extend(index[p] for p in preds)
+                dst.extend([i] * len(preds))
+        return cls.from_edges(len(labels), src, dst)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.pred_index.size)
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the (src, dst) edge arrays, grouped by dst
+        """
+        dst = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.pred_offsets))
+        return self.pred_index, dst
+
+    def predecessors(self, i: int) -> np.ndarray:
+        return self.pred_index[self.pred_offsets[i] : self.pred_offsets[i + 1]]
+
+    def with_predecessors(self, i: int, predecessors: np.ndarray) -> "CSRGraph":
+        """
+        Return the graph with the predecessors of task i replaced
+        Only the rows of i and of its old and new predecessors change, the
+        arrays are patched with a few copies instead of sorted again
+        """
+        a, b = int(self.pred_offsets[i]), int(self.pred_offsets[i + 1])
+        pred_index = np.concatenate(
+            [self.pred_index[:a], predecessors, self.pred_index[b:]]
+        )
+        pred_offsets = self.pred_offsets.copy()
+        pred_offsets[i + 1 :] += predecessors.size - (b - a)
+
+        # drop i from the rows of the old predecessors, then insert it in
+        # the rows of the new ones, keeping every row sorted
+        removed = []
+        for u in np.unique(self.pred_index[a:b]).tolist():
+            start = int(self.succ_offsets[u])
+            row = self.succ_index[start : self.succ_offsets[u + 1]]
+            removed.append(np.flatnonzero(row == i) + start)
+        removed = np.concatenate(removed) if removed else np.zeros(0, np.int64)
+        kept = np.delete(self.succ_index, removed)
+        # succ_offsets of the rows once i is dropped
+        drop = np.zeros(self.n + 1, dtype=np.int64)
+        np.add.at(drop, self.pred_index[a:b] + 1, 1)
+        kept_offsets = self.succ_offsets - np.cumsum(drop)
+
+        new = np.sort(predecessors)
+        starts, ends = kept_offsets[new], kept_offsets[new + 1]
+        position = np.array(
+            [
+                start + np.searchsorted(kept[start:end], i)
+                for start, end in zip(starts.tolist(), ends.tolist())
+            ],
+            dtype=np.int64,
+        )
+        succ_index = np.insert(kept, position, i)
+        add = np.zeros(self.n + 1, dtype=np.int64)
+        np.add.at(add, new + 1, 1)
+        succ_offsets = kept_offsets + np.cumsum(add)
+
+        return CSRGraph(
+            n=self.n,
+            pred_offsets=pred_offsets,
+            pred_index=pred_index,
+            succ_offsets=succ_offsets,
+            succ_index=succ_index,
+        )
+
+    def successors(self, i: int) -> np.ndarray:
+        return self.succ_index[self.succ_offsets[i] : self.succ_offsets[i + 1]]
+
+
+def local_budget(n: int) -> int:
+    """
+    Tasks an update of a graph of n tasks visits one by one before a full
+    vectorized pass is cheaper
+    """
+    return max(SCALAR_WIDTH, int(n * LOCAL_UPDATE_SHARE))
+
+
+def gather(offsets: np.ndarray, index: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """
+    Concatenate the CSR rows of `nodes` without a Python loop
+    """
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return index[:0]
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return index[shift + np.arange(total, dtype=np.int64)]
+
+
+@dataclass
+class TopologicalOrder:
+    """
+    order: task ids sorted by level
+    level: longest number of edges from any source to each task
+    level_offsets: order[level_offsets[k]:level_offsets[k + 1]] is level k
+    """
+
+    order: np.ndarray
+    level: np.ndarray
+    level_offsets: np.ndarray
+
+    @property
+    def depth(self) -> int:
+        return int(self.level_offsets.size - 1)
+
+
+class CycleError(ValueError):
+    """
+    The task graph is not a DAG
+    cycles: task ids of one cycle per strongly connected component, the
+    first task repeated at the end
+    """
+
+    def __init__(self, unordered: int, cycles: list[list[int]]):
+        super().__init__(f"Task graph contains a cycle through {unordered} task(s)")
+        self.cycles = cycles
+
+
+def find_cycles(graph: CSRGraph) -> list[list[int]]:
+    """
+    Return one cycle of every strongly connected component that has one,
+    as task ids with the first task repeated at the end, [] for a DAG
+    """
+    src, dst = graph.edges()
+    # an input order that runs along every edge is a topological order
+    if not np.any(src >= dst):
+        return []
+
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = graph.n
+    matrix = csr_matrix(
+        (
+            np.ones(graph.succ_index.size, dtype=np.int8),
+            graph.succ_index,
+            graph.succ_offsets,
+        ),
+        shape=(n, n),
+    )
+    # a predecessor listed twice is a duplicate entry, connected_components
+    # needs them merged, it can loop forever on them
+    matrix.sum_duplicates()
+    _, component = connected_components(matrix, directed=True, connection="strong")
+    sizes = np.bincount(component, minlength=n)
+    cyclic = np.zeros(n, dtype=bool)
+    cyclic[component[sizes[component] > 1]] = True
+    cyclic[component[src[src == dst]]] = True
+
+    # the first successor of every task inside its own component, every
+    # task of a cyclic component has one
+    succ_src = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.succ_offsets))
+    inside = component[succ_src] == component[graph.succ_index]
+    heads, first = np.unique(succ_src[inside], return_index=True)
+    following = np.full(n, -1, dtype=np.int64)
+    following[heads] = graph.succ_index[inside][first]
+    following = following.tolist()
+
+    cycles = []
+    # first task of every cyclic component, in input order
+    _, firsts = np.unique(component, return_index=True)
+    for start in np.sort(firsts[cyclic[component[firsts]]]).tolist():
+        # the walk stays in the component, so it comes back to a task it has seen
+        position: dict[int, int] = {}
+        path: list[int] = []
+        v = start
+        while v not in position:
+            position[v] = len(path)
+            path.append(v)
+            v = following[v]
+        cycles.append(path[position[v] :] + [v])
+    return cycles
+
+
+def topological_levels(graph: CSRGraph) -> TopologicalOrder:
+    """
+    Level-synchronous Kahn's algorithm, linear in tasks and edges
+    A frontier of at least SCALAR_WIDTH tasks is advanced with NumPy, a
+    narrower one task by task; tasks are sorted by id within their level
+    Raise CycleError if the graph contains a cycle
+    """
+    n = graph.n
+    indegree = np.diff(graph.pred_offsets)
+    frontier: np.ndarray | list[int] = np.flatnonzero(indegree == 0)
+    sizes: list[int] = []
+    parts: list[np.ndarray] = []
+    # tasks of the narrow levels since the last wide one
+    narrow: list[int] = []
+    narrow_levels = 0
+    # Python copies of the successor lists, made on the first narrow level
+    succ_offsets: list[int] = []
+    succ_index: list[int] = []
+    # in-degrees changed by narrow levels, written back before a wide one
+    remaining: dict[int, int] = {}
+
+    while len(frontier):
+        sizes.append(len(frontier))
+        if len(frontier) < SCALAR_WIDTH:
+            narrow_levels += 1
+        # copying the successor lists only pays off after a few narrow levels,
+        # a wide plan with a short narrow tail keeps the vectorized steps
+        if len(frontier) < SCALAR_WIDTH and narrow_levels > SCALAR_WIDTH:
+            if not succ_offsets:
+                succ_offsets = graph.succ_offsets.tolist()
+                succ_index = graph.succ_index.tolist()
+            if isinstance(frontier, np.ndarray):
+                frontier = frontier.tolist()
+            narrow.extend(frontier)
+            following = []
+            for v in frontier:
+                for w in succ_index[succ_offsets[v] : succ_offsets[v + 1]]:
+                    left = remaining.get(w)
+                    left = (int(indegree[w]) if left is None else left) - 1
+                    remaining[w] = left
+                    if left == 0:
+                        following.append(w)
+            following.sort()
+            frontier = following
+            continue
+
+        if narrow:
+            parts.append(np.array(narrow, dtype=np.int64))
+            narrow = []
+        if remaining:
+            indegree[list(remaining)] = list(remaining.values())
+            remaining.clear()
+        frontier = np.asarray(frontier, dtype=np.int64)
+        parts.append(frontier)
+        successors = gather(graph.succ_offsets, graph.succ_index, frontier)
+        candidates, hits = np.unique(successors, return_counts=True)
+        indegree[candidates] -= hits
+        frontier = candidates[indegree[candidates] == 0]
+    if narrow:
+        parts.append(np.array(narrow, dtype=np.int64))
+
+    visited = sum(sizes)
+    if visited != n:
+        raise CycleError(n - visited, find_cycles(graph))
+
+    level_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=level_offsets[1:])
+    order = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    level = np.empty(n, dtype=np.int64)
+    level[order] = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+    return TopologicalOrder(order=order, level=level, level_offsets=level_offsets)
+
+
+@dataclass
+class _NarrowRun:
+    """
+    Consecutive narrow levels, walked task by task by the passes
+    tasks: the tasks in topological order
+    pred_offsets, pred_src: CSR predecessors of every task of the run
+    pred_local: position of each predecessor in tasks, -1 before the run
+    succ_*: the same for the successors, -1 after the run
+    """
+
+    tasks: np.ndarray
+    pred_offsets: np.ndarray
+    pred_src: np.ndarray
+    pred_local: np.ndarray
+    succ_offsets: np.ndarray
+    succ_dst: np.ndarray
+    succ_local: np.ndarray
+
+    @classmethod
+    def build(cls, graph: CSRGraph, rank: np.ndarray, tasks: np.ndarray, base: int):
+        """
+        base: position of the first task of the run in the topological order
+        """
+        m = tasks.size
+
+        def rows(offsets, index):
+            counts = offsets[tasks + 1] - offsets[tasks]
+            run_offsets = np.zeros(m + 1, dtype=np.int64)
+            np.cumsum(counts, out=run_offsets[1:])
+            ids = gather(offsets, index, tasks)
+            local = rank[ids] - base
+            local[(local < 0) | (local >= m)] = -1
+            return run_offsets, ids, local
+
+        pred_offsets, pred_src, pred_local = rows(graph.pred_offsets, graph.pred_index)
+        succ_offsets, succ_dst, succ_local = rows(graph.succ_offsets, graph.succ_index)
+        return cls(
+            tasks=tasks,
+            pred_offsets=pred_offsets,
+            pred_src=pred_src,
+            pred_local=pred_local,
+            succ_offsets=succ_offsets,
+            succ_dst=succ_dst,
+            succ_local=succ_local,
+        )
+
+    def forward(self, duration: np.ndarray, es: np.ndarray, ef: np.ndarray):
+        tasks = self.tasks
+        offsets = self.pred_offsets.tolist()
+        if duration.ndim > 1:
+            src = self.pred_src.tolist()
+            for j, v in enumerate(tasks.tolist()):
+                a, b = offsets[j], offsets[j + 1]
+                if a == b:
+                    continue
+                # one predecessor is a row view, no gather
+                start = ef[src[a]] if b - a == 1 else ef[src[a:b]].max(axis=0)
+                es[v] = start
+                np.add(start, duration[v], out=ef[v])
+            return
+
+        local = self.pred_local.tolist()
+        # earliest finish of the predecessors before the run
+        before = ef[self.pred_src].tolist()
+        dur = duration[tasks].tolist()
+        es_run = es[tasks].tolist()
+        ef_run = ef[tasks].tolist()
+        for j in range(len(dur)):
+            a, b = offsets[j], offsets[j + 1]
+            if a == b:
+                continue
+            start = None
+            for e in range(a, b):
+                i = local[e]
+                finish = ef_run[i] if i >= 0 else before[e]
+                if start is None or finish > start:
+                    start = finish
+            es_run[j] = start
+            ef_run[j] = start + dur[j]
+        es[tasks] = es_run
+        ef[tasks] = ef_run
+
+    def backward(self, duration: np.ndarray, ls: np.ndarray, lf: np.ndarray):
+        tasks = self.tasks
+        offsets = self.succ_offsets.tolist()
+        if duration.ndim > 1:
+            dst = self.succ_dst.tolist()
+            for j, v in reversed(list(enumerate(tasks.tolist()))):
+                a, b = offsets[j], offsets[j + 1]
+                if a == b:
+                    continue
+                finish = ls[dst[a]] if b - a == 1 else ls[dst[a:b]].min(axis=0)
+                lf[v] = finish
+                np.subtract(finish, duration[v], out=ls[v])
+            return
+
+        local = self.succ_local.tolist()
+        # latest start of the successors after the run
+        after = ls[self.succ_dst].tolist()
+        dur = duration[tasks].tolist()
+        ls_run = ls[tasks].tolist()
+        lf_run = lf[tasks].tolist()
+        for j in range(len(dur) - 1, -1, -1):
+            a, b = offsets[j], offsets[j + 1]
+            if a == b:
+                continue
+            finish = None
+            for e in range(a, b):
+                i = local[e]
+                start = ls_run[i] if i >= 0 else after[e]
+                if finish is None or start < finish:
+                    finish = start
+            lf_run[j] = finish
+            ls_run[j] = finish - dur[j]
+        ls[tasks] = ls_run
+        lf[tasks] = lf_run
+
+
+class CPMEngine:
+    """
+    Forward/backward pass of the critical path method over a CSRGraph
+    The edge grouping is computed once, so the passes can be rerun cheaply
+    with different durations
+    """
+
+    graph: CSRGraph
+    topo: TopologicalOrder
+    # position of every task in topo.order, increases along every edge
+    rank: np.ndarray
+
+    def __init__(self, graph: CSRGraph, topo: TopologicalOrder | None = None):
+        """
+        topo: the topological order of graph, if already known
+        """
+        self.graph = graph
+        self.topo = topo if topo is not None else topological_levels(graph)
+        self.rank = np.empty(graph.n, dtype=np.int64)
+        self.rank[self.topo.order] = np.arange(graph.n, dtype=np.int64)
+        order, level = self.topo.order, self.topo.level
+
+        # forward pass: edges grouped by (level of head, head); the order is
+        # sorted by level and id, so these are its predecessor rows in turn
+        heads = np.repeat(order, np.diff(graph.pred_offsets)[order])
+        self._fwd_src = gather(graph.pred_offsets, graph.pred_index, order)
+        self._fwd = self._segments(heads, level[heads])
+
+        # backward pass: edges grouped by (level of tail, tail)
+        tails = np.repeat(order, np.diff(graph.succ_offsets)[order])
+        self._bwd_dst = gather(graph.succ_offsets, graph.succ_index, order)
+        self._bwd = self._segments(tails, level[tails])
+
+        # the passes in level order: a wide level by its index, consecutive
+        # narrow levels as one _NarrowRun
+        self._steps: list[int | _NarrowRun] = []
+        offsets = self.topo.level_offsets
+        wide = np.diff(offsets) >= SCALAR_WIDTH
+        bounds = np.flatnonzero(np.diff(wide.astype(np.int8))) + 1
+        starts = [0, *bounds.tolist()] if wide.size else []
+        for k0, k1 in zip(starts, [*bounds.tolist(), wide.size]):
+            if wide[k0]:
+                self._steps.extend(range(k0, k1))
+            else:
+                base = int(offsets[k0])
+                self._steps.append(
+                    _NarrowRun.build(
+                        graph, self.rank, self.topo.order[base : offsets[k1]], base
+                    )
+                )
+
+    def updated(self, graph: CSRGraph, task: int) -> "CPMEngine":
+        """
+        Return the engine of graph, which differs from self.graph only in
+        the predecessors of task
+        Only task and the tasks downstream of it can change level. No edge
+        between them changed, so the current ranks still order them; they
+        are relevelled in that order and moved within the order, Kahn's
+        algorithm is not run again
+        When more than LOCAL_UPDATE_SHARE of the tasks would be walked,
+        the order is sorted again from scratch
+        Raise CycleError if a new predecessor is task or downstream of it
+        """
+        rank, level = self.rank, self.topo.level
+        budget = local_budget(graph.n)
+        predecessors = graph.predecessors(task)
+        # a path from task climbs in rank, only predecessors ranked after
+        # task can be reached from it
+        late = predecessors[rank[predecessors] >= rank[task]]
+        if late.size:
+            targets = set(late.tolist())
+            cycle = self._path(task, targets, int(rank[late].max()), budget)
+            if cycle is None:
+                return CPMEngine(graph)
+            if cycle:
+                raise CycleError(len(cycle), [cycle + [task]])
+
+        level = level.copy()
+        heap = [(int(rank[task]), task)]
+        queued = {task}
+        moved = []
+        while heap:
+            if len(moved) > budget:
+                return CPMEngine(graph)
+            _, u = heapq.heappop(heap)
+            queued.discard(u)
+            preds = graph.predecessors(u)
+            new = int(level[preds].max()) + 1 if preds.size else 0
+            if new == level[u]:
+                continue
+            level[u] = new
+            moved.append(u)
+            for s in graph.successors(u).tolist():
+                if s not in queued:
+                    queued.add(s)
+                    heapq.heappush(heap, (int(rank[s]), s))
+        if not moved:
+            return CPMEngine(graph, self.topo)
+
+        # the order is sorted by (level, id), take the moved tasks out and
+        # merge them back in under their new levels
+        n = graph.n
+        order = self.topo.order
+        moved = np.array(moved, dtype=np.int64)
+        key = level * n + np.arange(n, dtype=np.int64)
+        moving = np.zeros(n, dtype=bool)
+        moving[moved] = True
+        staying = order[~moving[order]]
+        moved = moved[np.argsort(key[moved])]
+        order = np.insert(staying, np.searchsorted(key[staying], key[moved]), moved)
+        level_offsets = np.searchsorted(
+            level[order], np.arange(int(level.max()) + 2, dtype=np.int64)
+        )
+        return CPMEngine(
+            graph,
+            TopologicalOrder(order=order, level=level, level_offsets=level_offsets),
+        )
+
+    def _path(
+        self, start: int, targets: set[int], max_rank: int, budget: int
+    ) -> list[int] | None:
+        """
+        Return a path of task ids from start to one of targets, or [] if
+        there is none; tasks ranked after max_rank are not visited
+        Return None once more than budget tasks are reached
+        """
+        rank, graph = self.rank, self.graph
+        parent = {start: start}
+        stack = [start]
+        while stack:
+            if len(parent) > budget:
+                return None
+            u = stack.pop()
+            if u in targets:
+                path = [u]
+                while u != start:
+                    u = parent[u]
+                    path.append(u)
+                return path[::-1]
+            for s in graph.successors(u).tolist():
+                if s not in parent and rank[s] <= max_rank:
+                    parent[s] = u
+                    stack.append(s)
+        return []
+
+    def _segments(self, key: np.ndarray, key_level: np.ndarray):
+        """
+        Split edges sorted by (level, key) into per-level reduceat segments
+        Return (edge offsets per level, segment starts, segment keys,
+        segment offsets per level)
+        """
+        depth = self.topo.depth
+        if key.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            zeros = np.zeros(depth + 1, dtype=np.int64)
+            return zeros, empty, empty, zeros
+        boundary = np.empty(key.size, dtype=bool)
+        boundary[0] = True
+        np.not_equal(key[1:], key[:-1], out=boundary[1:])
+        seg_starts = np.flatnonzero(boundary)
+        seg_keys = key[seg_starts]
+        levels = np.arange(depth + 1)
+        edge_offsets = np.searchsorted(key_level, levels)
+        seg_offsets = np.searchsorted(key_level[seg_starts], levels)
+        return edge_offsets, seg_starts, seg_keys, seg_offsets
+
+    def forward(self, duration: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (earliest_start, earliest_finish)
+        """
+        duration = np.asarray(duration, dtype=np.float64)
+        es = np.zeros_like(duration)
+        ef = duration.copy()
+        edge_offsets, seg_starts, seg_keys, seg_offsets = self._fwd
+
+        for k in self._steps:
+            if isinstance(k, _NarrowRun):
+                k.forward(duration, es, ef)
+                continue
+            e0, e1 = edge_offsets[k], edge_offsets[k + 1]
+            if e0 == e1:
+                # the sources
+                continue
+            s0, s1 = seg_offsets[k], seg_offsets[k + 1]
+            heads = seg_keys[s0:s1]
+            start = np.maximum.reduceat(
+                ef[self._fwd_src[e0:e1]], seg_starts[s0:s1] - e0, axis=0
+            )
+            es[heads] = start
+            start += duration[heads]
+            ef[heads] = start
+
+        return es, ef
+
+    def backward(
+        self, duration: np.ndarray, project_end: float | np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (latest_start, latest_finish)
+        For 2-D durations project_end is a (samples,) array
+        """
+        duration = np.asarray(duration, dtype=np.float64)
+        lf = np.empty_like(duration)
+        lf[...] = project_end
+        ls = lf - duration
+        edge_offsets, seg_starts, seg_keys, seg_offsets = self._bwd
+
+        for k in reversed(self._steps):
+            if isinstance(k, _NarrowRun):
+                k.backward(duration, ls, lf)
+                continue
+            e0, e1 = edge_offsets[k], edge_offsets[k + 1]
+            if e0 == e1:
+                # the last level
+                continue
+            s0, s1 = seg_offsets[k], seg_offsets[k + 1]
+            tails = seg_keys[s0:s1]
+            finish = np.minimum.reduceat(
+                ls[self._bwd_dst[e0:e1]], seg_starts[s0:s1] - e0, axis=0
+            )
+            lf[tails] = finish
+            finish -= duration[tails]
+            ls[tails] = finish
+
+        return ls, lf
@@ -1,39 +1,288 @@
 import json
 import logging
-from pydantic import ValidationError
+from collections.abc import Iterator
+from pathlib import Path
+import numpy as np
+import orjson
+from pydantic import TypeAdapter, ValidationError
 
 from .model.input import TaskInput
-from .model.task_data import Task
+from .model.task_data import Task, TaskTable
+from .profiling import phase
 
 logger = logging.getLogger(__name__)
 
+TASK_LIST_ADAPTER = TypeAdapter(list[TaskInput])
+WHITESPACE = b" \t\r\n"
+
+# byte values the array scanner looks at
+QUOTE, BACKSLASH, COMMA = ord('"'), ord("\\"), ord(",")
+OPEN_OBJECT, CLOSE_OBJECT = ord("{"), ord("}")
+OPEN_ARRAY, CLOSE_ARRAY = ord("["), ord("]")
+SPECIAL = np.zeros(256, dtype=bool)
+SPECIAL[[QUOTE, COMMA, OPEN_OBJECT, CLOSE_OBJECT, OPEN_ARRAY, CLOSE_ARRAY]] = True
+# tokens between the tasks of the top level array
+_TASK, _COMMA, _END = 1, 2, 3
+
+
+def _decode_error(message: str, data: bytes | bytearray, at: int, pos: int):
+    """
+    JSONDecodeError at file offset pos, with the bytes around data[at]
+    """
+    snippet = bytes(data[max(0, at - 40) : at + 40]).decode(errors="replace")
+    return json.JSONDecodeError(message, snippet, pos)
+
+
+class _ArrayScanner:
+    """
+    Finds where the tasks of a top level JSON array end, in chunks of
+    bytes, keeping string, escape and nesting state across chunks, and
+    checks that exactly one comma separates the tasks. Only the quotes,
+    commas and brackets of a chunk are looked at, with a few NumPy passes;
+    anything else between the tasks is left to orjson, which decodes them
+    together with their separators
+    """
+
+    def __init__(self, offset: int):
+        # file offset of the next byte fed
+        self.offset = offset
+        self.in_string = False
+        # backslashes the fed bytes end with
+        self.backslashes = 0
+        # nesting depth below the top level array
+        self.depth = 0
+        self.last_token = 0
+        # file offset of the "]" closing the array, once seen
+        self.end: int | None = None
+
+    def feed(self, data: bytes) -> list[int]:
+        """
+        Return the file offsets just past the tasks that end in data
+        Raise JSONDecodeError on a missing, doubled, leading or trailing
+        comma and on anything after the array
+        """
+        offset = self.offset
+        self.offset += len(data)
+        if self.end is not None:
+            if data.strip(WHITESPACE):
+                at = len(data) - len(data.lstrip(WHITESPACE))
+                raise _decode_error(
+                    "Unexpected content after the task list", data, at, offset + at
+                )
+            return []
+        if not data:
+            return []
+
+        chars = np.frombuffer(data, dtype=np.uint8)
+        position = np.flatnonzero(SPECIAL[chars])
+        kind = chars[position]
+
+        # a quote is escaped by an odd run of backslashes before it, runs
+        # reaching back to the start of data continue those fed before
+        quote = kind == QUOTE
+        quotes = position[quote]
+        suspects = quotes[
+            (quotes > 0) & (chars[np.maximum(quotes - 1, 0)] == BACKSLASH)
+            | (quotes == 0) & (self.backslashes > 0)
+        ]
+        if suspects.size:
+            run = np.full(suspects.size, self.backslashes)
+            inside = suspects > 0
+            if inside.any():
+                # each suspect closes the run of backslashes before it
+                q = suspects[inside]
+                slashes = np.flatnonzero(chars == BACKSLASH)
+                starts = slashes[np.r_[True, slashes[1:] != slashes[:-1] + 1]]
+                begin = starts[np.searchsorted(starts, q - 1, "right") - 1]
+                run[inside] = q - begin + np.where(begin == 0, self.backslashes, 0)
+            quote[np.searchsorted(position, suspects[run % 2 == 1])] = False
+        trailing = len(data) - len(data.rstrip(b"\\"))
+        self.backslashes = trailing + (self.backslashes if trailing == len(data) else 0)
+
+        toggle = quote.astype(np.int32)
+        in_string = (np.cumsum(toggle) - toggle + self.in_string) % 2 == 1
+        self.in_string = bool((int(toggle.sum()) + self.in_string) % 2)
+        structural = ~in_string & (kind != QUOTE)
+        position, kind = position[structural], kind[structural]
+        if position.size == 0:
+            return []
+
+        step = (kind == OPEN_OBJECT).astype(np.int64) + (kind == OPEN_ARRAY)
+        step -= (kind == CLOSE_OBJECT) | (kind == CLOSE_ARRAY)
+        depth = self.depth + np.cumsum(step)
+        depth_before = depth - step
+        self.depth = int(depth[-1])
+        ends = position[(step < 0) & (depth == 0)] + 1 + offset
+
+        top = depth_before <= 0
+        if not top.any():
+            return ends.tolist()
+        at_top, kind = position[top], kind[top]
+        token = np.zeros(at_top.size, dtype=np.int8)
+        token[kind == OPEN_OBJECT] = _TASK
+        token[kind == COMMA] = _COMMA
+        token[(kind == CLOSE_ARRAY) & (depth_before[top] == 0)] = _END
+        previous = np.concatenate(([self.last_token], token[:-1])).astype(np.int8)
+        # a task follows the start or a comma, a comma or the end follow a
+        # task, the end may also follow the start
+        valid = np.where(
+            token == _TASK,
+            (previous == 0) | (previous == _COMMA),
+            np.where(
+                token == _END,
+                (previous == 0) | (previous == _TASK),
+                (token == _COMMA) & (previous == _TASK),
+            ),
+        )
+        valid &= previous != _END
+        if not valid.all():
+            i = int(np.argmin(valid))
+            at = int(at_top[i])
+            if previous[i] == _END:
+                message = "Unexpected content after the task list"
+            elif token[i] == 0:
+                message = "Every task must be a JSON object"
+            elif token[i] == _TASK:
+                message = "Expected ',' between tasks"
+            elif token[i] == _END:
+                message = "Trailing ',' before the end of the task list"
+            elif previous[i] == _COMMA:
+                message = "Expected a task after ','"
+            else:
+                message = "Expected a task before ','"
+            raise _decode_error(message, data, at, offset + at)
+        self.last_token = int(token[-1])
+
+        if self.last_token == _END:
+            at = int(at_top[-1])
+            self.end = offset + at
+            rest = data[at + 1 :]
+            if rest.strip(WHITESPACE):
+                at += 1 + len(rest) - len(rest.lstrip(WHITESPACE))
+                raise _decode_error(
+                    "Unexpected content after the task list", data, at, offset + at
+                )
+        return ends.tolist()
+
 
 class InputParser:
+    # bytes read from the file at a time
+    read_size: int = 1 << 22
+    # tasks validated together
+    batch_size: int = 10000
+
+    @staticmethod
+    def iter_json_array(file_path: str | Path, read_size: int | None = None):
+        """
+        Yield lists of the raw objects of a top level JSON array,
+        reading the file incrementally
+        The scanner checks the separators as it reads, each run of complete
+        objects is decoded by orjson at once, so the first invalid object
+        raises JSONDecodeError right away
+        """
+        read_size = read_size or InputParser.read_size
+        buffer = bytearray()
+        # file offset of buffer[0]
+        buffer_offset = 0
+        scanner: _ArrayScanner | None = None
+        # file offset just past the last object yielded, or the "["
+        consumed = 0
+        first = True
+        with open(file_path, "rb") as file:
+            while True:
+                chunk = file.read(read_size)
+                if not chunk:
+                    break
+                if scanner is None:
+                    buffer += chunk
+                    stripped = buffer.lstrip(WHITESPACE)
+                    if not stripped:
+                        continue
+                    if stripped[:1] != b"[":
+                        raise json.JSONDecodeError(
+                            "Json file must contain a list of tasks",
+                            bytes(stripped[:80]).decode(errors="replace"),
+                            0,
+                        )
+                    chunk = bytes(stripped[1:])
+                    consumed = buffer_offset = len(buffer) - len(chunk)
+                    buffer = bytearray()
+                    scanner = _ArrayScanner(buffer_offset)
+
+                ends = scanner.feed(chunk)
+                buffer += chunk
+                if not ends:
+                    continue
+
+                # the gap and comma after the last object yielded, then the
+                # complete objects; a leading 0 stands in for that object
+                run = buffer[consumed - buffer_offset : ends[-1] - buffer_offset]
+                prefix = b"[" if first else b"[0"
+                try:
+                    objects = orjson.loads(prefix + run + b"]")
+                except orjson.JSONDecodeError as e:
+                    at = max(0, e.pos - len(prefix))
+                    raise _decode_error(
+                        f"Invalid task: {e.msg}", run, at, consumed + at
+                    ) from None
+                if not first:
+                    del objects[0]
+                first = False
+                yield objects
+                del buffer[: ends[-1] - buffer_offset]
+                consumed = buffer_offset = ends[-1]
+
+        if scanner is None:
+            raise json.JSONDecodeError("Empty file", "", 0)
+        if scanner.end is None:
+            raise json.JSONDecodeError(
+                "Unexpected end of the task list",
+                bytes(buffer[-80:]).decode(errors="replace"),
+                scanner.offset,
+            )
+        gap = buffer[consumed - buffer_offset : scanner.end - buffer_offset]
+        if gap.strip(WHITESPACE):
+            at = len(gap) - len(gap.lstrip(WHITESPACE))
+            raise _decode_error(
+                "Every task must be a JSON object", gap, at, consumed + at
+            )
+
+    @staticmethod
+    def iter_task_batches(
+        file_path: str | Path, batch_size: int | None = None
+    ) -> Iterator[list[TaskInput]]:
+        """
+        Yield validated TaskInput batches
+        Raise ValidationError / JSONDecodeError on invalid input
+        """
+        batch_size = batch_size or InputParser.batch_size
+        pending: list[dict] = []
+        for objects in InputParser.iter_json_array(file_path):
+            pending.extend(objects)
+            while len(pending) >= batch_size:
+                yield TASK_LIST_ADAPTER.validate_python(pending[:batch_size])
+                del pending[:batch_size]
+        if pending:
+            yield TASK_LIST_ADAPTER.validate_python(pending)
 
     @staticmethod
     def load_json_file(file_path: str) -> list[Task] | None:
         try:
-            with open(file_path, "r") as file:
-                data = json.load(file)
-                logger.info(f"Loaded json file: {file_path}")
-                task_list: list[Task] = []
-
-                for raw_task_input in data:
-                    try:
-                        task_input = TaskInput(**raw_task_input)
-                        task = Task(task_input)
-                        task_list.append(task)
-                    except ValidationError as e:
-                        logger.error(f"Json file is invalid: {file_path}, {e}")
-                        return None
-
-                logger.info(f"Json file is valid: {file_path}")
-                return task_list
+            task_list: list[Task] = []
+            for batch in InputParser.iter_task_batches(file_path):
+                task_list.extend(Task(task_input) for task_input in batch)
+            logger.info(f"Loaded json file: {file_path}")
+            logger.info(f"Json file is valid: {file_path}")
+            return task_list
 
         except FileNotFoundError:
             logger.error(f"File not found: {file_path}")
             return None
 
+        except ValidationError as e:
+            logger.error(f"Json file is invalid: {file_path}, {e}")
+            return None
+
         except json.JSONDecodeError as e:
             logger.error(f"Json file is invalid: {file_path}, {e}")
             return None
@@ -41,3 +290,38 @@ class InputParser:
         except ValueError as ve:
             logger.error(f"ValueError while processing file: {file_path}, {ve}")
             return None
+
+    @staticmethod
+    def read_task_table(file_path: str | Path) -> TaskTable:
+        """
+        Stream the file straight into a columnar TaskTable
+        Raise ValidationError / JSONDecodeError on invalid input, ValueError
+        for unknown predecessors and duplicate labels
+        """
+        with phase("parse") as record:
+            table = TaskTable.from_task_inputs(InputParser.iter_task_batches(file_path))
+            record.tasks = len(table)
+            record.edges = table.graph.edge_count
+        logger.info(f"Loaded json file: {file_path}")
+        return table
+
+    @staticmethod
+    def load_task_table(file_path: str | Path) -> TaskTable | None:
+        """
+        read_task_table, None if the file is missing or not valid JSON tasks
+        Unknown predecessors and duplicate labels raise ValueError
+        """
+        try:
+            return InputParser.read_task_table(file_path)
+
+        except FileNotFoundError:
+            logger.error(f"File not found: {file_path}")
+            return None
+
+        except ValidationError as e:
+            logger.error(f"Json file is invalid: {file_path}, {e}")
+            return None
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Json file is invalid: {file_path}, {e}")
+            return None
@@ -1,3 +1,4 @@
+from typing import Annotated
 from pydantic import BaseModel, Field, model_validator
 
 
@@ -16,6 +17,10 @@ class TaskInput(BaseModel):
     predecessors: list[str] | None = Field(
         default=[], description="Predecessors of a task"
     )
+    resources: dict[str, Annotated[int | float, Field(ge=0)]] | None = Field(
+        default=None,
+        description="Units of every resource the task holds while it runs",
+    )
 
     @model_validator(mode="before")
     def check_predecessors(cls, values: dict) -> dict:
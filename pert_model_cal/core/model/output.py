@@ -1,5 +1,8 @@
-from pydantic import BaseModel
-from .task_data import Task, GraphData
+from collections.abc import Callable
+from dataclasses import dataclass
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from .task_data import Task, TaskView, TaskTable, GraphData
 
 
 class TaskOut(BaseModel):
@@ -12,9 +15,12 @@ class TaskOut(BaseModel):
     latest_finish: int | float | None = None
     slack_time: int | float | None = None
     critical: bool | None = None
+    # resource-constrained schedule, if one was made
+    scheduled_start: float | None = None
+    scheduled_finish: float | None = None
 
     @classmethod
-    def from_task(cls, task: Task) -> "TaskOut":
+    def from_task(cls, task: Task | TaskView) -> "TaskOut":
         return cls(
             label=task.task_input.label,
             estimate_duration=task.estimate_during,
@@ -25,13 +31,296 @@ class TaskOut(BaseModel):
             latest_finish=task.latest_finish,
             slack_time=task.slack_time,
             critical=task.critical,
+            scheduled_start=getattr(task, "scheduled_start", None),
+            scheduled_finish=getattr(task, "scheduled_finish", None),
         )
 
 
+@dataclass
+class TaskColumns:
+    """
+    Per-task results as arrays, a snapshot of the TaskTable columns
+    Exporters stream rows from here instead of going through TaskOut
+    """
+
+    labels: list[str]
+    estimate: np.ndarray
+    variance: np.ndarray
+    earliest_start: np.ndarray
+    earliest_finish: np.ndarray
+    latest_start: np.ndarray
+    latest_finish: np.ndarray
+    slack: np.ndarray
+    critical: np.ndarray
+    scheduled_start: np.ndarray | None = None
+    scheduled_finish: np.ndarray | None = None
+
+    @classmethod
+    def from_table(cls, table: TaskTable) -> "TaskColumns":
+        # copies, a later PERT.update_task must not change this result
+        return cls(
+            labels=list(table.labels),
+            estimate=table.estimate.copy(),
+            variance=table.variance.copy(),
+            earliest_start=table.earliest_start.copy(),
+            earliest_finish=table.earliest_finish.copy(),
+            latest_start=table.latest_start.copy(),
+            latest_finish=table.latest_finish.copy(),
+            slack=table.slack.copy(),
+            critical=table.critical.copy(),
+            scheduled_start=(
+                None if table.scheduled_start is None else table.scheduled_start.copy()
+            ),
+            scheduled_finish=(
+                None
+                if table.scheduled_finish is None
+                else table.scheduled_finish.copy()
+            ),
+        )
+
+    @classmethod
+    def from_task_outs(cls, tasks: list[TaskOut]) -> "TaskColumns":
+        def column(field: str, dtype=np.float64) -> np.ndarray:
+            return np.array([getattr(task, field) for task in tasks], dtype=dtype)
+
+        return cls(
+            labels=[task.label for task in tasks],
+            estimate=column("estimate_duration"),
+            variance=column("variance"),
+            earliest_start=column("earliest_start"),
+            earliest_finish=column("earliest_finish"),
+            latest_start=column("latest_start"),
+            latest_finish=column("latest_finish"),
+            slack=column("slack_time"),
+            critical=column("critical", bool),
+            scheduled_start=(
+                column("scheduled_start")
+                if tasks and tasks[0].scheduled_start is not None
+                else None
+            ),
+            scheduled_finish=(
+                column("scheduled_finish")
+                if tasks and tasks[0].scheduled_finish is not None
+                else None
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def task_outs(self) -> list[TaskOut]:
+        """
+        One TaskOut per task, built without validating the values again
+        """
+        scheduled = (
+            zip(self.scheduled_start.tolist(), self.scheduled_finish.tolist())
+            if self.scheduled_start is not None and self.scheduled_finish is not None
+            else ((None, None) for _ in self.labels)
+        )
+        return [
+            TaskOut.model_construct(
+                label=label,
+                estimate_duration=estimate,
+                variance=variance,
+                earliest_start=es,
+                earliest_finish=ef,
+                latest_start=ls,
+                latest_finish=lf,
+                slack_time=slack,
+                critical=critical,
+                scheduled_start=start,
+                scheduled_finish=finish,
+            )
+            for label, estimate, variance, es, ef, ls, lf, slack, critical, (
+                start,
+                finish,
+            ) in zip(
+                self.labels,
+                self.estimate.tolist(),
+                self.variance.tolist(),
+                self.earliest_start.tolist(),
+                self.earliest_finish.tolist(),
+                self.latest_start.tolist(),
+                self.latest_finish.tolist(),
+                self.slack.tolist(),
+                self.critical.tolist(),
+                scheduled,
+            )
+        ]
+
+
+class ResourceSchedule(BaseModel):
+    priority: str
+    # resource -> units available at any time
+    capacities: dict[str, float]
+    # project duration of the resource-constrained schedule
+    duration: float
+    # how much later than the unconstrained schedule it ends
+    delay: float
+
+
+class ComponentResult(BaseModel):
+    """
+    One weakly connected sub-network, scheduled against its own end
+    """
+
+    tasks: int
+    expected_duration: float
+    # standard deviation over the critical tasks of the component
+    std_duration: float
+    critical_path: list[str]
+
+
+class PathResult(BaseModel):
+    """
+    One source-to-sink path, see PERT.longest_paths
+    """
+
+    labels: list[str]
+    duration: float
+    # sum of the task variances along the path
+    variance: float
+    std_duration: float
+    # how much shorter than the longest path it is
+    slack: float
+
+
 class PERTResult(BaseModel):
-    # the result of every task
-    tasks: list[TaskOut]
+    """
+    The per-task rows and the graph data are built on first access, from
+    the columns and a layout function captured when the result was made
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     critical_path: list[str]
     expected_duration: int | float
     expected_probability: int | float | None
-    graph_data: GraphData
+    resource_schedule: ResourceSchedule | None = None
+    # the per-task results as arrays, None for results built by hand
+    columns: TaskColumns | None = Field(default=None, exclude=True)
+
+    _tasks: list[TaskOut] | None = PrivateAttr(default=None)
+    _graph_data: GraphData | None = PrivateAttr(default=None)
+    _layout: Callable[[], GraphData] | None = PrivateAttr(default=None)
+    _components: list[ComponentResult] | None = PrivateAttr(default=None)
+    _split: Callable[[], list[ComponentResult]] | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        tasks: list[TaskOut] | None = None,
+        graph_data: GraphData | None = None,
+        **data,
+    ):
+        super().__init__(**data)
+        self._tasks = tasks
+        self._graph_data = graph_data
+
+    @classmethod
+    def lazy(
+        cls,
+        critical_path: list[str],
+        expected_duration: int | float,
+        expected_probability: int | float | None,
+        resource_schedule: ResourceSchedule | None = None,
+        columns: TaskColumns | None = None,
+        graph_data: GraphData | None = None,
+        layout: Callable[[], GraphData] | None = None,
+        split: Callable[[], list[ComponentResult]] | None = None,
+    ) -> "PERTResult":
+        """
+        A result from already validated values, layout makes the graph data
+        and split the component results when they are first needed
+        """
+        result = cls.model_construct(
+            critical_path=critical_path,
+            expected_duration=expected_duration,
+            expected_probability=expected_probability,
+            resource_schedule=resource_schedule,
+            columns=columns,
+        )
+        result._graph_data = graph_data
+        result._layout = layout
+        result._split = split
+        return result
+
+    @property
+    def tasks(self) -> list[TaskOut]:
+        """
+        The result of every task
+        """
+        if self._tasks is None:
+            if self.columns is None:
+                raise ValueError("The result was calculated without the task output")
+            self._tasks = self.columns.task_outs()
+        return self._tasks
+
+    @property
+    def graph_data(self) -> GraphData:
+        if self._graph_data is None:
+            if self._layout is None:
+                raise ValueError("The result was calculated without the graph output")
+            self._graph_data = self._layout()
+            self._layout = None
+        return self._graph_data
+
+    @property
+    def components(self) -> list[ComponentResult]:
+        """
+        The independent sub-networks of the plan, the overall duration is
+        the longest of them
+        """
+        if self._components is None:
+            if self._split is None:
+                raise ValueError(
+                    "The result was calculated without the components output"
+                )
+            self._components = self._split()
+            self._split = None
+        return self._components
+
+    def task_columns(self) -> TaskColumns:
+        if self.columns is None:
+            self.columns = TaskColumns.from_task_outs(self.tasks)
+        return self.columns
+
+
+class SimulationResult(BaseModel):
+    n_samples: int
+    mean_duration: float
+    std_duration: float
+    # percentile -> completion time
+    percentiles: dict[float, float]
+    # label -> share of samples in which the task was critical
+    criticality_index: dict[str, float]
+    expected_probability: float | None = None
+
+
+class DeadlineCurve(BaseModel):
+    # mean and standard deviation of the critical path
+    expected_duration: float
+    std_duration: float
+    deadlines: list[float]
+    # probability of finishing by each deadline
+    probabilities: list[float]
+    confidence: list[float]
+    # deadline met with each confidence level
+    quantiles: list[float]
+
+
+class TornadoRow(BaseModel):
+    label: str
+    # project duration with the estimate scaled by each factor
+    durations: list[float]
+    # largest change of the project duration over the factors
+    impact: float
+
+
+class SensitivityResult(BaseModel):
+    field: str
+    factors: list[float]
+    baseline_duration: float
+    # tasks ranked by impact, largest first
+    tornado: list[TornadoRow]
+    # scenario name -> project duration
+    scenarios: dict[str, float] = {}
@@ -1,9 +1,33 @@
 from typing import Any
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass
+import numpy as np
 from .input import TaskInput
+from ..cpm_engine import CSRGraph
+from ..validation import validate_graph
 
 
 class Task:
+    """
+    A single task as read from the input
+    TaskList/PERT keep their tasks in a TaskTable and hand out TaskView
+    objects with the same attributes instead
+    """
+
+    __slots__ = (
+        "task_input",
+        "prev_task_label",
+        "next_task_label",
+        "estimate_during",
+        "variance",
+        "earliest_start",
+        "earliest_finish",
+        "latest_start",
+        "latest_finish",
+        "slack_time",
+        "critical",
+    )
+
     task_input: TaskInput
     # double linked table
     prev_task_label: list[str | None]
@@ -32,43 +56,302 @@ class Task:
         self.critical = None
 
 
-class TaskList:
+class TaskTable:
     """
-    TaskList class
-    Usually this class is not for directly use.
-    Use PERT class instead
+    Columnar task store
+    Labels are interned to integer ids (their position in the input),
+    estimates and schedule times are typed arrays and the dependencies are
+    kept as CSR offset/index arrays in `graph`
     """
 
-    tasks: dict[str, Task]  # label -> Task
+    labels: list[str]
+    names: list[str | None]
+    index: dict[str, int]  # label -> id
+    graph: CSRGraph
+    # resource demands, demand[i, r] units of resource_names[r] held by task i
+    resource_names: list[str]
+    demand: np.ndarray
 
-    def __init__(self, tasks: list[Task]):
-        self.tasks = {task.task_input.label: task for task in tasks}
-        self._check_valid()
-        self._task_init()
+    optimistic: np.ndarray
+    most_likely: np.ndarray
+    pessimistic: np.ndarray
+    estimate: np.ndarray
+    variance: np.ndarray
+    earliest_start: np.ndarray
+    earliest_finish: np.ndarray
+    latest_start: np.ndarray
+    latest_finish: np.ndarray
+    slack: np.ndarray
+    critical: np.ndarray
+    # resource-constrained schedule, None until PERT.schedule_resources
+    scheduled_start: np.ndarray | None
+    scheduled_finish: np.ndarray | None
 
-    def _check_valid(self):
-        labels = set(self.tasks.keys())
-        for task in self.tasks.values():
-            label = task.task_input.label
+    def __init__(
+        self,
+        labels: list[str],
+        names: list[str | None],
+        estimates: tuple[np.ndarray, np.ndarray, np.ndarray],
+        graph: CSRGraph,
+        resource_names: list[str] | None = None,
+        demand: np.ndarray | None = None,
+    ):
+        n = len(labels)
+        self.labels = labels
+        self.names = names
+        self.index = {label: i for i, label in enumerate(labels)}
+        self.graph = graph
+        self.optimistic, self.most_likely, self.pessimistic = (
+            np.asarray(column, dtype=np.float64) for column in estimates
+        )
+        self.estimate = np.zeros(n)
+        self.variance = np.zeros(n)
+        self.earliest_start = np.zeros(n)
+        self.earliest_finish = np.zeros(n)
+        self.latest_start = np.zeros(n)
+        self.latest_finish = np.zeros(n)
+        self.slack = np.full(n, -1.0)
+        self.critical = np.zeros(n, dtype=bool)
+        self.resource_names = resource_names or []
+        self.demand = (
+            demand
+            if demand is not None
+            else np.zeros((n, len(self.resource_names)), dtype=np.float64)
+        )
+        self.scheduled_start = None
+        self.scheduled_finish = None
 
-            # check if a predecessor is existed
-            for predecessor in task.task_input.predecessors:
-                if predecessor not in labels:
-                    raise ValueError(
-                        f"Predecessor '{predecessor}' in task '{label}' does not exist"
+    @classmethod
+    def from_task_inputs(cls, batches: Iterable[list[TaskInput]]) -> "TaskTable":
+        """
+        Build the table from batches of TaskInput without keeping them
+        """
+        labels: list[str] = []
+        names: list[str | None] = []
+        columns: tuple[list, list, list] = ([], [], [])
+        # predecessor labels of all tasks, flattened, resolved at the end
+        # because a predecessor may appear later in the input
+        pred_labels: list[str] = []
+        pred_counts: list[int] = []
+        # resource name -> column, and (task, column, units) of every demand
+        resource_index: dict[str, int] = {}
+        demands: tuple[list, list, list] = ([], [], [])
+
+        for batch in batches:
+            for task_input in batch:
+                labels.append(task_input.label)
+                names.append(task_input.name)
+                columns[0].append(task_input.optimistic_estimate)
+                columns[1].append(task_input.most_likely_estimate)
+                columns[2].append(task_input.pessimistic_estimate)
+                predecessors = task_input.predecessors or []
+                pred_labels.extend(predecessors)
+                pred_counts.append(len(predecessors))
+                for resource, units in (task_input.resources or {}).items():
+                    demands[0].append(len(labels) - 1)
+                    demands[1].append(
+                        resource_index.setdefault(resource, len(resource_index))
                     )
+                    demands[2].append(units)
+
+        # cycles are left to the CPM engine, which orders the tasks anyway
+        report, graph = validate_graph(
+            labels, pred_labels, pred_counts, check_cycles=False
+        )
+        if not report.ok:
+            raise ValueError(report.message())
+
+        demand = np.zeros((len(labels), len(resource_index)), dtype=np.float64)
+        demand[demands[0], demands[1]] = demands[2]
+
+        return cls(
+            labels=labels,
+            names=names,
+            estimates=tuple(np.array(c, dtype=np.float64) for c in columns),
+            graph=graph,
+            resource_names=list(resource_index),
+            demand=demand,
+        )
+
+    @classmethod
+    def from_tasks(cls, tasks: list[Task]) -> "TaskTable":
+        return cls.from_task_inputs([[task.task_input for task in tasks]])
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def predecessor_labels(self, i: int) -> list[str]:
+        return [self.labels[j] for j in self.graph.predecessors(i).tolist()]
 
-    def _task_init(self):
-        for task in self.tasks.values():
-            task.prev_task_label = task.task_input.predecessors
-            for p in task.task_input.predecessors:
-                if p in self.tasks.keys():
-                    self.tasks[p].next_task_label.append(task.task_input.label)
+    def successor_labels(self, i: int) -> list[str]:
+        return [self.labels[j] for j in self.graph.successors(i).tolist()]
+
+    def resources(self, i: int) -> dict[str, float] | None:
+        used = np.flatnonzero(self.demand[i]).tolist()
+        if not used:
+            return None
+        return {self.resource_names[r]: float(self.demand[i, r]) for r in used}
+
+    def task_input(self, i: int) -> TaskInput:
+        return TaskInput.model_construct(
+            label=self.labels[i],
+            name=self.names[i],
+            optimistic_estimate=float(self.optimistic[i]),
+            most_likely_estimate=float(self.most_likely[i]),
+            pessimistic_estimate=float(self.pessimistic[i]),
+            predecessors=self.predecessor_labels(i),
+            resources=self.resources(i),
+        )
+
+    def with_predecessors(self, i: int, predecessors: list[str]) -> CSRGraph:
+        """
+        Return the CSR graph with the predecessors of task i replaced,
+        the table itself is left unchanged
+        """
+        new_src = np.fromiter(
+            (self.index[p] for p in predecessors),
+            dtype=np.int64,
+            count=len(predecessors),
+        )
+        return self.graph.with_predecessors(i, new_src)
+
+    def nbytes(self) -> int:
+        """
+        Size of the numeric columns and CSR arrays
+        """
+        arrays = [
+            value for value in vars(self).values() if isinstance(value, np.ndarray)
+        ]
+        arrays += [
+            self.graph.pred_offsets,
+            self.graph.pred_index,
+            self.graph.succ_offsets,
+            self.graph.succ_index,
+        ]
+        return sum(a.nbytes for a in arrays)
+
+
+class _Column:
+    """
+    TaskView attribute backed by a TaskTable column
+    """
+
+    def __init__(self, column: str, cast: type):
+        self.column = column
+        self.cast = cast
+
+    def __get__(self, view: "TaskView | None", owner=None):
+        if view is None:
+            return self
+        return self.cast(getattr(view.table, self.column)[view.id])
+
+    def __set__(self, view: "TaskView", value):
+        getattr(view.table, self.column)[view.id] = value
+
+
+class TaskView:
+    """
+    Lightweight view of one row of a TaskTable with the attributes of Task
+    """
+
+    __slots__ = ("table", "id")
+
+    estimate_during = _Column("estimate", float)
+    variance = _Column("variance", float)
+    earliest_start = _Column("earliest_start", float)
+    earliest_finish = _Column("earliest_finish", float)
+    latest_start = _Column("latest_start", float)
+    latest_finish = _Column("latest_finish", float)
+    slack_time = _Column("slack", float)
+    critical = _Column("critical", bool)
+
+    def __init__(self, table: TaskTable, id: int):
+        self.table = table
+        self.id = id
+
+    @property
+    def scheduled_start(self) -> float | None:
+        start = self.table.scheduled_start
+        return None if start is None else float(start[self.id])
+
+    @property
+    def scheduled_finish(self) -> float | None:
+        finish = self.table.scheduled_finish
+        return None if finish is None else float(finish[self.id])
+
+    @property
+    def task_input(self) -> TaskInput:
+        return self.table.task_input(self.id)
+
+    @property
+    def prev_task_label(self) -> list[str]:
+        return self.table.predecessor_labels(self.id)
+
+    @property
+    def next_task_label(self) -> list[str]:
+        return self.table.successor_labels(self.id)
+
+
+class TaskViews(Mapping):
+    """
+    label -> TaskView mapping over a TaskTable, views are created on access
+    """
+
+    def __init__(self, table: TaskTable):
+        self.table = table
+
+    def __getitem__(self, label: str) -> TaskView:
+        return TaskView(self.table, self.table.index[label])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table.labels)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self.table.index
+
+
+class TaskList:
+    """
+    TaskList class
+    Usually this class is not for directly use.
+    Use PERT class instead
+    """
+
+    table: TaskTable
+    tasks: TaskViews  # label -> TaskView
+
+    def __init__(self, tasks: list[Task] | TaskTable):
+        # unknown predecessors and duplicate labels are rejected while building
+        self.table = (
+            tasks if isinstance(tasks, TaskTable) else TaskTable.from_tasks(tasks)
+        )
+        self.tasks = TaskViews(self.table)
 
 
 @dataclass
 class GraphData:
-    graph: Any  # networkx.DiGraph
+    graph: Any  # networkx.DiGraph, None until to_networkx is called
     position_map: dict
     dashed_edges: list
     solid_edges: list
+    # (u, v) -> edge label, taken from the "name" edge attribute if None
+    edge_labels: dict | None = None
+
+    def to_networkx(self):
+        """
+        Return the networkx graph, building it from the edge lists if needed
+        """
+        if self.graph is None:
+            import networkx
+
+            graph = networkx.DiGraph()
+            graph.add_nodes_from(self.position_map)
+            graph.add_edges_from(self.solid_edges)
+            graph.add_edges_from(self.dashed_edges)
+            if self.edge_labels:
+                networkx.set_edge_attributes(graph, self.edge_labels, "name")
+            self.graph = graph
+        return self.graph
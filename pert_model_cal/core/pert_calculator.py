@@ -1,109 +1,162 @@
-import scipy
 import math
-from typing import TypedDict
-import queue
-import scipy.stats
-import networkx
-from .model.task_data import Task, TaskList, GraphData
-from .model.output import PERTResult, TaskOut
+import heapq
+from typing import TYPE_CHECKING, TypedDict
+from collections import deque
+from collections.abc import Iterable, Mapping, Sequence
+import numpy as np
+from .cpm_engine import (
+    SLACK_TOLERANCE,
+    CPMEngine,
+    CSRGraph,
+    CycleError,
+    local_budget,
+)
+from .layout import layered_layout
+from .components import split_components
+from .paths import k_longest_paths
+from .simulation import run_simulation
+from .sensitivity import FIELDS, estimate_shift, one_at_a_time, scenario_ends
+from .resource_scheduler import PRIORITIES, serial_sgs
+from .validation import ValidationReport, cycle_labels
+from .model.input import TaskInput
+from .model.task_data import Task, TaskList, TaskTable, GraphData
+from .model.output import (
+    ComponentResult,
+    DeadlineCurve,
+    PathResult,
+    PERTResult,
+    ResourceSchedule,
+    SensitivityResult,
+    SimulationResult,
+    TaskColumns,
+    TornadoRow,
+)
+from .profiling import phase
+
+if TYPE_CHECKING:
+    import networkx
+
+LAYOUTS = ("layered", "legacy")
+# parts of a PERTResult beyond the summary: the per-task rows, the graph
+# and the results of the independent sub-networks
+OUTPUTS = ("tasks", "graph", "components")
 
 
 class PERT(TaskList):
     critical_path: list[str]
     expected_time: int | float | None
     expected_probability: int | float | None
-    graph: networkx.DiGraph | None
+    graph: "networkx.DiGraph | None"
+    engine: CPMEngine
+    slack_tolerance: float
 
-    def __init__(self, tasks: list[Task]):
+    def __init__(self, tasks: list[Task] | TaskTable, slack_tolerance: float = 0):
+        """
+        slack_tolerance: tasks with at most this much slack are critical,
+        on top of a relative margin for the rounding of the estimates
+        """
+        if slack_tolerance < 0:
+            raise ValueError("slack_tolerance must not be negative")
         super().__init__(tasks)
+        self.slack_tolerance = slack_tolerance
         self.critical_path = []
         self.expected_time = None
         self.expected_probability = None
         self.graph = None
+        self._time = None
 
-        for task in self.tasks.values():
-            task.estimate_during = (
-                task.task_input.optimistic_estimate
-                + 4 * task.task_input.most_likely_estimate
-                + task.task_input.pessimistic_estimate
-            ) / 6
-            task.variance = (
-                (
-                    task.task_input.pessimistic_estimate
-                    - task.task_input.optimistic_estimate
-                )
-                / 6
-            ) ** 2
+        with phase("init", tasks=len(self.table), edges=self.table.graph.edge_count):
+            self._estimate()
+            self.engine = self._engine(self.table.graph)
 
-    def _earliest_time(self):
-        for task in self.tasks.values():
-            if not task.prev_task_label:
-                task.earliest_finish = task.estimate_during
+    def _engine(self, graph: CSRGraph, changed: int | None = None) -> CPMEngine:
+        """
+        changed: the only task whose predecessors differ from the current
+        engine's graph, the engine is then updated instead of rebuilt
+        Raise ValueError with every cycle as a path of labels if graph has any
+        """
+        try:
+            if changed is not None:
+                return self.engine.updated(graph, changed)
+            return CPMEngine(graph)
+        except CycleError as e:
+            report = ValidationReport(
+                tasks=graph.n,
+                edges=graph.edge_count,
+                cycles=cycle_labels(self.table.labels, e.cycles),
+            )
+            raise ValueError(report.message()) from None
 
-        for task in self.tasks.values():
-            for next_task in task.next_task_label:
-                if self.tasks[next_task].earliest_start < task.earliest_finish:
-                    self.tasks[next_task].earliest_start = task.earliest_finish
-                self.tasks[next_task].earliest_finish = (
-                    self.tasks[next_task].earliest_start
-                    + self.tasks[next_task].estimate_during
-                )
+    def _estimate(self, index: int | slice = slice(None)):
+        table = self.table
+        table.estimate[index] = (
+            table.optimistic[index]
+            + 4 * table.most_likely[index]
+            + table.pessimistic[index]
+        ) / 6
+        table.variance[index] = (
+            (table.pessimistic[index] - table.optimistic[index]) / 6
+        ) ** 2
+
+    def _earliest_time(self):
+        table = self.table
+        table.earliest_start, table.earliest_finish = self.engine.forward(
+            table.estimate
+        )
 
     def _latest_time(self):
-        during_time = 0
-        for task in reversed(self.tasks.values()):
-            if not task.next_task_label:
-                during_time = max(during_time, task.earliest_finish)
-                task.latest_finish = during_time
-                task.latest_start = task.latest_finish - task.estimate_during
-
-        for task in reversed(self.tasks.values()):
-            for prev_task in task.prev_task_label:
-                if (
-                    self.tasks[prev_task].latest_finish == 0
-                    or self.tasks[prev_task].latest_finish > task.latest_start
-                ):
-                    self.tasks[prev_task].latest_finish = task.latest_start
-
-                self.tasks[prev_task].latest_start = (
-                    self.tasks[prev_task].latest_finish
-                    - self.tasks[prev_task].estimate_during
-                )
+        table = self.table
+        # every task without successors must finish by the project end
+        project_end = float(table.earliest_finish.max()) if len(table) else 0
+        table.latest_start, table.latest_finish = self.engine.backward(
+            table.estimate, project_end
+        )
 
     def _slack_time(self):
-        for task in self.tasks.values():
-            task.slack_time = task.latest_start - task.earliest_start
+        self.table.slack = self.table.latest_start - self.table.earliest_start
+
+    def _critical_slack(self) -> float:
+        """
+        The largest slack of a critical task
+        """
+        ef = self.table.earliest_finish
+        project_end = float(ef.max()) if ef.size else 0
+        return self.slack_tolerance + SLACK_TOLERANCE * max(project_end, 1.0)
 
     def _critical(self):
-        for task in self.tasks.values():
-            task.critical = True if task.slack_time == 0 else False
+        self.table.critical = self.table.slack <= self._critical_slack()
 
     def _critical_path(self):
-        for task in self.tasks.values():
-            if task.critical:
-                self.critical_path.append(task.task_input.label)
+        # in schedule order, parallel chains are listed by longest_paths
+        labels, table = self.table.labels, self.table
+        ids = np.flatnonzero(table.critical)
+        ids = ids[np.argsort(table.earliest_start[ids], kind="stable")]
+        self.critical_path = [labels[i] for i in ids.tolist()]
 
     def _expected_time(self):
-        last_task = next(reversed(self.tasks.values()))
-        self.expected_time = last_task.latest_finish
+        ef = self.table.earliest_finish
+        self.expected_time = float(ef.max()) if ef.size else 0
+
+    def _critical_std(self) -> float:
+        return math.sqrt(float(self.table.variance[self.table.critical].sum()))
 
     def _probability(self, time: int | float):
-        sum_v: float | int = 0
-        for task in self.tasks.values():
-            sum_v += task.variance if task.critical else 0
-        std_dev = math.sqrt(sum_v)
+        std_dev = self._critical_std()
         assert self.expected_time is not None
         z = (time - self.expected_time) / std_dev
-        self.expected_probability = scipy.stats.norm.cdf(z)
+        # standard normal CDF, scipy.stats is too slow to import for this
+        self.expected_probability = 0.5 * math.erfc(-z / math.sqrt(2))
 
     def _graph(self):
+        import networkx
+
         # record position
         class Position(TypedDict):
             x: int
             y: int
 
         self.graph = networkx.DiGraph()
-        buffer = queue.Queue()
+        buffer: deque[str] = deque()
         node_positions: dict[str, Position] = {}
         # param of networkx(tuple)
         position_map = {}
@@ -112,7 +165,7 @@ class PERT(TaskList):
         for task in self.tasks.values():
             if task.critical:
                 label = task.task_input.label
-                buffer.put(label)
+                buffer.append(label)
                 self.graph.add_node(label)
                 node_positions[label] = Position(x=x, y=0)
                 position_map[label] = (x, 0)
@@ -128,12 +181,12 @@ class PERT(TaskList):
         start = "#!start"  # a unique label in str
         self.graph.add_node(start)
         position_map[start] = (-3, 0)
-        self.graph.add_edge(start, buffer.queue[0], name=buffer.queue[0])
-        end = buffer.queue[-1]  # the last task in critical path
+        self.graph.add_edge(start, buffer[0], name=buffer[0])
+        end = buffer[-1]  # the last task in critical path
 
         dashed_edges = []
-        while not buffer.empty():
-            present = buffer.get()
+        while buffer:
+            present = buffer.popleft()
             next_tasks = self.tasks[present].next_task_label
             next_task_count = len(next_tasks)
 
@@ -158,7 +211,7 @@ class PERT(TaskList):
                     if task_range <= 0:
                         task_range -= 1
                     self.graph.add_edge(present, next_task, name=next_task)
-                    buffer.put(next_task)
+                    buffer.append(next_task)
                 else:
                     present_ef = self.tasks[present].earliest_finish
                     next_es = self.tasks[next_task].earliest_start
@@ -187,10 +240,9 @@ class PERT(TaskList):
                                 # connect last tasks
                                 self.graph.add_edge(present, next_task, name=next_task)
 
-        dashed_edges = [(u, v) for u, v in self.graph.edges if (u, v) in dashed_edges]
-        solid_edges = [
-            (u, v) for u, v in self.graph.edges if (u, v) not in dashed_edges
-        ]
+        dashed = set(dashed_edges)
+        dashed_edges = [(u, v) for u, v in self.graph.edges if (u, v) in dashed]
+        solid_edges = [(u, v) for u, v in self.graph.edges if (u, v) not in dashed]
         return GraphData(
             graph=self.graph,
             position_map=position_map,
@@ -198,21 +250,465 @@ class PERT(TaskList):
             solid_edges=solid_edges,
         )
 
-    def calculate_pert(self, time: int | float | None = None) -> PERTResult:
-        self._earliest_time()
-        self._latest_time()
-        self._slack_time()
-        self._critical()
-        self._expected_time()
-        if time:
-            self._probability(time=time)
-        self._critical_path()
-        graph_data = self._graph()
+    def calculate_pert(
+        self,
+        time: int | float | None = None,
+        layout: str = "layered",
+        capacities: Mapping[str, int | float] | None = None,
+        priority: str = "latest_start",
+        outputs: Iterable[str] | None = None,
+    ) -> PERTResult:
+        """
+        layout: "layered" for the linear-time layered layout,
+        "legacy" for the original PERT._graph layout
+        capacities: also make a resource-constrained schedule, see
+        schedule_resources
+        outputs: the parts of OUTPUTS the result can provide, all by default
+        Task rows and the layered layout are only built when first accessed,
+        the legacy layout reads the live tasks and is built right away
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}', use one of {LAYOUTS}")
+        outputs = set(OUTPUTS if outputs is None else outputs)
+        unknown = outputs - set(OUTPUTS)
+        if unknown:
+            raise ValueError(
+                f"Unknown output {', '.join(sorted(unknown))}, use {', '.join(OUTPUTS)}"
+            )
+        counts = {"tasks": len(self.table), "edges": self.table.graph.edge_count}
+        with phase("forward", **counts):
+            self._earliest_time()
+        with phase("backward", **counts):
+            self._latest_time()
+        with phase("critical_path", **counts):
+            self._slack_time()
+            self._critical()
+            self._expected_time()
+            self._time = time
+            if time:
+                self._probability(time=time)
+            self._critical_path()
+        resource_schedule = None
+        if capacities is not None:
+            with phase("resources", **counts):
+                resource_schedule = self.schedule_resources(capacities, priority)
+
+        with phase("result", tasks=counts["tasks"]):
+            # a snapshot, later updates of the tasks must not change the result
+            columns = TaskColumns.from_table(self.table) if outputs else None
+        graph_data = lazy_layout = None
+        if "graph" in outputs:
+            if layout == "legacy":
+                with phase("layout", **counts):
+                    graph_data = self._graph()
+            else:
+                engine = self.engine
+
+                def lazy_layout() -> GraphData:
+                    with phase("layout", **counts):
+                        return layered_layout(columns, engine)
 
-        return PERTResult(
-            tasks=[TaskOut.from_task(task) for task in self.tasks.values()],
+        split_lazily = None
+        if "components" in outputs:
+            engine, slack_tolerance = self.engine, self.slack_tolerance
+
+            def split_lazily() -> list[ComponentResult]:
+                with phase("components", **counts):
+                    return split_components(engine, columns, slack_tolerance)
+
+        return PERTResult.lazy(
             critical_path=self.critical_path,
             expected_duration=self.expected_time,
             expected_probability=self.expected_probability,
+            resource_schedule=resource_schedule,
+            columns=columns,
             graph_data=graph_data,
+            layout=lazy_layout,
+            split=split_lazily,
+        )
+
+    def components(self) -> list[ComponentResult]:
+        """
+        Duration, spread and critical path of every weakly connected
+        sub-network, each scheduled against its own end
+        calculate_pert is needed
+        """
+        if self.expected_time is None:
+            raise ValueError("calculate_pert is needed before components")
+        return split_components(self.engine, self.table, self.slack_tolerance)
+
+    def longest_paths(self, k: int = 1) -> list[PathResult]:
+        """
+        The k longest distinct paths through the plan, longest first, with
+        the duration and variance of each
+        Parallel critical chains come out as separate paths, near-critical
+        chains follow with the slack they have to the longest one
+        """
+        table = self.table
+        with phase("paths", tasks=len(table), edges=table.graph.edge_count):
+            paths = k_longest_paths(self.engine, table.estimate, table.variance, k)
+        if not paths:
+            return []
+        longest, labels = paths[0].duration, table.labels
+        return [
+            PathResult(
+                labels=[labels[i] for i in path.tasks],
+                duration=path.duration,
+                variance=path.variance,
+                std_duration=math.sqrt(path.variance),
+                slack=longest - path.duration,
+            )
+            for path in paths
+        ]
+
+    def schedule_resources(
+        self, capacities: Mapping[str, int | float], priority: str = "latest_start"
+    ) -> ResourceSchedule:
+        """
+        Make a feasible schedule in which no resource is used above its
+        capacity at any time, with the serial schedule generation scheme
+        Tasks are started in order of priority, one of PRIORITIES from the
+        CPM pass. Resources without a capacity are unlimited
+        The starts and finishes are kept in table.scheduled_start/_finish
+        calculate_pert is needed
+        """
+        if self.expected_time is None:
+            raise ValueError("calculate_pert is needed before schedule_resources")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', use one of {PRIORITIES}")
+        table = self.table
+        for resource, units in capacities.items():
+            if not (math.isfinite(units) and units > 0):
+                raise ValueError(
+                    f"Capacity of resource '{resource}' must be a positive number"
+                )
+        limited = [
+            r for r, name in enumerate(table.resource_names) if name in capacities
+        ]
+        demand = table.demand[:, limited]
+        capacity = np.array(
+            [capacities[table.resource_names[r]] for r in limited], dtype=np.float64
+        )
+        over = np.argwhere(demand > capacity)
+        if over.size:
+            i, r = over[0].tolist()
+            raise ValueError(
+                f"Task '{table.labels[i]}' needs {demand[i, r]:g} units of "
+                f"'{table.resource_names[limited[r]]}', the capacity is "
+                f"{capacity[r]:g}"
+            )
+
+        key = {
+            "latest_start": table.latest_start,
+            "latest_finish": table.latest_finish,
+            "slack": table.slack,
+            "earliest_start": table.earliest_start,
+        }[priority]
+        start = serial_sgs(
+            table.graph, table.estimate, demand, capacity, key, table.earliest_start
+        )
+        table.scheduled_start = start
+        table.scheduled_finish = start + table.estimate
+        duration = float(table.scheduled_finish.max()) if len(table) else 0.0
+        return ResourceSchedule(
+            priority=priority,
+            capacities={name: float(units) for name, units in capacities.items()},
+            duration=duration,
+            delay=duration - float(self.expected_time),
+        )
+
+    def probability_curve(
+        self,
+        deadlines: Sequence[int | float] = (),
+        confidence: Sequence[float] = (),
+    ) -> DeadlineCurve:
+        """
+        Probability of finishing by every deadline and the deadline met with
+        every confidence level, in (0, 1), in one vectorized pass over the
+        critical-path mean and variance
+        calculate_pert is needed
+        """
+        if self.expected_time is None:
+            raise ValueError("calculate_pert is needed before probability_curve")
+        times = np.asarray(deadlines, dtype=np.float64).ravel()
+        levels = np.asarray(confidence, dtype=np.float64).ravel()
+        if not np.isfinite(times).all():
+            raise ValueError("Deadlines must be finite numbers")
+        if not ((levels > 0) & (levels < 1)).all():
+            raise ValueError("Confidence levels must be between 0 and 1, exclusive")
+
+        mean, std = float(self.expected_time), self._critical_std()
+        if std > 0:
+            # scipy.special only, on the first call
+            from scipy.special import ndtr, ndtri
+
+            probabilities = ndtr((times - mean) / std)
+            quantiles = mean + std * ndtri(levels)
+        else:
+            # no uncertainty on the critical path, the end is certain
+            probabilities = (times >= mean).astype(np.float64)
+            quantiles = np.full(levels.shape, mean)
+
+        return DeadlineCurve(
+            expected_duration=mean,
+            std_duration=std,
+            deadlines=times.tolist(),
+            probabilities=probabilities.tolist(),
+            confidence=levels.tolist(),
+            quantiles=quantiles.tolist(),
+        )
+
+    def sensitivity(
+        self,
+        field: str = "pessimistic",
+        factors: Sequence[float] = (1.2,),
+        scenarios: dict[str, dict[str, float]] | None = None,
+        top: int | None = None,
+        chunk_size: int | None = None,
+    ) -> SensitivityResult:
+        """
+        Scale `field` of one task at a time by every factor and rank the tasks
+        by the change of the project duration, a tornado table
+        field: "optimistic", "most_likely", "pessimistic" or "all"
+        scenarios: name -> {label: factor}, each scaling several tasks at once
+        top: keep only the top tasks of the tornado table
+        calculate_pert is needed
+        """
+        if self.expected_time is None:
+            raise ValueError("calculate_pert is needed before sensitivity")
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field '{field}', use one of {FIELDS}")
+        factors = [float(factor) for factor in factors]
+        if not factors or not all(math.isfinite(f) and f >= 0 for f in factors):
+            raise ValueError("Factors must be finite numbers of at least 0")
+
+        table = self.table
+        estimates = (table.optimistic, table.most_likely, table.pessimistic)
+        baseline = float(self.expected_time)
+        durations = np.empty((len(table), len(factors)), dtype=np.float64)
+        for k, factor in enumerate(factors):
+            durations[:, k] = one_at_a_time(
+                self.engine,
+                table.estimate,
+                table.slack,
+                estimate_shift(field, factor, *estimates),
+                baseline,
+                chunk_size=chunk_size,
+            )
+        impact = np.abs(durations - baseline).max(axis=1)
+        ranked = np.argsort(-impact, kind="stable")[:top]
+
+        scenario_shifts = []
+        for name, scaled in (scenarios or {}).items():
+            for label in scaled:
+                if label not in table.index:
+                    raise ValueError(
+                        f"Task '{label}' in scenario '{name}' does not exist"
+                    )
+            tasks = np.array([table.index[label] for label in scaled], dtype=np.int64)
+            scale = np.array(list(scaled.values()), dtype=np.float64)
+            if not (np.isfinite(scale) & (scale >= 0)).all():
+                raise ValueError(
+                    f"Factors of scenario '{name}' must be finite numbers of at least 0"
+                )
+            shifts = estimate_shift(field, scale, *(e[tasks] for e in estimates))
+            scenario_shifts.append((tasks, shifts))
+        ends = scenario_ends(
+            self.engine, table.estimate, scenario_shifts, chunk_size=chunk_size
+        )
+
+        return SensitivityResult(
+            field=field,
+            factors=factors,
+            baseline_duration=baseline,
+            tornado=[
+                TornadoRow(
+                    label=table.labels[i],
+                    durations=durations[i].tolist(),
+                    impact=float(impact[i]),
+                )
+                for i in ranked.tolist()
+            ],
+            scenarios=dict(zip(scenarios or {}, ends.tolist())),
         )
+
+    def simulate(
+        self,
+        n_samples: int = 10000,
+        seed: int | None = None,
+        time: int | float | None = None,
+        percentiles: tuple[float, ...] = (5, 10, 25, 50, 75, 90, 95),
+        chunk_size: int | None = None,
+        workers: int | None = None,
+    ) -> SimulationResult:
+        """
+        Monte Carlo simulation with beta-PERT task durations
+        Unlike _probability, this accounts for every near-critical branch
+        workers: processes the sample chunks are spread over, one per CPU
+        by default
+        """
+        table = self.table
+        completion, critical_count = run_simulation(
+            self.engine,
+            table.optimistic,
+            table.most_likely,
+            table.pessimistic,
+            n_samples=n_samples,
+            seed=seed,
+            chunk_size=chunk_size,
+            workers=workers,
+        )
+        quantiles = np.percentile(completion, percentiles)
+
+        return SimulationResult(
+            n_samples=n_samples,
+            mean_duration=float(completion.mean()),
+            std_duration=float(completion.std()),
+            percentiles=dict(zip(map(float, percentiles), quantiles.tolist())),
+            criticality_index=dict(
+                zip(table.labels, (critical_count / n_samples).tolist())
+            ),
+            expected_probability=(
+                float(np.mean(completion <= time)) if time is not None else None
+            ),
+        )
+
+    def update_task(
+        self,
+        label: str,
+        optimistic: int | float | None = None,
+        most_likely: int | float | None = None,
+        pessimistic: int | float | None = None,
+        predecessors: list[str] | None = None,
+    ) -> list[str]:
+        """
+        Change the estimates and/or predecessors of one task and re-propagate
+        the schedule through its downstream and upstream cone only
+        New predecessors patch the graph and the engine's order around the
+        task, see CPMEngine.updated; a cone reaching many tasks falls back
+        to the vectorized full passes
+        calculate_pert is needed
+        Return the labels of the tasks whose schedule changed
+        """
+        table = self.table
+        if label not in table.index:
+            raise ValueError(f"Task '{label}' does not exist")
+        i = table.index[label]
+
+        update: dict = {}
+        if optimistic is not None:
+            update["optimistic_estimate"] = optimistic
+        if most_likely is not None:
+            update["most_likely_estimate"] = most_likely
+        if pessimistic is not None:
+            update["pessimistic_estimate"] = pessimistic
+        if predecessors is not None:
+            update["predecessors"] = predecessors
+        task_input = TaskInput(**{**table.task_input(i).model_dump(), **update})
+
+        old_predecessors = table.graph.predecessors(i).tolist()
+        if predecessors is not None:
+            for predecessor in predecessors:
+                if predecessor not in table.index:
+                    raise ValueError(
+                        f"Predecessor '{predecessor}' in task '{label}' does not exist"
+                    )
+            # raises on a cycle before anything is modified
+            self.engine = self._engine(
+                table.with_predecessors(i, predecessors), changed=i
+            )
+            table.graph = self.engine.graph
+
+        table.optimistic[i] = task_input.optimistic_estimate
+        table.most_likely[i] = task_input.most_likely_estimate
+        table.pessimistic[i] = task_input.pessimistic_estimate
+        self._estimate(i)
+
+        project_end = float(table.earliest_finish.max())
+        changed = self._propagate_forward(i)
+        if float(table.earliest_finish.max()) != project_end:
+            # the project end moved, so every latest time may move with it
+            old_ls = table.latest_start
+            table.latest_start, table.latest_finish = self.engine.backward(
+                table.estimate, float(table.earliest_finish.max())
+            )
+            moved = np.flatnonzero(old_ls != table.latest_start).tolist()
+            changed = sorted(set(changed).union(moved))
+        else:
+            seeds = {i, *old_predecessors}
+            seeds.update(table.graph.predecessors(i).tolist())
+            changed = sorted(set(changed) | self._propagate_backward(seeds))
+
+        table.slack[changed] = (
+            table.latest_start[changed] - table.earliest_start[changed]
+        )
+        table.critical[changed] = table.slack[changed] <= self._critical_slack()
+        self._expected_time()
+        self._critical_path()
+        if self._time:
+            self._probability(time=self._time)
+        # made for the old estimates, schedule_resources again if needed
+        table.scheduled_start = table.scheduled_finish = None
+        return [table.labels[j] for j in changed]
+
+    def _propagate_forward(self, start: int) -> list[int]:
+        graph, rank = self.engine.graph, self.engine.rank
+        duration = self.table.estimate
+        es_col, ef_col = self.table.earliest_start, self.table.earliest_finish
+        heap = [(int(rank[start]), start)]
+        queued = {start}
+        changed = []
+        budget = local_budget(len(self.table))
+        while heap:
+            if len(changed) > budget:
+                # the tasks visited so far are final, the pass redoes them
+                es_all, ef_all = self.engine.forward(duration)
+                moved = np.flatnonzero((es_all != es_col) | (ef_all != ef_col))
+                es_col[:], ef_col[:] = es_all, ef_all
+                return sorted(set(changed).union(moved.tolist()))
+            _, u = heapq.heappop(heap)
+            queued.discard(u)
+            preds = graph.predecessors(u)
+            es = float(ef_col[preds].max()) if preds.size else 0.0
+            ef = es + float(duration[u])
+            if u != start and es == es_col[u] and ef == ef_col[u]:
+                continue
+            es_col[u], ef_col[u] = es, ef
+            changed.append(u)
+            for s in graph.successors(u).tolist():
+                if s not in queued:
+                    queued.add(s)
+                    heapq.heappush(heap, (int(rank[s]), s))
+        return changed
+
+    def _propagate_backward(self, seeds: set[int]) -> set[int]:
+        graph, rank = self.engine.graph, self.engine.rank
+        duration = self.table.estimate
+        ls_col, lf_col = self.table.latest_start, self.table.latest_finish
+        project_end = float(self.table.earliest_finish.max())
+        # largest rank first, so successors are settled before predecessors
+        heap = [(-int(rank[u]), u) for u in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed = set()
+        budget = local_budget(len(self.table))
+        while heap:
+            if len(changed) > budget:
+                ls_all, lf_all = self.engine.backward(duration, project_end)
+                moved = np.flatnonzero((ls_all != ls_col) | (lf_all != lf_col))
+                ls_col[:], lf_col[:] = ls_all, lf_all
+                return changed.union(moved.tolist())
+            _, u = heapq.heappop(heap)
+            queued.discard(u)
+            succs = graph.successors(u)
+            lf = float(ls_col[succs].min()) if succs.size else project_end
+            ls = lf - float(duration[u])
+            if lf == lf_col[u] and ls == ls_col[u]:
+                continue
+            lf_col[u], ls_col[u] = lf, ls
+            changed.add(u)
+            for p in graph.predecessors(u).tolist():
+                if p not in queued:
+                    queued.add(p)
+                    heapq.heappush(heap, (-int(rank[p]), p))
+        return changed
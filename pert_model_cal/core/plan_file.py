@@ -0,0 +1,181 @@
+"""
+Compiled plan files
+
+A compiled plan holds a validated TaskTable as flat arrays: the labels
+and names interned into one UTF-8 blob each, the estimate columns, the
+resource demands and the CSR predecessor/successor arrays. The file is a
+fixed preamble, a JSON header describing every array, and the arrays
+themselves at 64-byte aligned offsets:
+
+    PERTPLAN | version u32 | reserved u32 | header length u64 | header | arrays
+
+Reading maps the file copy-on-write: the numeric columns stay views of the
+mapped pages, so processes loading the same plan share them and only pages
+a process writes to (PERT.update_task) are copied. No JSON parsing or
+pydantic validation happens on load, only the labels are decoded
+"""
+
+import os
+import json
+import struct
+from pathlib import Path
+import numpy as np
+from .cpm_engine import CSRGraph
+from .model.task_data import TaskTable
+
+MAGIC = b"PERTPLAN"
+VERSION = 1
+PREAMBLE = struct.Struct("<8sIIQ")
+ALIGN = 64
+EXTENSION = ".plan"
+
+
+def source_stamp(path: Path) -> dict:
+    """
+    What a plan compiled from path records about it, to detect changes
+    """
+    stat = path.stat()
+    return {"name": path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _intern(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    One UTF-8 blob and the character offsets of every string in it
+    """
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in strings], out=offsets[1:])
+    blob = np.frombuffer("".join(strings).encode("utf-8"), dtype=np.uint8)
+    return blob, offsets
+
+
+def _unintern(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    text = blob.tobytes().decode("utf-8")
+    bounds = offsets.tolist()
+    return [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def write_plan(table: TaskTable, path: Path, source: dict | None = None):
+    """
+    Write table to path, atomically so readers never map half a file
+    source: what the plan was compiled from, kept in the header
+    """
+    graph = table.graph
+    labels, label_offsets = _intern(table.labels)
+    names, name_offsets = _intern([name or "" for name in table.names])
+    arrays = {
+        "labels": labels,
+        "label_offsets": label_offsets,
+        "names": names,
+        "name_offsets": name_offsets,
+        "has_name": np.array([name is not None for name in table.names], dtype=bool),
+        "optimistic": table.optimistic,
+        "most_likely": table.most_likely,
+        "pessimistic": table.pessimistic,
+        "demand": table.demand,
+        "pred_offsets": graph.pred_offsets,
+        "pred_index": graph.pred_index,
+        "succ_offsets": graph.succ_offsets,
+        "succ_index": graph.succ_index,
+    }
+    arrays = {
+        key: np.ascontiguousarray(value, dtype=np.dtype(value.dtype).newbyteorder("<"))
+        for key, value in arrays.items()
+    }
+
+    header = {
+        "tasks": len(table),
+        "edges": graph.edge_count,
+        "resources": table.resource_names,
+        "source": source,
+        "arrays": {},
+    }
+    # offsets depend on the header length, which depends on the offsets:
+    # lay out relative to the first array, then shift by the padded header
+    relative = 0
+    for key, value in arrays.items():
+        header["arrays"][key] = {
+            "dtype": value.dtype.str,
+            "shape": list(value.shape),
+            "offset": relative,
+        }
+        relative += -(-value.nbytes // ALIGN) * ALIGN
+    encoded = json.dumps(header).encode("utf-8")
+    start = -(-(PREAMBLE.size + len(encoded)) // ALIGN) * ALIGN
+
+    partial = path.with_name(f".{path.name}.{os.getpid()}")
+    try:
+        with open(partial, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, VERSION, 0, len(encoded)))
+            f.write(encoded)
+            for key, value in arrays.items():
+                f.seek(start + header["arrays"][key]["offset"])
+                f.write(value.tobytes())
+            f.truncate(start + relative)
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def _read_header(f) -> tuple[dict, int]:
+    """
+    Return the header and the offset of the first array
+    """
+    preamble = f.read(PREAMBLE.size)
+    if len(preamble) != PREAMBLE.size:
+        raise ValueError("Not a compiled plan, the file is too short")
+    magic, version, _, length = PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise ValueError("Not a compiled plan")
+    if version != VERSION:
+        raise ValueError(f"Unsupported plan version {version}, expected {VERSION}")
+    header = json.loads(f.read(length))
+    return header, -(-(PREAMBLE.size + length) // ALIGN) * ALIGN
+
+
+def plan_header(path: Path) -> dict:
+    """
+    The header of a plan file, without mapping the arrays
+    """
+    with open(path, "rb") as f:
+        header, _ = _read_header(f)
+    return header
+
+
+def read_plan(path: Path) -> TaskTable:
+    """
+    Map a plan file copy-on-write and build its TaskTable
+    """
+    with open(path, "rb") as f:
+        header, start = _read_header(f)
+    buffer = np.memmap(path, dtype=np.uint8, mode="c")
+
+    def array(key: str) -> np.ndarray:
+        spec = header["arrays"][key]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        offset = start + spec["offset"]
+        if offset + count * dtype.itemsize > buffer.size:
+            raise ValueError("Compiled plan is truncated")
+        return (
+            buffer[offset : offset + count * dtype.itemsize]
+            .view(dtype)
+            .reshape(spec["shape"])
+        )
+
+    n = header["tasks"]
+    names = _unintern(array("names"), array("name_offsets"))
+    has_name = array("has_name").tolist()
+    return TaskTable(
+        labels=_unintern(array("labels"), array("label_offsets")),
+        names=[name if named else None for name, named in zip(names, has_name)],
+        estimates=(array("optimistic"), array("most_likely"), array("pessimistic")),
+        graph=CSRGraph(
+            n=n,
+            pred_offsets=array("pred_offsets"),
+            pred_index=array("pred_index"),
+            succ_offsets=array("succ_offsets"),
+            succ_index=array("succ_index"),
+        ),
+        resource_names=header["resources"],
+        demand=array("demand"),
+    )
@@ -0,0 +1,111 @@
+"""
+Lightweight per-phase instrumentation
+
+Code marks its phases with `with phase("forward", tasks=n, edges=m):`,
+counts only known at the end can be set on the yielded record. Nothing
+is recorded unless a Profiler is active in the current context, in which
+case the duration, the counts and, with trace_memory, the peak
+bytes allocated by tracemalloc during the phase are kept
+
+    with profile(trace_memory=True) as profiler:
+        ...
+    profiler.report()
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from collections.abc import Iterator
+
+
+@dataclass
+class PhaseRecord:
+    name: str
+    seconds: float
+    tasks: int | None = None
+    edges: int | None = None
+    # peak traced bytes above the start of the phase, None without tracing
+    allocated_bytes: int | None = None
+
+
+class Profiler:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records: list[PhaseRecord] = []
+        # peak bytes seen by every open phase, innermost last
+        self._peaks: list[int] = []
+
+    @contextmanager
+    def phase(
+        self, name: str, tasks: int | None = None, edges: int | None = None
+    ) -> Iterator[PhaseRecord]:
+        record = PhaseRecord(name, 0.0, tasks, edges)
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # hand the peak so far to the enclosing phase before resetting it
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append(current)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if tracing:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                record.allocated_bytes = max(0, peak - current)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                tracemalloc.reset_peak()
+            self.records.append(record)
+
+    def report(self) -> list[dict]:
+        return [asdict(record) for record in self.records]
+
+    def timings(self) -> dict[str, float]:
+        """
+        phase -> seconds, repeated phases are summed
+        """
+        timings: dict[str, float] = {}
+        for record in self.records:
+            timings[record.name] = timings.get(record.name, 0.0) + record.seconds
+        return timings
+
+
+_active: ContextVar[Profiler | None] = ContextVar("profiler", default=None)
+# yields a scratch record so callers can set counts unconditionally
+_disabled = nullcontext(PhaseRecord("disabled", 0.0))
+
+
+def phase(name: str, tasks: int | None = None, edges: int | None = None):
+    """
+    Context manager recording a phase on the active profiler, if any
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return _disabled
+    return profiler.phase(name, tasks=tasks, edges=edges)
+
+
+@contextmanager
+def profile(trace_memory: bool = False) -> Iterator[Profiler]:
+    """
+    Activate a new Profiler for the code in the with block
+    trace_memory starts tracemalloc for the block if it is not running,
+    which makes the profiled code noticeably slower
+    """
+    profiler = Profiler(trace_memory=trace_memory)
+    started = trace_memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+        if started:
+            tracemalloc.stop()
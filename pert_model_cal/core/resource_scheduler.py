@@ -0,0 +1,197 @@
+"""
+Resource-constrained scheduling
+
+Serial schedule generation: tasks whose predecessors are all scheduled
+wait in a heap ordered by a priority from the CPM pass (latest start,
+slack, ...) and the best one is started at the earliest time its
+predecessors are done and every resource it holds has enough free units
+for its whole duration.
+
+The free units of every resource are a step function over time, kept as
+sorted breakpoint arrays. Searches scan a few segments one by one and
+cross long booked stretches a chunk of segments at a time. No task can
+start before its unconstrained earliest start, so breakpoints before the
+smallest earliest start of the unscheduled tasks are dropped as the
+schedule advances.
+"""
+
+import heapq
+import numpy as np
+from .cpm_engine import CSRGraph
+
+# priority -> key from the CPM arrays, smallest first
+PRIORITIES = ("latest_start", "latest_finish", "slack", "earliest_start")
+# units of a resource that may be missing from a segment due to rounding
+UNIT_TOLERANCE = 1e-9
+# segments scanned one by one before a search switches to NumPy chunks
+SCAN_SEGMENTS = 16
+
+
+class _Profile:
+    """
+    Free units of one resource: free[k] from times[k] to times[k + 1] for
+    k < size, the last segment never ends and is always fully free
+    The arrays are allocated for every breakpoint the reservations can add
+    """
+
+    __slots__ = ("times", "free", "size", "lo")
+
+    def __init__(self, capacity: float, reservations: int):
+        self.times = np.empty(2 * reservations + 1, dtype=np.float64)
+        self.free = np.empty(2 * reservations + 1, dtype=np.float64)
+        self.times[0] = 0.0
+        self.free[0] = capacity
+        self.size = 1
+        # segments before lo are behind every remaining start
+        self.lo = 0
+
+    def earliest(self, start: float, duration: float, units: float) -> float:
+        """
+        Earliest time from start on with units free for duration
+        """
+        times, free, size, lo = self.times, self.free, self.size, self.lo
+        k = max(int(times[lo:size].searchsorted(start, "right")) - 1 + lo, lo)
+        need = units - UNIT_TOLERANCE
+        end = start + duration
+        # most searches end within a few segments
+        stop = min(k + SCAN_SEGMENTS, size)
+        while k < stop:
+            if times[k] >= end:
+                return start
+            if free[k] < need:
+                start = float(times[k + 1])
+                end = start + duration
+            k += 1
+        if k == size:
+            return start
+
+        # a long booked stretch: candidate starts are start and the end of
+        # every segment with too few units, checked a chunk at a time
+        width = 4 * SCAN_SEGMENTS
+        while True:
+            stop = min(k + width, size)
+            blocked = np.flatnonzero(free[k:stop] < need) + k
+            # the last segment is always free, so blocked + 1 < size
+            candidates = np.concatenate(([start], times[blocked + 1]))
+            # a candidate lasts until the next blocked segment
+            fits = times[blocked] - candidates[:-1] >= duration
+            if fits.any():
+                return float(candidates[fits.argmax()])
+            # the last candidate runs to the end of the chunk at least
+            start = float(candidates[-1])
+            if stop == size or times[stop] - start >= duration:
+                return start
+            k = stop
+            width *= 4
+
+    def reserve(self, start: float, end: float, units: float):
+        first = self._split(start)
+        last = self._split(end)
+        self.free[first:last] -= units
+
+    def _split(self, t: float) -> int:
+        """
+        Return the segment starting at t, splitting the one containing it
+        """
+        times, free, size = self.times, self.free, self.size
+        k = int(times[self.lo : size].searchsorted(t, "left")) + self.lo
+        if k < size and times[k] == t:
+            return k
+        if k < size:
+            times[k + 1 : size + 1] = times[k:size]
+            free[k + 1 : size + 1] = free[k:size]
+        times[k] = t
+        free[k] = free[k - 1]
+        self.size += 1
+        return k
+
+    def drop_before(self, t: float):
+        lo = self.lo
+        self.lo = max(
+            lo, int(self.times[lo : self.size].searchsorted(t, "right")) - 1 + lo
+        )
+        if self.lo > 1024 and 2 * self.lo > self.size:
+            remaining = self.size - self.lo
+            self.times[:remaining] = self.times[self.lo : self.size]
+            self.free[:remaining] = self.free[self.lo : self.size]
+            self.size = remaining
+            self.lo = 0
+
+
+def serial_sgs(
+    graph: CSRGraph,
+    duration: np.ndarray,
+    demand: np.ndarray,
+    capacity: np.ndarray,
+    priority: np.ndarray,
+    earliest_start: np.ndarray,
+) -> np.ndarray:
+    """
+    demand: (tasks, resources) units, none above the capacity
+    capacity: (resources,) units
+    priority: smaller is scheduled first, ties in input order
+    earliest_start: the unconstrained CPM earliest starts
+    Return the start of every task
+    """
+    n = graph.n
+
+    # sparse demands, only the resources a task holds are searched
+    task_ids, resource_ids = np.nonzero(demand)
+    uses: list[list[tuple[int, float]]] = [[] for _ in range(n)]
+    for i, r, units in zip(
+        task_ids.tolist(), resource_ids.tolist(), demand[task_ids, resource_ids]
+    ):
+        uses[i].append((r, float(units)))
+    reservations = np.bincount(resource_ids, minlength=capacity.size).tolist()
+    profiles = [_Profile(float(c), m) for c, m in zip(capacity.tolist(), reservations)]
+
+    durations = duration.tolist()
+    keys = priority.tolist()
+    succ_offsets = graph.succ_offsets.tolist()
+    succ_index = graph.succ_index.tolist()
+    waiting = np.diff(graph.pred_offsets).tolist()
+    ready = [0.0] * n
+    start = [0.0] * n
+    done = [False] * n
+    # tasks by earliest start, to find the lower bound of all later starts
+    by_earliest = np.argsort(earliest_start, kind="stable").tolist()
+    earliest = earliest_start.tolist()
+    lowest = 0
+
+    heap = [(keys[i], i) for i in range(n) if waiting[i] == 0]
+    heapq.heapify(heap)
+    scheduled = 0
+    while heap:
+        _, j = heapq.heappop(heap)
+        t, d = ready[j], durations[j]
+        if uses[j]:
+            # move t until every resource agrees
+            moved = True
+            while moved:
+                moved = False
+                for r, units in uses[j]:
+                    s = profiles[r].earliest(t, d, units)
+                    if s > t:
+                        t, moved = s, True
+            for r, units in uses[j]:
+                profiles[r].reserve(t, t + d, units)
+        start[j] = t
+        done[j] = True
+        finish = t + d
+        for k in succ_index[succ_offsets[j] : succ_offsets[j + 1]]:
+            if finish > ready[k]:
+                ready[k] = finish
+            waiting[k] -= 1
+            if waiting[k] == 0:
+                heapq.heappush(heap, (keys[k], k))
+
+        scheduled += 1
+        if scheduled % 256 == 0:
+            while lowest < n and done[by_earliest[lowest]]:
+                lowest += 1
+            if lowest < n:
+                bound = earliest[by_earliest[lowest]]
+                for profile in profiles:
+                    profile.drop_before(bound)
+
+    return np.array(start, dtype=np.float64)
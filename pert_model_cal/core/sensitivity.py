@@ -0,0 +1,102 @@
+"""
+What-if sweeps over task estimates
+
+A perturbation scales one estimate (or all three) of some tasks by a
+factor. The PERT estimate (o + 4m + p) / 6 is linear in the estimates, so
+every perturbation is a shift of the expected durations, and a family of
+scenarios is a (tasks, scenarios) duration block pushed through one
+CPMEngine.forward, in chunks so memory stays bounded.
+
+Per-task sweeps need a pass for few tasks only: lengthening a task by d
+moves the project end by max(0, d - slack), and shortening a task with
+slack leaves it unchanged. Only critical tasks that get shorter are
+evaluated, in batches.
+"""
+
+from collections.abc import Iterable
+import numpy as np
+from .cpm_engine import SLACK_TOLERANCE, CPMEngine
+
+# number of float64 cells in one (tasks, scenarios) block, ~32MB per array
+CHUNK_CELLS = 1 << 22
+# weight of every estimate in the PERT estimate, "all" scales all three
+FIELD_WEIGHTS = {"optimistic": 1 / 6, "most_likely": 4 / 6, "pessimistic": 1 / 6}
+FIELDS = (*FIELD_WEIGHTS, "all")
+
+
+def estimate_shift(
+    field: str,
+    factor: float | np.ndarray,
+    optimistic: np.ndarray,
+    most_likely: np.ndarray,
+    pessimistic: np.ndarray,
+) -> np.ndarray:
+    """
+    Change of every PERT estimate when `field` of every task is scaled by
+    factor, a scalar or one factor per task
+    """
+    if field not in FIELDS:
+        raise ValueError(f"Unknown field '{field}', use one of {FIELDS}")
+    if field == "all":
+        base = (optimistic + 4 * most_likely + pessimistic) / 6
+    else:
+        values = {
+            "optimistic": optimistic,
+            "most_likely": most_likely,
+            "pessimistic": pessimistic,
+        }[field]
+        base = FIELD_WEIGHTS[field] * values
+    return base * (factor - 1)
+
+
+def scenario_ends(
+    engine: CPMEngine,
+    estimate: np.ndarray,
+    scenarios: Iterable[tuple[np.ndarray, np.ndarray]],
+    chunk_size: int | None = None,
+) -> np.ndarray:
+    """
+    scenarios: (task ids, shifts) per scenario, tasks not listed are unchanged
+    Return the project end of every scenario
+    """
+    scenarios = list(scenarios)
+    n = engine.graph.n
+    ends = np.zeros(len(scenarios), dtype=np.float64)
+    if n == 0:
+        return ends
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_CELLS // n)
+    for start in range(0, len(scenarios), chunk_size):
+        chunk = scenarios[start : start + chunk_size]
+        duration = np.repeat(estimate[:, None], len(chunk), axis=1)
+        for column, (tasks, shifts) in enumerate(chunk):
+            duration[tasks, column] += shifts
+        _, ef = engine.forward(duration)
+        ends[start : start + len(chunk)] = ef.max(axis=0)
+    return ends
+
+
+def one_at_a_time(
+    engine: CPMEngine,
+    estimate: np.ndarray,
+    slack: np.ndarray,
+    shift: np.ndarray,
+    project_end: float,
+    chunk_size: int | None = None,
+) -> np.ndarray:
+    """
+    Return the project end when only task i is shifted by shift[i], for every i
+    slack and project_end are those of the unshifted schedule
+    """
+    # exact for longer tasks and for shorter tasks with slack
+    ends = project_end + np.maximum(shift - slack, 0)
+
+    critical = slack <= SLACK_TOLERANCE * max(project_end, 1.0)
+    todo = np.flatnonzero((shift < 0) & critical)
+    ends[todo] = scenario_ends(
+        engine,
+        estimate,
+        ((np.array([i]), shift[i : i + 1]) for i in todo.tolist()),
+        chunk_size=chunk_size,
+    )
+    return ends
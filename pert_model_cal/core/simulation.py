@@ -0,0 +1,117 @@
+"""
+Monte Carlo schedule simulation
+
+Durations are drawn from the beta-PERT distribution of every task as a
+(tasks, samples) block and pushed through the CPMEngine passes for all
+samples at once. Samples are processed in chunks so memory stays bounded,
+and the chunks are spread over a process pool, one worker per CPU unless
+told otherwise.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .cpm_engine import SLACK_TOLERANCE, CPMEngine
+
+# number of float64 cells in one (tasks, samples) chunk, ~32MB per array
+CHUNK_CELLS = 1 << 22
+
+_worker_state: dict = {}
+
+
+def beta_pert_params(
+    optimistic: np.ndarray, most_likely: np.ndarray, pessimistic: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return (low, span, alpha, beta) of the beta-PERT distribution
+    duration = low + span * Beta(alpha, beta)
+    """
+    low = np.minimum(optimistic, pessimistic).astype(np.float64)
+    high = np.maximum(optimistic, pessimistic).astype(np.float64)
+    span = high - low
+    mode = np.clip(most_likely, low, high)
+    # degenerate tasks (o == p) keep a constant duration, any shape works
+    safe_span = np.where(span > 0, span, 1.0)
+    alpha = 1 + 4 * (mode - low) / safe_span
+    beta = 1 + 4 * (high - mode) / safe_span
+    return low, span, alpha, beta
+
+
+def simulate_chunk(
+    engine: CPMEngine,
+    params: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    n_samples: int,
+    seed: np.random.SeedSequence,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate one chunk
+    Return (completion time per sample, critical count per task)
+    """
+    low, span, alpha, beta = params
+    rng = np.random.default_rng(seed)
+    shape = (low.size, n_samples)
+    duration = rng.beta(alpha[:, None], beta[:, None], size=shape)
+    duration *= span[:, None]
+    duration += low[:, None]
+
+    es, ef = engine.forward(duration)
+    completion = ef.max(axis=0)
+    ls, _ = engine.backward(duration, completion)
+    ls -= es
+    critical = ls <= SLACK_TOLERANCE * np.maximum(completion, 1.0)
+    return completion, critical.sum(axis=1)
+
+
+def _init_worker(engine: CPMEngine, params: tuple) -> None:
+    _worker_state["engine"] = engine
+    _worker_state["params"] = params
+
+
+def _run_worker_chunk(n_samples: int, seed: np.random.SeedSequence):
+    return simulate_chunk(
+        _worker_state["engine"], _worker_state["params"], n_samples, seed
+    )
+
+
+def run_simulation(
+    engine: CPMEngine,
+    optimistic: np.ndarray,
+    most_likely: np.ndarray,
+    pessimistic: np.ndarray,
+    n_samples: int,
+    seed: int | None = None,
+    chunk_size: int | None = None,
+    workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (completion times of all samples, critical count per task)
+    workers: processes sharing the chunks, one per CPU by default, 1 runs
+    them in this process
+    The result only depends on seed and chunk_size, not on workers
+    """
+    if n_samples <= 0:
+        raise ValueError("n_samples must be positive")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    params = beta_pert_params(optimistic, most_likely, pessimistic)
+    n_tasks = max(engine.graph.n, 1)
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_CELLS // n_tasks)
+    sizes = [min(chunk_size, n_samples - i) for i in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(sizes)),
+            initializer=_init_worker,
+            initargs=(engine, params),
+        ) as executor:
+            results = list(executor.map(_run_worker_chunk, sizes, seeds))
+    else:
+        results = [
+            simulate_chunk(engine, params, size, s) for size, s in zip(sizes, seeds)
+        ]
+
+    completion = np.concatenate([r[0] for r in results])
+    critical_count = np.sum([r[1] for r in results], axis=0)
+    return completion, critical_count
@@ -0,0 +1,151 @@
+"""
+Validation of a whole task list in one pass
+
+Instead of stopping at the first problem, every label defined more than
+once, every predecessor that does not exist and every dependency cycle is
+reported, cycles as paths of labels. Labels are resolved with one dict and
+the cycle search is linear in tasks and edges (see find_cycles), so even
+large configs are checked long before a calculation would finish
+"""
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+import numpy as np
+from .cpm_engine import CSRGraph, find_cycles
+from .model.input import TaskInput
+
+# errors listed in a message, the rest are counted
+MAX_ERRORS = 20
+# labels of a long cycle shown before it is cut short
+MAX_CYCLE_LABELS = 12
+
+
+@dataclass
+class ValidationReport:
+    tasks: int
+    edges: int
+    # labels defined more than once
+    duplicates: list[str] = field(default_factory=list)
+    # (task, predecessor) of every predecessor that does not exist
+    missing: list[tuple[str, str]] = field(default_factory=list)
+    # one cycle per strongly connected component, first label repeated last
+    cycles: list[list[str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.duplicates or self.missing or self.cycles)
+
+    def errors(self) -> list[str]:
+        return (
+            [f"Duplicate task label '{label}'" for label in self.duplicates]
+            + [
+                f"Predecessor '{predecessor}' in task '{label}' does not exist"
+                for label, predecessor in self.missing
+            ]
+            + [_cycle_error(cycle) for cycle in self.cycles]
+        )
+
+    def message(self, limit: int = MAX_ERRORS) -> str:
+        errors = self.errors()
+        message = "; ".join(errors[:limit])
+        if len(errors) > limit:
+            message += f"; and {len(errors) - limit} more"
+        return message
+
+
+def _cycle_error(cycle: list[str]) -> str:
+    if len(cycle) <= MAX_CYCLE_LABELS:
+        return f"Cycle {' -> '.join(cycle)}"
+    shown = " -> ".join(cycle[: MAX_CYCLE_LABELS - 1])
+    return f"Cycle of {len(cycle) - 1} tasks {shown} -> ... -> {cycle[-1]}"
+
+
+def cycle_labels(labels: list[str], cycles: list[list[int]]) -> list[list[str]]:
+    return [[labels[i] for i in cycle] for cycle in cycles]
+
+
+def validate_graph(
+    labels: list[str],
+    pred_labels: list[str],
+    pred_counts: list[int],
+    check_cycles: bool = True,
+) -> tuple[ValidationReport, CSRGraph]:
+    """
+    pred_labels: predecessor labels of all tasks, flattened
+    pred_counts: number of predecessors of every task
+    Return the report and the graph of the edges that resolve, a duplicate
+    label resolves to its first task
+    """
+    index: dict[str, int] = {}
+    duplicates: dict[str, None] = {}
+    for i, label in enumerate(labels):
+        if index.setdefault(label, i) != i:
+            duplicates[label] = None
+
+    dst = np.repeat(np.arange(len(labels), dtype=np.int64), pred_counts)
+    src = np.fromiter(
+        (index.get(p, -1) for p in pred_labels), dtype=np.int64, count=len(pred_labels)
+    )
+    unknown = src < 0
+    missing = [
+        (labels[i], pred_labels[k])
+        for k, i in zip(
+            np.flatnonzero(unknown).tolist(), dst[unknown].tolist(), strict=True
+        )
+    ]
+    graph = CSRGraph.from_edges(len(labels), src[~unknown], dst[~unknown])
+
+    report = ValidationReport(
+        tasks=len(labels),
+        edges=len(pred_labels),
+        duplicates=list(duplicates),
+        missing=missing,
+    )
+    if check_cycles:
+        report.cycles = cycle_labels(labels, find_cycles(graph))
+    return report, graph
+
+
+class _Collector:
+    """
+    Keeps the labels and predecessors of TaskInput batches passing through
+    """
+
+    def __init__(self):
+        self.labels: list[str] = []
+        self.pred_labels: list[str] = []
+        self.pred_counts: list[int] = []
+
+    def add(self, batch: list[TaskInput]):
+        for task_input in batch:
+            predecessors = task_input.predecessors or []
+            self.labels.append(task_input.label)
+            self.pred_labels.extend(predecessors)
+            self.pred_counts.append(len(predecessors))
+
+    def report(self) -> ValidationReport:
+        report, _ = validate_graph(self.labels, self.pred_labels, self.pred_counts)
+        return report
+
+
+def validate_inputs(batches: Iterable[list[TaskInput]]) -> ValidationReport:
+    collector = _Collector()
+    for batch in batches:
+        collector.add(batch)
+    return collector.report()
+
+
+def checked_batches(
+    batches: Iterable[list[TaskInput]],
+) -> Iterator[list[TaskInput]]:
+    """
+    Yield the batches unchanged, then raise ValueError if the tasks do not
+    form a valid DAG, so a consumer can validate while it reads
+    """
+    collector = _Collector()
+    for batch in batches:
+        collector.add(batch)
+        yield batch
+    report = collector.report()
+    if not report.ok:
+        raise ValueError(report.message())
@@ -0,0 +1,3 @@
+from .store import ConfigStore
+
+__all__ = ["ConfigStore"]
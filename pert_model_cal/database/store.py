@@ -0,0 +1,248 @@
+import json
+import sqlite3
+import logging
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from ..core.model.input import TaskInput
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE,
+    timestamp INTEGER NOT NULL,
+    filename TEXT,
+    task_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_configs_name ON configs (name);
+CREATE INDEX IF NOT EXISTS idx_configs_timestamp ON configs (timestamp);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    config_id INTEGER NOT NULL REFERENCES configs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    name TEXT,
+    optimistic_estimate REAL NOT NULL,
+    most_likely_estimate REAL NOT NULL,
+    pessimistic_estimate REAL NOT NULL,
+    predecessors TEXT NOT NULL,
+    resources TEXT,
+    PRIMARY KEY (config_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_label ON tasks (config_id, label);
+
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    config_id INTEGER NOT NULL REFERENCES configs (id) ON DELETE CASCADE,
+    cache_key TEXT,
+    expected_time REAL,
+    expected_duration REAL,
+    expected_probability REAL,
+    critical_path TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_config ON results (config_id, created_at);
+"""
+
+# task fields updating_task may change
+TASK_COLUMNS = (
+    "optimistic_estimate",
+    "most_likely_estimate",
+    "pessimistic_estimate",
+    "predecessors",
+)
+
+
+class ConfigStore:
+    """
+    SQLite store of uploaded configs, their parsed task rows and results
+    WAL mode lets readers run while an upload is being written.
+    Every call opens its own connection, so the store can be shared
+    between requests and threads
+    """
+
+    def __init__(self, db_path: Path, legacy_index: Path | None = None):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        if legacy_index is not None:
+            self._import_legacy_index(legacy_index)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _import_legacy_index(self, legacy_index: Path):
+        """
+        Take over cache/config_info.json written by older versions, once
+        """
+        if not legacy_index.exists():
+            return
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM configs LIMIT 1").fetchone():
+                return
+            with open(legacy_index, "r") as f:
+                config_data = json.load(f)
+            conn.executemany(
+                "INSERT OR IGNORE INTO configs (name, timestamp) VALUES (?, ?)",
+                [(c["name"], c["timestamp"]) for c in config_data],
+            )
+        logger.info(f"Imported {len(config_data)} configs from {legacy_index}")
+
+    def add_config(
+        self,
+        timestamp: int,
+        batches: Iterable[list[TaskInput]],
+        filename: str | None = None,
+    ) -> str:
+        """
+        Insert a config with its task rows in one transaction
+        Return the config name, config_<timestamp>_<id>, unique even for
+        uploads in the same second
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO configs (timestamp, filename) VALUES (?, ?)",
+                (timestamp, filename),
+            )
+            config_id = cursor.lastrowid
+            name = f"config_{timestamp}_{config_id}"
+            position = 0
+            for batch in batches:
+                conn.executemany(
+                    "INSERT INTO tasks (config_id, position, label, name, "
+                    "optimistic_estimate, most_likely_estimate, "
+                    "pessimistic_estimate, predecessors, resources) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            config_id,
+                            position + i,
+                            t.label,
+                            t.name,
+                            t.optimistic_estimate,
+                            t.most_likely_estimate,
+                            t.pessimistic_estimate,
+                            json.dumps(t.predecessors or []),
+                            json.dumps(t.resources) if t.resources else None,
+                        )
+                        for i, t in enumerate(batch)
+                    ],
+                )
+                position += len(batch)
+            conn.execute(
+                "UPDATE configs SET name = ?, task_count = ? WHERE id = ?",
+                (name, position, config_id),
+            )
+        return name
+
+    def list_configs(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        name: str | None = None,
+        since: int | None = None,
+        until: int | None = None,
+        descending: bool = True,
+    ) -> tuple[list[dict], int]:
+        """
+        Return one page of configs and the total number matching the filters
+        name: substring of the config name
+        since/until: timestamp range, inclusive
+        """
+        where, params = ["name IS NOT NULL"], []
+        if name:
+            where.append("name LIKE ? ESCAPE '\\'")
+            pattern = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{pattern}%")
+        if since is not None:
+            where.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("timestamp <= ?")
+            params.append(until)
+        condition = " AND ".join(where)
+        order = "DESC" if descending else "ASC"
+
+        with self._connect() as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM configs WHERE {condition}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT name, timestamp, filename, task_count FROM configs "
+                f"WHERE {condition} ORDER BY timestamp {order}, id {order} "
+                f"LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def iter_tasks(self, name: str) -> Iterator[dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT t.* FROM tasks t JOIN configs c ON c.id = t.config_id "
+                "WHERE c.name = ? ORDER BY t.position",
+                (name,),
+            )
+            for row in rows:
+                task = dict(row)
+                task["predecessors"] = json.loads(task["predecessors"])
+                if task["resources"] is not None:
+                    task["resources"] = json.loads(task["resources"])
+                del task["config_id"], task["position"]
+                yield task
+
+    @contextmanager
+    def updating_task(self, name: str, label: str, update: dict) -> Iterator[None]:
+        """
+        Apply update, task fields by column name, to the row of one task
+        The change is committed when the block exits and rolled back if it
+        raises, so the row changes together with the config file
+        """
+        columns = [column for column in TASK_COLUMNS if column in update]
+        values = [
+            json.dumps(update[c]) if c == "predecessors" else update[c] for c in columns
+        ]
+        with self._connect() as conn:
+            if columns:
+                conn.execute(
+                    f"UPDATE tasks SET {', '.join(f'{c} = ?' for c in columns)} "
+                    "WHERE label = ? AND config_id = "
+                    "(SELECT id FROM configs WHERE name = ?)",
+                    [*values, label, name],
+                )
+            yield
+
+    def add_result(
+        self,
+        name: str,
+        created_at: float,
+        result: dict,
+        expected_time: int | float | None = None,
+        cache_key: str | None = None,
+    ):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO results (config_id, cache_key, expected_time, "
+                "expected_duration, expected_probability, critical_path, created_at) "
+                "SELECT id, ?, ?, ?, ?, ?, ? FROM configs WHERE name = ?",
+                (
+                    cache_key,
+                    expected_time,
+                    result.get("expected_duration"),
+                    result.get("expected_probability"),
+                    json.dumps(result.get("critical_path")),
+                    created_at,
+                    name,
+                ),
+            )
@@ -0,0 +1,159 @@
+"""
+Precompressed artifacts and conditional downloads
+
+Next to every text artifact a gzip copy (.gz) and, when the zstandard
+package is installed, a zstd copy (.zst) are written once. Downloads pick
+the best encoding the client accepts and carry ETag/Last-Modified, so
+polling clients get 304 Not Modified instead of the file
+"""
+
+import os
+import gzip
+import shutil
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # imported lazily, the CLI precompresses without loading fastapi
+    from fastapi import Request
+    from fastapi.responses import Response
+
+# preferred first: encoding name -> file suffix
+ENCODINGS = {"zstd": ".zst", "gzip": ".gz"}
+# artifacts worth compressing, xlsx is a zip already
+COMPRESSIBLE = (".csv", ".svg", ".json")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "svg": "image/svg+xml",
+    "json": "application/json",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _write_atomic(target: Path, write):
+    partial = target.with_name(f".{target.name}.{os.getpid()}")
+    try:
+        with open(partial, "wb") as f:
+            write(f)
+        os.replace(partial, target)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def precompress(path: Path):
+    """
+    Write the compressed copies of path, stale copies are removed
+    """
+    if path.suffix not in COMPRESSIBLE:
+        return
+
+    def write_gzip(f):
+        # mtime=0 so equal content gives equal bytes
+        with open(path, "rb") as source, gzip.GzipFile(
+            fileobj=f, mode="wb", compresslevel=6, mtime=0
+        ) as target:
+            shutil.copyfileobj(source, target, 1 << 20)
+
+    _write_atomic(compressed_path(path, "gzip"), write_gzip)
+
+    try:
+        import zstandard
+    except ImportError:
+        compressed_path(path, "zstd").unlink(missing_ok=True)
+        return
+
+    def write_zstd(f):
+        with open(path, "rb") as source:
+            zstandard.ZstdCompressor(level=10).copy_stream(source, f)
+
+    _write_atomic(compressed_path(path, "zstd"), write_zstd)
+
+
+def compressed_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + ENCODINGS[encoding])
+
+
+def variants(path: Path) -> list[Path]:
+    """
+    path and every compressed copy it may have
+    """
+    return [path] + [compressed_path(path, encoding) for encoding in ENCODINGS]
+
+
+def accepted_encodings(request: "Request") -> set[str]:
+    accepted = set()
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def etag(stat: os.stat_result, encoding: str | None = None) -> str:
+    tag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def not_modified(request: "Request", tags: list[str], mtime: float) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when it is absent
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return any(tag in candidates for tag in tags)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+def artifact_response(
+    request: "Request", path: Path, filename: str | None = None
+) -> "Response":
+    """
+    Serve path with its content type, the best precompressed copy the client
+    accepts, ETag/Last-Modified, and 304 for matching conditional requests
+    """
+    from fastapi.responses import FileResponse, Response
+
+    stat = path.stat()
+    media_type = CONTENT_TYPES.get(path.suffix.lstrip("."), "application/octet-stream")
+    headers = {
+        "Cache-Control": "no-cache",
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+    }
+    if path.suffix in COMPRESSIBLE:
+        headers["Vary"] = "Accept-Encoding"
+
+    accepted = accepted_encodings(request)
+    serve, encoding = path, None
+    for name in ENCODINGS:
+        candidate = compressed_path(path, name)
+        if name not in accepted or not candidate.exists():
+            continue
+        # a copy older than the artifact is stale
+        if candidate.stat().st_mtime_ns < stat.st_mtime_ns:
+            continue
+        serve, encoding = candidate, name
+        break
+
+    headers["ETag"] = etag(stat, encoding)
+    # every representation of an unchanged file counts as a match
+    all_tags = [etag(stat)] + [etag(stat, name) for name in ENCODINGS]
+    if not_modified(request, all_tags, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(
+        serve, media_type=media_type, headers=headers, filename=filename
+    )
@@ -0,0 +1,189 @@
+"""
+Batch calculation of many task files
+
+Paths may be files, directories (every *.json file in them) or glob
+patterns. The files are calculated on one process pool, so interpreter
+start-up and imports are paid once per worker instead of once per file.
+Every file writes its tables and graph to a result directory of its own,
+and a file that fails only fails its own row of the summary
+"""
+
+import glob
+import time
+import logging
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from .cli_handler import CLIHandler
+
+logger = logging.getLogger(__name__)
+
+GLOB_CHARS = "*?["
+
+
+@dataclass
+class BatchOptions:
+    """
+    The calculate options applied to every file
+    """
+
+    probability: int | float | None = None
+    layout: str = "layered"
+    renderer: str = "svg"
+    save_graph: bool = False
+    # tables are written, never printed, in a batch
+    write_tables: bool = False
+    table_format: list[str] = field(default_factory=lambda: ["csv"])
+    capacities: dict[str, float] | None = None
+    priority: str = "latest_start"
+    slack_tolerance: float = 0
+
+
+def is_batch(patterns: list[str]) -> bool:
+    """
+    More than one path, a directory or a glob pattern
+    """
+    if len(patterns) != 1:
+        return True
+    pattern = patterns[0]
+    return any(c in pattern for c in GLOB_CHARS) or Path(pattern).is_dir()
+
+
+def expand_paths(patterns: Iterable[str]) -> list[Path]:
+    """
+    The files of every pattern in order, each file once
+    Raise ValueError for a pattern that matches no file
+    """
+    files: dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.glob("*.json"))
+        elif any(c in pattern for c in GLOB_CHARS):
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+        else:
+            matches = [path] if path.exists() else []
+        matches = [match for match in matches if match.is_file()]
+        if not matches:
+            raise ValueError(f"No task file matches '{pattern}'")
+        for match in matches:
+            files.setdefault(match.resolve(), None)
+    return list(files)
+
+
+def result_dirs(paths: list[Path], root: Path) -> list[Path]:
+    """
+    root/<file stem> for every file, numbered when stems repeat
+    """
+    seen: dict[str, int] = {}
+    dirs = []
+    for path in paths:
+        count = seen.get(path.stem, 0)
+        seen[path.stem] = count + 1
+        dirs.append(root / (path.stem if count == 0 else f"{path.stem}_{count + 1}"))
+    return dirs
+
+
+def calculate_file(json_path: Path, result_dir: Path, options: BatchOptions) -> dict:
+    """
+    Calculate one file and write its outputs, runs in a worker process
+    Return its summary row, failures included
+    """
+    started = time.perf_counter()
+    row = {
+        "file": str(json_path),
+        "result_dir": str(result_dir),
+        "status": "failed",
+        "tasks": None,
+        "expected_duration": None,
+        "expected_probability": None,
+        "scheduled_duration": None,
+        "error": None,
+    }
+    try:
+        handler = CLIHandler(
+            json_path,
+            save_graph=options.save_graph,
+            show_table=options.write_tables,
+            table_format=options.table_format,
+            result_dir=result_dir,
+            slack_tolerance=options.slack_tolerance,
+        )
+        result = handler.calculate_pert(
+            time=options.probability,
+            layout=options.layout,
+            capacities=options.capacities,
+            priority=options.priority,
+        )
+        if options.write_tables:
+            handler.generate_table(print_tables=False)
+        if options.save_graph:
+            handler.generate_graph_svg(renderer=options.renderer)
+    except Exception as e:
+        logger.debug("Calculating %s failed", json_path, exc_info=True)
+        row["error"] = str(e) or type(e).__name__
+    else:
+        probability = result.expected_probability
+        row.update(
+            status="done",
+            tasks=len(handler.pert.table),
+            expected_duration=result.expected_duration,
+            expected_probability=(
+                float(probability) if probability is not None else None
+            ),
+            scheduled_duration=(
+                result.resource_schedule.duration
+                if result.resource_schedule is not None
+                else None
+            ),
+        )
+    row["seconds"] = time.perf_counter() - started
+    return row
+
+
+def run_batch(
+    paths: list[Path],
+    root: Path,
+    options: BatchOptions,
+    workers: int = 1,
+    on_done: Callable[[dict], None] | None = None,
+) -> list[dict]:
+    """
+    Calculate every file on a pool of workers, on_done(row) is called as
+    each file finishes
+    Return the summary rows in the order of paths
+    """
+    dirs = result_dirs(paths, root)
+    if workers <= 1 or len(paths) == 1:
+        rows = []
+        for path, result_dir in zip(paths, dirs):
+            rows.append(calculate_file(path, result_dir, options))
+            if on_done is not None:
+                on_done(rows[-1])
+        return rows
+
+    finished: list[tuple[int, dict]] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        futures = {
+            executor.submit(calculate_file, path, result_dir, options): position
+            for position, (path, result_dir) in enumerate(zip(paths, dirs))
+        }
+        # on_done reports files as they finish, not in the order of paths
+        for future in as_completed(futures):
+            position = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                # the worker itself died, e.g. killed for running out of memory
+                row = {
+                    "file": str(paths[position]),
+                    "result_dir": str(dirs[position]),
+                    "status": "failed",
+                    "error": str(e) or type(e).__name__,
+                }
+            finished.append((position, row))
+            if on_done is not None:
+                on_done(row)
+    finished.sort(key=lambda item: item[0])
+    return [row for _, row in finished]
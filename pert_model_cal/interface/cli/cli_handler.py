@@ -1,52 +1,321 @@
+import math
 import logging
 from pathlib import Path
-from ...core.model.output import PERTResult
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from ...core.model.output import PERTResult, SensitivityResult
 from ...core.pert_calculator import PERT
+from ...core.profiling import Profiler
+from ...core.validation import ValidationReport
 from ..functions import IOUtils
 
 logger = logging.getLogger(__name__)
 
 
 class CLIHandler:
+    """
+    One task file: its PERT instance, the latest result and where it goes
+    """
+
     pert: PERT
-    pert_result: PERTResult
+    pert_result: PERTResult | None
     save_graph: bool
     show_table: bool
     table_format: list[str]
     result_dir: Path
 
-    @classmethod
-    def init(
-        cls,
-        json_path: str,
+    def __init__(
+        self,
+        json_path: str | Path,
         save_graph: bool = True,
         show_table: bool = True,
-        table_format: list[str] = ["csv"],
+        table_format: list[str] | None = None,
+        result_dir: Path | None = None,
+        slack_tolerance: float = 0,
     ):
-        cls.save_graph = save_graph
-        cls.show_table = show_table
-        cls.table_format = table_format
-        task_list = IOUtils.load_tasks_from_json(json_path)
-        cls.pert = PERT(tasks=task_list)
-        cls.result_dir = IOUtils.create_dir("result")
+        self.save_graph = save_graph
+        self.show_table = show_table
+        self.table_format = table_format or ["csv"]
+        task_list = IOUtils.load_tasks(json_path)
+        self.pert = PERT(tasks=task_list, slack_tolerance=slack_tolerance)
+        self.pert_result = None
+        if result_dir is None:
+            self.result_dir = IOUtils.create_dir("result")
+        else:
+            result_dir.mkdir(parents=True, exist_ok=True)
+            self.result_dir = result_dir
 
-    @classmethod
-    def calculate_pert(cls, time: int | float | None):
-        cls.pert_result = cls.pert.calculate_pert(time)
+    def calculate_pert(
+        self,
+        time: int | float | None,
+        layout: str = "layered",
+        capacities: dict[str, float] | None = None,
+        priority: str = "latest_start",
+        components: bool = False,
+    ) -> PERTResult:
+        outputs = []
+        if self.show_table:
+            outputs.append("tasks")
+        if self.save_graph:
+            outputs.append("graph")
+        if components:
+            outputs.append("components")
+        self.pert_result = self.pert.calculate_pert(
+            time,
+            layout=layout,
+            capacities=capacities,
+            priority=priority,
+            outputs=outputs,
+        )
+        return self.pert_result
 
-    @classmethod
-    def generate_table(cls):
+    def generate_table(self, max_rows: int | None = None, print_tables: bool = True):
         """
-        Generate a table and print
-        cls.calculate_pert is needed
+        Write the tables in every table format and print them
+        calculate_pert is needed
         """
         IOUtils.generate_table(
-            pert_result=cls.pert_result,
-            table_format=cls.table_format,
-            show_table=cls.show_table,
-            save_path=cls.result_dir,
+            pert_result=self.pert_result,
+            table_format=self.table_format,
+            show_table=print_tables,
+            save_path=self.result_dir,
+            max_rows=max_rows,
         )
 
-    @classmethod
-    def generate_graph_svg(cls):
-        IOUtils.generate_graph_svg(cls.pert_result, cls.result_dir)
+    def generate_graph_svg(self, renderer: str = "svg"):
+        IOUtils.generate_graph_svg(self.pert_result, self.result_dir, renderer=renderer)
+
+    def print_components(self, max_rows: int = 40, max_labels: int = 8):
+        """
+        Print the longest sub-networks of the plan
+        calculate_pert with components is needed
+        """
+        components = self.pert_result.components
+        longest = sorted(
+            range(len(components)),
+            key=lambda c: components[c].expected_duration,
+            reverse=True,
+        )[:max_rows]
+
+        table = Table(title="Components", show_header=True, header_style="bold cyan")
+        table.add_column("Component", style="cyan", justify="right")
+        table.add_column("Tasks", justify="right")
+        table.add_column("Duration", justify="right", style="magenta")
+        table.add_column("Std", justify="right")
+        table.add_column("Critical Path")
+        for c in longest:
+            component = components[c]
+            path = component.critical_path
+            shown = ", ".join(path[:max_labels])
+            if len(path) > max_labels:
+                shown += f", ... ({len(path)} tasks)"
+            table.add_row(
+                str(c + 1),
+                str(component.tasks),
+                f"{component.expected_duration:.2f}",
+                f"{component.std_duration:.2f}",
+                shown,
+            )
+        if len(components) > max_rows:
+            table.caption = f"{max_rows} longest of {len(components)} components shown"
+        Console().print(table)
+
+    def print_paths(self, k: int, max_labels: int = 8):
+        """
+        Print the k longest paths of the plan
+        calculate_pert is needed
+        """
+        paths = self.pert.longest_paths(k)
+        table = Table(title="Longest Paths", show_header=True, header_style="bold cyan")
+        table.add_column("Rank", style="cyan", justify="right")
+        table.add_column("Duration", justify="right", style="magenta")
+        table.add_column("Std", justify="right")
+        table.add_column("Slack", justify="right")
+        table.add_column("Path")
+        for rank, path in enumerate(paths, start=1):
+            labels = path.labels
+            shown = " -> ".join(labels[:max_labels])
+            if len(labels) > max_labels:
+                shown += f" -> ... ({len(labels)} tasks)"
+            table.add_row(
+                str(rank),
+                f"{path.duration:.2f}",
+                f"{path.std_duration:.2f}",
+                f"{path.slack:.2f}",
+                shown,
+            )
+        if len(paths) < k:
+            table.caption = f"the plan has only {len(paths)} paths"
+        Console().print(table)
+        return paths
+
+    def sensitivity(
+        self,
+        field: str,
+        factors: list[float],
+        scenarios: dict[str, dict[str, float]] | None = None,
+        top: int | None = None,
+    ) -> SensitivityResult:
+        """
+        Print the tornado table and the scenario durations
+        calculate_pert is needed
+        """
+        result = self.pert.sensitivity(
+            field=field, factors=factors, scenarios=scenarios, top=top
+        )
+        console = Console()
+
+        tornado = Table(
+            title=f"Sensitivity of the project duration to the {field} estimate",
+            show_header=True,
+            header_style="bold cyan",
+        )
+        tornado.add_column("Label", style="cyan")
+        for factor in result.factors:
+            tornado.add_column(f"x{factor:g}", justify="right")
+        tornado.add_column("Impact", justify="right", style="magenta")
+        for row in result.tornado:
+            tornado.add_row(
+                row.label,
+                *(f"{duration:.2f}" for duration in row.durations),
+                f"{row.impact:.2f}",
+            )
+        tornado.caption = f"Baseline duration {result.baseline_duration:.2f}"
+        console.print(tornado)
+
+        if result.scenarios:
+            table = Table(title="Scenarios", show_header=True, header_style="bold cyan")
+            table.add_column("Scenario", style="cyan")
+            table.add_column("Duration", justify="right")
+            table.add_column("Change", justify="right", style="magenta")
+            for name, duration in result.scenarios.items():
+                table.add_row(
+                    name,
+                    f"{duration:.2f}",
+                    f"{duration - result.baseline_duration:+.2f}",
+                )
+            console.print(table)
+        return result
+
+    @staticmethod
+    def print_profile(profiler: Profiler):
+        table = Table(title="Profile", show_header=True, header_style="bold cyan")
+        table.add_column("Phase", style="cyan")
+        for column in ("Seconds", "Tasks", "Edges", "Allocated MB"):
+            table.add_column(column, justify="right")
+
+        def cell(value) -> str:
+            return "" if value is None else str(value)
+
+        for record in profiler.records:
+            allocated = record.allocated_bytes
+            table.add_row(
+                record.name,
+                f"{record.seconds:.4f}",
+                cell(record.tasks),
+                cell(record.edges),
+                "" if allocated is None else f"{allocated / (1 << 20):.2f}",
+            )
+        table.add_row("total", f"{sum(r.seconds for r in profiler.records):.4f}")
+        Console().print(table)
+
+    @staticmethod
+    def print_validation(report: ValidationReport, max_errors: int = 20):
+        table = Table(title="Validation", show_header=True, header_style="bold cyan")
+        table.add_column("Check", style="cyan")
+        table.add_column("Result", justify="right")
+        table.add_row("Tasks", str(report.tasks))
+        table.add_row("Edges", str(report.edges))
+        table.add_row("Duplicate labels", str(len(report.duplicates)))
+        table.add_row("Unknown predecessors", str(len(report.missing)))
+        table.add_row("Cycles", str(len(report.cycles)))
+        console = Console()
+        console.print(table)
+
+        errors = report.errors()
+        for error in errors[:max_errors]:
+            console.print(f"[red]{error}[/red]", highlight=False)
+        if len(errors) > max_errors:
+            console.print(f"... and {len(errors) - max_errors} more")
+
+    @staticmethod
+    def print_batch_summary(rows: list[dict], max_rows: int = 40):
+        """
+        Print one row per file, failed files first when rows are cut
+        """
+        failed = [row for row in rows if row["status"] != "done"]
+        shown = rows
+        if len(rows) > max_rows:
+            shown = (failed + [row for row in rows if row["status"] == "done"])[
+                :max_rows
+            ]
+
+        def number(value) -> str:
+            return "" if value is None else f"{value:.4g}"
+
+        def display(path: str) -> str:
+            # relative to the working directory when below it
+            try:
+                return str(Path(path).relative_to(Path.cwd()))
+            except ValueError:
+                return path
+
+        table = Table(title="Batch", show_header=True, header_style="bold cyan")
+        table.add_column("File", style="cyan", overflow="fold")
+        table.add_column("Status")
+        table.add_column("Tasks", justify="right")
+        table.add_column("Duration", justify="right", style="magenta")
+        table.add_column("Probability", justify="right")
+        table.add_column("Seconds", justify="right")
+        table.add_column("Result / Error")
+        for row in shown:
+            done = row["status"] == "done"
+            table.add_row(
+                display(row["file"]),
+                "[green]done[/green]" if done else "[red]failed[/red]",
+                "" if row.get("tasks") is None else str(row["tasks"]),
+                number(row.get("expected_duration")),
+                number(row.get("expected_probability")),
+                number(row.get("seconds")),
+                display(row["result_dir"]) if done else row["error"],
+            )
+        caption = f"{len(rows) - len(failed)} done, {len(failed)} failed"
+        if len(shown) < len(rows):
+            caption = f"{len(shown)} of {len(rows)} files shown, {caption}"
+        table.caption = caption
+        Console().print(table)
+
+    @staticmethod
+    def print_plan(path: Path, header: dict):
+        table = Table(title="Plan", show_header=True, header_style="bold cyan")
+        table.add_column("Field", style="cyan")
+        table.add_column("Value", justify="right")
+        table.add_row("File", str(path))
+        table.add_row("File size MB", f"{path.stat().st_size / (1 << 20):.2f}")
+        table.add_row("Tasks", str(header["tasks"]))
+        table.add_row("Edges", str(header["edges"]))
+        table.add_row("Resources", ", ".join(header["resources"]) or "-")
+        source = header.get("source")
+        if source:
+            table.add_row("Source", source["name"])
+            table.add_row("Source size", str(source["size"]))
+
+        arrays = Table(title="Arrays", show_header=True, header_style="bold cyan")
+        arrays.add_column("Array", style="cyan")
+        arrays.add_column("Dtype")
+        arrays.add_column("Shape", justify="right")
+        arrays.add_column("Offset", justify="right")
+        arrays.add_column("MB", justify="right")
+        for name, spec in header["arrays"].items():
+            nbytes = math.prod(spec["shape"]) * np.dtype(spec["dtype"]).itemsize
+            arrays.add_row(
+                name,
+                spec["dtype"],
+                " x ".join(map(str, spec["shape"])),
+                str(spec["offset"]),
+                f"{nbytes / (1 << 20):.2f}",
+            )
+        console = Console()
+        console.print(table)
+        console.print(arrays)
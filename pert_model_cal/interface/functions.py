@@ -1,13 +1,20 @@
-import pandas as pd
-import networkx
-import matplotlib.pyplot as plt
-from ..core.model.task_data import Task
-from rich.console import Console
-from rich.table import Table
+import json
+import os
+import time
+from ..core.model.task_data import TaskTable, GraphData
 from pathlib import Path
+from pydantic import ValidationError
 from ..core.input_parser import InputParser
 from ..core.model.output import PERTResult
 from ..core.pert_calculator import PERT
+from ..core.plan_file import EXTENSION as PLAN_EXTENSION, plan_header
+from ..core.plan_file import read_plan, source_stamp, write_plan
+from ..core.profiling import profile, phase
+from .artifacts import precompress
+from .svg_renderer import SVGRenderer
+from .table_export import TABLE_FORMATS, TableExporter
+
+RENDERERS = ("svg", "matplotlib")
 
 
 class IOUtils:
@@ -16,13 +23,51 @@ class IOUtils:
     """
 
     @staticmethod
-    def load_tasks_from_json(file_location: Path | str) -> list[Task]:
+    def load_tasks_from_json(file_location: Path | str) -> TaskTable:
+        """
+        Raise ValueError saying what is wrong with the file
+        """
         if not isinstance(file_location, Path):
             file_location = Path(file_location)
-        tasks = InputParser.load_json_file(file_location)
-        if tasks is None:
-            raise ValueError("Invalid JSON file")
-        return tasks
+        try:
+            return InputParser.read_task_table(file_location)
+        except FileNotFoundError:
+            raise ValueError(f"File not found: {file_location}") from None
+        except (ValidationError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid JSON file: {e}") from None
+
+    @staticmethod
+    def load_tasks(file_location: Path | str) -> TaskTable:
+        """
+        Load a compiled plan or a JSON task file, by its extension
+        """
+        file_location = Path(file_location)
+        if file_location.suffix == PLAN_EXTENSION:
+            with phase("load_plan") as record:
+                table = read_plan(file_location)
+                record.tasks = len(table)
+                record.edges = table.graph.edge_count
+            return table
+        return IOUtils.load_tasks_from_json(file_location)
+
+    @staticmethod
+    def load_compiled(file_location: Path) -> TaskTable:
+        """
+        Load a JSON task file through the compiled plan next to it, which is
+        written on first load and again whenever the JSON file changes
+        """
+        plan_location = file_location.with_suffix(PLAN_EXTENSION)
+        source = source_stamp(file_location)
+        try:
+            if plan_header(plan_location).get("source") == source:
+                return IOUtils.load_tasks(plan_location)
+        except (OSError, ValueError):
+            # missing, stale format or damaged, compiled again below
+            pass
+        table = IOUtils.load_tasks_from_json(file_location)
+        with phase("compile", tasks=len(table), edges=table.graph.edge_count):
+            write_plan(table, plan_location, source=source)
+        return table
 
     @staticmethod
     def create_dir(dir_name: str) -> Path:
@@ -38,103 +83,116 @@ class IOUtils:
         save_path: Path,
         show_table: bool = False,
         config_name: str | None = None,
-    ) -> tuple[pd.DataFrame, pd.DataFrame]:
-        tasks_data = []
-        for task in pert_result.tasks:
-            tasks_data.append(
-                {
-                    "Label": task.label,
-                    "Earliest Start": task.earliest_start,
-                    "Earliest Finish": task.earliest_finish,
-                    "Latest Start": task.latest_start,
-                    "Latest Finish": task.latest_finish,
-                    "Slack": task.slack_time,
-                    "Critical": task.critical,
-                }
+        max_rows: int | None = None,
+    ) -> list[Path]:
+        """
+        Write the task and summary tables in every format of table_format,
+        see TABLE_FORMATS, and return the written files
+        max_rows: rows of the task table printed with show_table
+        """
+        unknown = set(table_format) - set(TABLE_FORMATS)
+        if unknown:
+            raise ValueError(
+                f"Unknown table format {', '.join(sorted(unknown))}, "
+                f"use {', '.join(TABLE_FORMATS)}"
             )
-        tasks_df = pd.DataFrame(tasks_data)
+        written: list[Path] = []
+        with phase("table", tasks=len(pert_result.task_columns())):
+            for table_type in TABLE_FORMATS:
+                if table_type not in table_format:
+                    continue
+                written += TableExporter.write(
+                    table_type, pert_result, save_path, config_name
+                )
 
-        summary_data = {
-            "Critical Path": [", ".join(pert_result.critical_path)],
-            "Expected Duration": [pert_result.expected_duration],
-            "Expected Probability": [pert_result.expected_probability],
-        }
-        summary_df = pd.DataFrame(summary_data)
-
-        # save the file
-        if "csv" in table_format:
-            tasks_save_path = save_path / (
-                f"{config_name}_tasks.csv" if config_name else "task.csv"
-            )
-            summary_save_path = save_path / (
-                f"{config_name}_summary.csv" if config_name else "summary.csv"
-            )
-            tasks_df.to_csv(tasks_save_path, index=False)
-            summary_df.to_csv(summary_save_path, index=False)
-
-        if "excel" in table_format:
-            tasks_save_path = save_path / (
-                f"{config_name}_tasks.xlsx" if config_name else "task.xlsx"
-            )
-            summary_save_path = save_path / (
-                f"{config_name}_summary.xlsx" if config_name else "summary.xlsx"
-            )
-            tasks_df.to_excel(tasks_save_path, index=False)
-            summary_df.to_excel(summary_save_path, index=False)
-
-        if show_table:
-            console = Console()
-            tasks_table = Table(show_header=True)
-
-            for column in tasks_df.columns:
-                tasks_table.add_column(column)
-            for _, row in tasks_df.iterrows():
-                tasks_table.add_row(*map(str, row))
-
-            summary_table = Table(show_header=True)
-
-            for column in summary_df.columns:
-                summary_table.add_column(column)
-            for _, row in summary_df.iterrows():
-                summary_table.add_row(*map(str, row))
-
-            console.print(tasks_table)
-            console.print(summary_table)
-
-        return (tasks_df, summary_df)
+            if show_table:
+                TableExporter.print_tables(pert_result, max_rows=max_rows)
+        return written
 
     @staticmethod
     def generate_graph_svg(
-        pert_result: PERTResult, save_path: Path, config_name: str | None = None
+        pert_result: PERTResult,
+        save_path: Path,
+        config_name: str | None = None,
+        renderer: str = "svg",
     ):
-        graph = pert_result.graph_data.graph
-        position_map = pert_result.graph_data.position_map
-        dashed_edges = pert_result.graph_data.dashed_edges
-        solid_edges = pert_result.graph_data.solid_edges
+        """
+        renderer: "svg" for the streaming SVG writer, "matplotlib" for the
+        networkx/matplotlib drawing
+        """
+        if renderer not in RENDERERS:
+            raise ValueError(f"Unknown renderer '{renderer}', use one of {RENDERERS}")
         graph_save_path = save_path / (
             f"{config_name}_graph.svg" if config_name else "graph.svg"
         )
+        with phase("render", tasks=len(pert_result.task_columns())):
+            if renderer == "svg":
+                SVGRenderer.write(pert_result.graph_data, graph_save_path)
+            else:
+                IOUtils._draw_matplotlib(pert_result.graph_data, graph_save_path)
 
-        plt.figure(figsize=(20, 10))
-        networkx.draw_networkx_nodes(graph, position_map)
-        networkx.draw_networkx_edges(
-            graph, position_map, edgelist=dashed_edges, style="dashed"
-        )
-        networkx.draw_networkx_edges(
-            graph, position_map, edgelist=solid_edges, style="solid"
-        )
-        networkx.draw_networkx_edge_labels(
-            graph,
-            position_map,
-            edge_labels=networkx.get_edge_attributes(graph, "name"),
-            font_family="sans-serif",
-            font_size=10,
-        )
-        plt.savefig(graph_save_path, format="SVG")
+    @staticmethod
+    def _draw_matplotlib(graph_data: GraphData, graph_save_path: Path):
+        import networkx
+        import matplotlib.pyplot as plt
+
+        graph = graph_data.to_networkx()
+        position_map = graph_data.position_map
+        dashed_edges = graph_data.dashed_edges
+        solid_edges = graph_data.solid_edges
+
+        figure = plt.figure(figsize=(20, 10))
+        try:
+            networkx.draw_networkx_nodes(graph, position_map)
+            networkx.draw_networkx_edges(
+                graph, position_map, edgelist=dashed_edges, style="dashed"
+            )
+            networkx.draw_networkx_edges(
+                graph, position_map, edgelist=solid_edges, style="solid"
+            )
+            networkx.draw_networkx_edge_labels(
+                graph,
+                position_map,
+                edge_labels=graph_data.edge_labels
+                or networkx.get_edge_attributes(graph, "name"),
+                font_family="sans-serif",
+                font_size=10,
+            )
+            plt.savefig(graph_save_path, format="SVG")
+        finally:
+            # the web server is long-running, do not keep a figure per call
+            plt.close(figure)
+
+    @staticmethod
+    def update_task_in_json(file_location: Path, label: str, update: dict):
+        """
+        Write the changed fields of one task back to a config file,
+        atomically so a failed write leaves the old file in place
+        """
+        with open(file_location, "r") as f:
+            data = json.load(f)
+        for raw_task_input in data:
+            if raw_task_input.get("label") == label:
+                raw_task_input.update(update)
+                break
+        else:
+            raise ValueError(f"Task '{label}' does not exist")
+        partial = file_location.with_name(f".{file_location.name}.{os.getpid()}")
+        try:
+            with open(partial, "w") as f:
+                json.dump(data, f)
+            os.replace(partial, file_location)
+        finally:
+            partial.unlink(missing_ok=True)
 
     @staticmethod
     def calculate_pert(
-        config_name: Path | str, time: int | float | None = None
+        config_name: Path | str,
+        time: int | float | None = None,
+        layout: str = "layered",
+        capacities: dict[str, int | float] | None = None,
+        priority: str = "latest_start",
+        slack_tolerance: float = 0,
     ) -> PERTResult:
         result_dir = IOUtils.create_dir("cache")
         if not isinstance(config_name, Path):
@@ -143,6 +201,69 @@ class IOUtils:
         if not file_location.exists():
             raise FileNotFoundError(f"Config file {config_name}.json not found")
 
-        tasks = IOUtils.load_tasks_from_json(file_location)
-        pert = PERT(tasks)
-        return pert.calculate_pert(time=time)
+        tasks = IOUtils.load_compiled(file_location)
+        pert = PERT(tasks, slack_tolerance=slack_tolerance)
+        return pert.calculate_pert(
+            time=time, layout=layout, capacities=capacities, priority=priority
+        )
+
+    @staticmethod
+    def calculate_and_export(
+        file_location: Path,
+        save_path: Path,
+        config_name: str,
+        time_limit: int | float | None = None,
+        renderer: str = "svg",
+        capacities: dict[str, int | float] | None = None,
+        priority: str = "latest_start",
+        slack_tolerance: float = 0,
+    ) -> dict:
+        """
+        Calculate a config and write its tables and graph
+        Runs in a worker process for the web jobs, so it only returns plain data
+        """
+        started_at = time.time()
+        with profile() as profiler:
+            pert_result = IOUtils.calculate_pert(
+                file_location,
+                time=time_limit,
+                capacities=capacities,
+                priority=priority,
+                slack_tolerance=slack_tolerance,
+            )
+            IOUtils.generate_table(
+                pert_result=pert_result,
+                # the workbook is built from the CSV files when downloaded
+                table_format=["csv"],
+                save_path=save_path,
+                config_name=config_name,
+            )
+            IOUtils.generate_graph_svg(
+                pert_result=pert_result,
+                save_path=save_path,
+                config_name=config_name,
+                renderer=renderer,
+            )
+            with phase("compress"):
+                for suffix in ("tasks.csv", "summary.csv", "graph.svg"):
+                    precompress(save_path / f"{config_name}_{suffix}")
+
+        return {
+            "result": {
+                "critical_path": pert_result.critical_path,
+                "expected_duration": pert_result.expected_duration,
+                "expected_probability": (
+                    float(pert_result.expected_probability)
+                    if pert_result.expected_probability is not None
+                    else None
+                ),
+                "scheduled_duration": (
+                    pert_result.resource_schedule.duration
+                    if pert_result.resource_schedule is not None
+                    else None
+                ),
+            },
+            "timings": profiler.timings(),
+            "profile": profiler.report(),
+            "started_at": started_at,
+        }
@@ -0,0 +1,186 @@
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    key: str | None
+    status: str = "queued"  # queued, running, done, failed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cached: bool = False
+    # phase -> seconds, reported by the worker
+    timings: dict = field(default_factory=dict)
+    # Profiler.report() of the worker
+    profile: list = field(default_factory=list, repr=False)
+    result: dict | None = None
+    artifacts: dict = field(default_factory=dict)
+    error: str | None = None
+    future: Future | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        status = self.status
+        future = self.future
+        # still running while the completion hook of a finished future runs
+        if status == "queued" and future is not None:
+            if future.running() or future.done():
+                status = "running"
+        return {
+            "job_id": self.id,
+            "status": status,
+            "cached": self.cached,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": (
+                self.started_at - self.submitted_at if self.started_at else None
+            ),
+            "timings": self.timings,
+            "result": self.result,
+            "artifacts": self.artifacts,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Run calculations on a bounded process pool so the event loop stays free
+    Every state change happens on the event loop, workers only return data
+    """
+
+    def __init__(self, workers: int = 2, queue_depth: int = 32, history: int = 1000):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.history = history
+        self._executor: ProcessPoolExecutor | None = None
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        # key -> id of the unfinished job computing it
+        self._pending_keys: dict[str, str] = {}
+        self._active = 0
+
+    def configure(self, workers: int | None = None, queue_depth: int | None = None):
+        if workers is not None:
+            self.workers = workers
+        if queue_depth is not None:
+            self.queue_depth = queue_depth
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def add_finished(self, key: str | None, result: dict, artifacts: dict) -> Job:
+        """
+        Record a job answered without running anything, e.g. from a cache
+        """
+        job = Job(id=uuid.uuid4().hex, key=key, status="done", cached=True)
+        job.started_at = job.finished_at = job.submitted_at
+        job.result = result
+        job.artifacts = artifacts
+        self._remember(job)
+        return job
+
+    def submit(
+        self,
+        key: str | None,
+        fn: Callable,
+        *args,
+        artifacts: dict | None = None,
+        on_done: Callable[[Job], None] | None = None,
+    ) -> Job:
+        """
+        Queue fn(*args) on the pool, fn must return {"result", "timings",
+        "started_at"}. A job with the same key that is still unfinished
+        is returned instead of queuing a duplicate
+        on_done(job) runs in a thread after fn returns, the job is reported
+        done and its key released only once it has finished
+        Raise QueueFullError when queue_depth jobs are unfinished
+        """
+        if key is not None and key in self._pending_keys:
+            return self._jobs[self._pending_keys[key]]
+        if self._active >= self.queue_depth:
+            raise QueueFullError(
+                f"{self._active} calculations are queued or running, try again later"
+            )
+
+        job = Job(id=uuid.uuid4().hex, key=key, artifacts=artifacts or {})
+        self._remember(job)
+        if key is not None:
+            self._pending_keys[key] = job.id
+        self._active += 1
+
+        job.future = self._get_executor().submit(fn, *args)
+        asyncio.get_running_loop().create_task(self._watch(job, on_done))
+        return job
+
+    async def _watch(self, job: Job, on_done):
+        assert job.future is not None
+        try:
+            output = await asyncio.wrap_future(job.future)
+            job.result = output["result"]
+            job.timings = output["timings"]
+            job.profile = output.get("profile", [])
+            job.started_at = output["started_at"]
+            job.finished_at = time.time()
+            if on_done is not None:
+                await self._run_hook(job, on_done)
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            if job.finished_at is None:
+                job.finished_at = time.time()
+            job.future = None
+            self._active -= 1
+            if job.key is not None:
+                self._pending_keys.pop(job.key, None)
+
+    @staticmethod
+    async def _run_hook(job: Job, on_done: Callable[[Job], None]):
+        """
+        on_done writes files and the database, it runs in a thread so the
+        event loop is not blocked; a failure is logged, the job is still done
+        """
+        try:
+            await asyncio.to_thread(on_done, job)
+        except Exception as e:
+            logger.error(f"Job {job.id} completion hook failed: {e}")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _remember(self, job: Job):
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.history:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.status in ("queued", "running"):
+                break
+            self._jobs.popitem(last=False)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,201 @@
+"""
+Minimal Prometheus metrics in the text exposition format
+
+Only what the server needs: labelled histograms, and gauges and counters
+read from a callback at scrape time, so no client library is required
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+BYTES_BUCKETS = tuple(
+    float(1 << shift) for shift in range(10, 35, 2)
+)  # 1 KiB .. 16 GiB
+COUNT_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Iterable[float] = SECONDS_BUCKETS,
+        labelnames: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.labelnames = labelnames
+        # label values -> [bucket counts..., sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * len(self.buckets) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for labelvalues, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _labels(self.labelnames, labelvalues, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_number(counts[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackMetric:
+    """
+    Gauge or counter whose value is read from `read` at scrape time
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], float],
+        kind: str = "gauge",
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.kind = kind
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {_number(self.read())}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Histogram | CallbackMetric] = {}
+
+    def register(
+        self, metric: Histogram | CallbackMetric
+    ) -> Histogram | CallbackMetric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.register(metric)
+        return metric
+
+    def gauge(
+        self, name: str, documentation: str, read: Callable[[], float]
+    ) -> CallbackMetric:
+        metric = CallbackMetric(name, documentation, read, "gauge")
+        self.register(metric)
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, read: Callable[[], float]
+    ) -> CallbackMetric:
+        metric = CallbackMetric(name, documentation, read, "counter")
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "pert_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    labelnames=("method", "route", "status"),
+)
+PHASE_SECONDS = REGISTRY.histogram(
+    "pert_phase_duration_seconds",
+    "Duration of calculation phases",
+    labelnames=("phase",),
+)
+PHASE_BYTES = REGISTRY.histogram(
+    "pert_phase_allocated_bytes",
+    "Peak bytes allocated by calculation phases, only when memory tracing is on",
+    buckets=BYTES_BUCKETS,
+    labelnames=("phase",),
+)
+PHASE_TASKS = REGISTRY.histogram(
+    "pert_phase_tasks",
+    "Number of tasks processed by calculation phases",
+    buckets=COUNT_BUCKETS,
+    labelnames=("phase",),
+)
+PHASE_EDGES = REGISTRY.histogram(
+    "pert_phase_edges",
+    "Number of dependencies processed by calculation phases",
+    buckets=COUNT_BUCKETS,
+    labelnames=("phase",),
+)
+
+
+def observe_profile(records: Iterable[dict]):
+    """
+    Feed Profiler.report() records into the phase histograms
+    """
+    for record in records:
+        name = record["name"]
+        PHASE_SECONDS.observe(record["seconds"], name)
+        if record.get("allocated_bytes") is not None:
+            PHASE_BYTES.observe(record["allocated_bytes"], name)
+        if record.get("tasks") is not None:
+            PHASE_TASKS.observe(record["tasks"], name)
+        if record.get("edges") is not None:
+            PHASE_EDGES.observe(record["edges"], name)
@@ -0,0 +1,236 @@
+import os
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import orjson
+from .artifacts import ENCODINGS
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Content-addressed cache of calculation results
+    The key is a hash of the normalized task content plus expected_time.
+    memory tier: LRU of result metadata
+    disk tier: <directory>/<key>/ holding meta.json and the artifacts,
+    evicted least recently used first
+    Lookups run in threadpool threads, the memory tier is guarded by a lock
+    """
+
+    # artifact suffixes, stored as <config_name>_<suffix> next to the config
+    ARTIFACTS = ("tasks.csv", "summary.csv", "graph.svg")
+    # built from the artifacts on demand, removed whenever the artifacts change
+    DERIVED = ("tables.xlsx",)
+    # fields of TaskInput that take part in the key
+    TASK_FIELDS = (
+        "label",
+        "name",
+        "optimistic_estimate",
+        "most_likely_estimate",
+        "pessimistic_estimate",
+        "predecessors",
+        "resources",
+    )
+
+    def __init__(
+        self,
+        directory: Path,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 1024,
+    ):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.RLock()
+        # (path, mtime, size) -> content hash, so unchanged configs are not reread
+        self._content_hashes: dict[tuple[str, int, int], str] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(
+        self,
+        max_memory_entries: int | None = None,
+        max_disk_entries: int | None = None,
+    ):
+        if max_memory_entries is not None:
+            self.max_memory_entries = max_memory_entries
+        if max_disk_entries is not None:
+            self.max_disk_entries = max_disk_entries
+        self._evict_memory()
+        self._evict_disk()
+
+    def content_hash(self, file_location: Path) -> str:
+        stat = file_location.stat()
+        memo_key = (str(file_location), stat.st_mtime_ns, stat.st_size)
+        content_hash = self._content_hashes.get(memo_key)
+        if content_hash is None:
+            with open(file_location, "rb") as f:
+                data = orjson.loads(f.read())
+            normalized = [
+                {
+                    field: (
+                        float(raw[field])
+                        if field.endswith("_estimate")
+                        and isinstance(raw.get(field), (int, float))
+                        else raw.get(field)
+                    )
+                    for field in self.TASK_FIELDS
+                }
+                for raw in data
+            ]
+            content_hash = hashlib.sha256(
+                orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS)
+            ).hexdigest()
+            if len(self._content_hashes) >= 4 * self.max_disk_entries:
+                self._content_hashes.clear()
+            self._content_hashes[memo_key] = content_hash
+        return content_hash
+
+    def key(
+        self, file_location: Path, expected_time: int | float | None, **options
+    ) -> str:
+        """
+        options: further settings that change the artifacts, e.g. the renderer
+        """
+        content_hash = self.content_hash(file_location)
+        extra = "".join(f":{k}={options[k]!r}" for k in sorted(options))
+        return hashlib.sha256(
+            f"{content_hash}:{expected_time!r}{extra}".encode()
+        ).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """
+        Return the metadata of a cached result, or None on a miss
+        """
+        entry_dir = self.directory / key
+        meta_file = entry_dir / "meta.json"
+        with self._lock:
+            meta = self._memory.get(key)
+            if meta is not None and self._complete(entry_dir):
+                # mark as recently used for the disk eviction
+                meta_file.touch()
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return meta
+
+        if meta_file.exists() and self._complete(entry_dir):
+            meta = orjson.loads(meta_file.read_bytes())
+            meta_file.touch()
+            with self._lock:
+                self._remember(key, meta)
+                self.disk_hits += 1
+            return meta
+
+        with self._lock:
+            self._memory.pop(key, None)
+            self.misses += 1
+        return None
+
+    def put(self, key: str, meta: dict, config_name: str, source_dir: Path):
+        """
+        Store the artifacts generated for config_name in source_dir
+        """
+        entry_dir = self.directory / key
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        for suffix in self._variants():
+            source = source_dir / f"{config_name}_{suffix}"
+            if source.exists():
+                self._link(source, entry_dir / suffix)
+        (entry_dir / "meta.json").write_bytes(orjson.dumps(meta))
+        self._remember(key, meta)
+        self._evict_disk()
+
+    def materialize(self, key: str, config_name: str, target_dir: Path):
+        """
+        Make the cached artifacts available as <config_name>_<suffix>
+        """
+        entry_dir = self.directory / key
+        for suffix in self._variants():
+            source = entry_dir / suffix
+            target = target_dir / f"{config_name}_{suffix}"
+            if source.exists():
+                self._link(source, target)
+            else:
+                target.unlink(missing_ok=True)
+        for suffix in self.DERIVED:
+            (target_dir / f"{config_name}_{suffix}").unlink(missing_ok=True)
+
+    def detach(self, config_name: str, target_dir: Path):
+        """
+        Unlink the artifacts of config_name before they are regenerated,
+        they may be hard links into a cache entry
+        """
+        for suffix in self._variants() + self.DERIVED:
+            (target_dir / f"{config_name}_{suffix}").unlink(missing_ok=True)
+
+    def _variants(self) -> tuple[str, ...]:
+        """
+        The artifact suffixes and those of their precompressed copies
+        """
+        return tuple(
+            suffix + extension
+            for suffix in self.ARTIFACTS
+            for extension in ("", *ENCODINGS.values())
+        )
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            ),
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "max_memory_entries": self.max_memory_entries,
+            "max_disk_entries": self.max_disk_entries,
+        }
+
+    def _complete(self, entry_dir: Path) -> bool:
+        return all((entry_dir / suffix).exists() for suffix in self.ARTIFACTS)
+
+    def _remember(self, key: str, meta: dict):
+        with self._lock:
+            self._memory[key] = meta
+            self._memory.move_to_end(key)
+            self._evict_memory()
+
+    def _evict_memory(self):
+        with self._lock:
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        if not self.directory.exists():
+            return
+        entries = [d for d in self.directory.iterdir() if (d / "meta.json").exists()]
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+        entries.sort(key=lambda d: (d / "meta.json").stat().st_mtime)
+        for entry_dir in entries[:excess]:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            with self._lock:
+                self._memory.pop(entry_dir.name, None)
+                self.evictions += 1
+            logger.info(f"Evicted cached result: {entry_dir.name}")
+
+    @staticmethod
+    def _link(source: Path, target: Path):
+        if target.exists():
+            if os.path.samefile(source, target):
+                return
+            target.unlink()
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
@@ -0,0 +1,87 @@
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from ..core.pert_calculator import PERT
+from .functions import IOUtils
+
+
+class PERTSessions:
+    """
+    Keep calculated PERT instances in memory, keyed by config name,
+    so that edits can be applied incrementally instead of reloading the config
+    Routes use them from threadpool threads, through session()
+    """
+
+    max_sessions: int
+    # config name -> (mtime of the config file, PERT)
+    _sessions: OrderedDict[str, tuple[float, PERT]]
+    # config name -> lock held while its PERT is loaded, read or edited,
+    # kept only while a thread holds or waits for it
+    _locks: dict[str, threading.Lock]
+    _users: Counter[str]
+    # guards _sessions, _locks and _users
+    _lock: threading.Lock
+
+    def __init__(self, max_sessions: int = 32):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._locks = {}
+        self._users = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self, config_name: str, file_location: Path) -> Iterator[PERT]:
+        """
+        The PERT of a config, no other thread uses it until the block exits
+        """
+        with self._lock:
+            lock = self._locks.setdefault(config_name, threading.Lock())
+            self._users[config_name] += 1
+        try:
+            with lock:
+                yield self.get(config_name, file_location)
+        finally:
+            with self._lock:
+                self._users[config_name] -= 1
+                if not self._users[config_name]:
+                    del self._users[config_name], self._locks[config_name]
+
+    def get(self, config_name: str, file_location: Path) -> PERT:
+        if not file_location.exists():
+            raise FileNotFoundError(f"Config file {config_name}.json not found")
+        mtime = file_location.stat().st_mtime
+        with self._lock:
+            session = self._sessions.get(config_name)
+            if session is not None and session[0] == mtime:
+                self._sessions.move_to_end(config_name)
+                return session[1]
+
+        pert = PERT(IOUtils.load_compiled(file_location))
+        # only the schedule is kept, edits read it from the task table
+        pert.calculate_pert(outputs=())
+        self.put(config_name, file_location, pert)
+        return pert
+
+    def put(self, config_name: str, file_location: Path, pert: PERT):
+        """
+        Keep pert for the config file as it is on disk now
+        """
+        mtime = file_location.stat().st_mtime
+        with self._lock:
+            self._sessions[config_name] = (mtime, pert)
+            self._sessions.move_to_end(config_name)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def discard(self, config_name: str):
+        """
+        Forget the PERT of a config, the next get reloads it from disk
+        """
+        with self._lock:
+            self._sessions.pop(config_name, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
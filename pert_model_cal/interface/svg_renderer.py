@@ -0,0 +1,109 @@
+from collections.abc import Iterator
+from html import escape
+from pathlib import Path
+from ..core.model.task_data import GraphData
+
+
+class SVGRenderer:
+    """
+    Render a PERT diagram to SVG without matplotlib
+    Elements are generated straight from GraphData.position_map and the
+    edge lists and written in chunks, so memory does not grow with the graph
+    """
+
+    scale: int = 40  # pixels per layout unit
+    margin: int = 40
+    node_radius: int = 8
+    chunk_elements: int = 2048
+
+    STYLE = (
+        "<style>"
+        "circle{fill:#1f78b4}"
+        "path{fill:none;stroke:#000;stroke-width:1;marker-end:url(#arrow)}"
+        "path.dashed{stroke-dasharray:5,3}"
+        "text{font-family:sans-serif;font-size:10px;text-anchor:middle}"
+        "</style>"
+    )
+
+    @classmethod
+    def stream(cls, graph_data: GraphData) -> Iterator[str]:
+        """
+        Yield the SVG document in chunks
+        """
+        position_map = graph_data.position_map
+        edge_labels = graph_data.edge_labels
+        if edge_labels is None and graph_data.graph is not None:
+            edge_labels = {
+                (u, v): data["name"]
+                for u, v, data in graph_data.graph.edges(data=True)
+                if "name" in data
+            }
+        edge_labels = edge_labels or {}
+        scale = cls.scale
+        margin = cls.margin
+
+        min_x = min_y = max_x = max_y = 0
+        for x, y in position_map.values():
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+        width = (max_x - min_x) * scale + 2 * margin
+        height = (max_y - min_y) * scale + 2 * margin
+
+        def point(label) -> tuple[float, float]:
+            x, y = position_map[label]
+            # y grows downwards in SVG
+            return (x - min_x) * scale + margin, (max_y - y) * scale + margin
+
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" '
+            f'height="{height:g}" viewBox="0 0 {width:g} {height:g}">\n'
+            f"{cls.STYLE}\n"
+            '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" '
+            'markerWidth="6" markerHeight="6" orient="auto-start-reverse">'
+            '<path d="M0,0L10,5L0,10z" style="fill:#000;stroke:none"/>'
+            "</marker></defs>\n"
+        )
+
+        buffer: list[str] = []
+        r = cls.node_radius
+        for style, edges in (
+            ("solid", graph_data.solid_edges),
+            ("dashed", graph_data.dashed_edges),
+        ):
+            for u, v in edges:
+                x1, y1 = point(u)
+                x2, y2 = point(v)
+                # stop the arrow at the border of the target circle
+                dx, dy = x2 - x1, y2 - y1
+                length = (dx * dx + dy * dy) ** 0.5 or 1.0
+                x2 -= dx / length * r
+                y2 -= dy / length * r
+                buffer.append(
+                    f'<path class="{style}" d="M{x1:.1f},{y1:.1f}L{x2:.1f},{y2:.1f}"/>'
+                )
+                label = edge_labels.get((u, v))
+                if label is not None:
+                    buffer.append(
+                        f'<text x="{(x1 + x2) / 2:.1f}" y="{(y1 + y2) / 2 - 3:.1f}">'
+                        f"{escape(str(label))}</text>"
+                    )
+                if len(buffer) >= cls.chunk_elements:
+                    yield "\n".join(buffer) + "\n"
+                    buffer.clear()
+
+        for label in position_map:
+            x, y = point(label)
+            buffer.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r}"/>')
+            if len(buffer) >= cls.chunk_elements:
+                yield "\n".join(buffer) + "\n"
+                buffer.clear()
+
+        buffer.append("</svg>\n")
+        yield "\n".join(buffer)
+
+    @classmethod
+    def write(cls, graph_data: GraphData, save_path: Path):
+        with open(save_path, "w", encoding="utf-8") as f:
+            for chunk in cls.stream(graph_data):
+                f.write(chunk)
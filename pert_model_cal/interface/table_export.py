@@ -0,0 +1,310 @@
+"""
+Task and summary table export without pandas
+
+CSV rows are streamed from the TaskColumns arrays in chunks, Parquet and
+Arrow IPC files are written from the same arrays with pyarrow, which is
+optional and only imported for those formats. Excel gets one workbook
+with a Tasks and a Summary sheet, written in openpyxl's write-only mode
+"""
+
+import os
+import csv
+import logging
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from rich.console import Console
+from rich.table import Table
+from ..core.model.output import PERTResult, TaskColumns
+
+TABLE_FORMATS = ("csv", "excel", "parquet", "arrow")
+EXTENSIONS = {"csv": "csv", "excel": "xlsx", "parquet": "parquet", "arrow": "arrow"}
+
+# header -> TaskColumns attribute
+TASK_COLUMNS = (
+    ("Label", "labels"),
+    ("Earliest Start", "earliest_start"),
+    ("Earliest Finish", "earliest_finish"),
+    ("Latest Start", "latest_start"),
+    ("Latest Finish", "latest_finish"),
+    ("Slack", "slack"),
+    ("Critical", "critical"),
+)
+# only present for results with a resource-constrained schedule
+SCHEDULE_COLUMNS = (
+    ("Scheduled Start", "scheduled_start"),
+    ("Scheduled Finish", "scheduled_finish"),
+)
+SUMMARY_HEADER = ("Critical Path", "Expected Duration", "Expected Probability")
+SCHEDULE_SUMMARY_HEADER = ("Scheduled Duration",)
+# file name parts without a config name, "task" predates the config names
+DEFAULT_PARTS = {"tasks": "task", "summary": "summary", "tables": "tables"}
+
+logger = logging.getLogger(__name__)
+
+
+class TableExporter:
+    chunk_rows: int = 1 << 16
+    # rows shown by the console view, the first and last half
+    max_console_rows: int = 40
+
+    @staticmethod
+    def path(
+        save_path: Path, config_name: str | None, part: str, extension: str
+    ) -> Path:
+        """
+        part: "tasks", "summary" or "tables" for the combined workbook
+        """
+        if config_name:
+            return save_path / f"{config_name}_{part}.{extension}"
+        return save_path / f"{DEFAULT_PARTS[part]}.{extension}"
+
+    @classmethod
+    def write(
+        cls,
+        table_type: str,
+        pert_result: PERTResult,
+        save_path: Path,
+        config_name: str | None = None,
+    ) -> list[Path]:
+        """
+        Write the tables in one of TABLE_FORMATS and return the files
+        """
+        if table_type == "excel":
+            workbook_path = cls.path(save_path, config_name, "tables", "xlsx")
+            cls.write_excel(pert_result, workbook_path)
+            return [workbook_path]
+        extension = EXTENSIONS[table_type]
+        tasks_path = cls.path(save_path, config_name, "tasks", extension)
+        summary_path = cls.path(save_path, config_name, "summary", extension)
+        getattr(cls, f"write_{table_type}")(pert_result, tasks_path, summary_path)
+        return [tasks_path, summary_path]
+
+    @staticmethod
+    def task_columns(columns: TaskColumns) -> tuple[tuple[str, str], ...]:
+        """
+        (header, TaskColumns attribute) of every exported task column
+        """
+        if columns.scheduled_start is None:
+            return TASK_COLUMNS
+        return TASK_COLUMNS + SCHEDULE_COLUMNS
+
+    @staticmethod
+    def summary_header(pert_result: PERTResult) -> tuple[str, ...]:
+        if pert_result.resource_schedule is None:
+            return SUMMARY_HEADER
+        return SUMMARY_HEADER + SCHEDULE_SUMMARY_HEADER
+
+    @staticmethod
+    def summary_row(pert_result: PERTResult) -> tuple:
+        probability = pert_result.expected_probability
+        row = (
+            ", ".join(pert_result.critical_path),
+            pert_result.expected_duration,
+            float(probability) if probability is not None else None,
+        )
+        if pert_result.resource_schedule is None:
+            return row
+        return row + (pert_result.resource_schedule.duration,)
+
+    @classmethod
+    def iter_task_rows(
+        cls, columns: TaskColumns, start: int = 0, stop: int | None = None
+    ) -> Iterator[list[tuple]]:
+        """
+        Yield rows of tasks start:stop in chunks of chunk_rows
+        """
+        stop = len(columns) if stop is None else stop
+        attributes = [attribute for _, attribute in cls.task_columns(columns)]
+        for begin in range(start, stop, cls.chunk_rows):
+            end = min(begin + cls.chunk_rows, stop)
+            yield list(
+                zip(
+                    *(
+                        (
+                            columns.labels[begin:end]
+                            if attribute == "labels"
+                            else getattr(columns, attribute)[begin:end].tolist()
+                        )
+                        for attribute in attributes
+                    )
+                )
+            )
+
+    @classmethod
+    def write_csv(cls, pert_result: PERTResult, tasks_path: Path, summary_path: Path):
+        columns = pert_result.task_columns()
+        with open(tasks_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow([header for header, _ in cls.task_columns(columns)])
+            for rows in cls.iter_task_rows(columns):
+                writer.writerows(rows)
+        with open(summary_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(cls.summary_header(pert_result))
+            writer.writerow(
+                [
+                    "" if value is None else value
+                    for value in cls.summary_row(pert_result)
+                ]
+            )
+
+    @staticmethod
+    def _arrow_tables(pert_result: PERTResult):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError(
+                "Parquet and Arrow output need pyarrow, install it with "
+                "'pip install pyarrow'"
+            )
+        columns = pert_result.task_columns()
+        tasks = pa.table(
+            {
+                header: (
+                    pa.array(columns.labels, type=pa.string())
+                    if attribute == "labels"
+                    else getattr(columns, attribute)
+                )
+                for header, attribute in TableExporter.task_columns(columns)
+            }
+        )
+        summary = pa.table(
+            {
+                header: pa.array([value])
+                for header, value in zip(
+                    TableExporter.summary_header(pert_result),
+                    TableExporter.summary_row(pert_result),
+                )
+            }
+        )
+        return tasks, summary
+
+    @staticmethod
+    def write_parquet(pert_result: PERTResult, tasks_path: Path, summary_path: Path):
+        tasks, summary = TableExporter._arrow_tables(pert_result)
+        import pyarrow.parquet as pq
+
+        pq.write_table(tasks, tasks_path)
+        pq.write_table(summary, summary_path)
+
+    @staticmethod
+    def write_arrow(pert_result: PERTResult, tasks_path: Path, summary_path: Path):
+        tasks, summary = TableExporter._arrow_tables(pert_result)
+        import pyarrow as pa
+
+        for table, path in ((tasks, tasks_path), (summary, summary_path)):
+            with pa.OSFile(str(path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+    @staticmethod
+    def _write_workbook(
+        workbook_path: Path,
+        task_header: Iterable[str],
+        task_rows: Iterable[Iterable],
+        summary_header: Iterable[str],
+        summary_row: Iterable,
+    ):
+        """
+        Stream the rows into a write-only workbook, rows are never kept
+        Written to a temporary file first, so readers never see half a workbook
+        """
+        from openpyxl import Workbook
+        from openpyxl.xml import LXML
+
+        if not LXML:
+            logger.warning(
+                "lxml is not installed, openpyxl keeps write-only sheets in memory"
+            )
+        workbook = Workbook(write_only=True)
+        tasks_sheet = workbook.create_sheet("Tasks")
+        tasks_sheet.append(list(task_header))
+        for row in task_rows:
+            tasks_sheet.append(row)
+        summary_sheet = workbook.create_sheet("Summary")
+        summary_sheet.append(list(summary_header))
+        summary_sheet.append(summary_row)
+
+        partial_path = workbook_path.with_name(f".{workbook_path.name}.{os.getpid()}")
+        try:
+            workbook.save(partial_path)
+            os.replace(partial_path, workbook_path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+    @classmethod
+    def write_excel(cls, pert_result: PERTResult, workbook_path: Path):
+        columns = pert_result.task_columns()
+        rows = cls.iter_task_rows(columns)
+        cls._write_workbook(
+            workbook_path,
+            [header for header, _ in cls.task_columns(columns)],
+            (row for chunk in rows for row in chunk),
+            cls.summary_header(pert_result),
+            cls.summary_row(pert_result),
+        )
+
+    @classmethod
+    def excel_from_csv(cls, tasks_path: Path, summary_path: Path, workbook_path: Path):
+        """
+        Build the workbook from the CSV files written by write_csv
+        """
+
+        def typed(row: list[str]) -> list:
+            # the first column is a label, the rest numbers, flags or empty
+            cells: list = [row[0]]
+            for value in row[1:]:
+                if value in ("True", "False"):
+                    cells.append(value == "True")
+                else:
+                    cells.append(float(value) if value else None)
+            return cells
+
+        with open(tasks_path, newline="", encoding="utf-8") as tasks_file, open(
+            summary_path, newline="", encoding="utf-8"
+        ) as summary_file:
+            task_rows = csv.reader(tasks_file)
+            summary_rows = csv.reader(summary_file)
+            cls._write_workbook(
+                workbook_path,
+                next(task_rows),
+                map(typed, task_rows),
+                next(summary_rows),
+                typed(next(summary_rows)),
+            )
+
+    @classmethod
+    def print_tables(cls, pert_result: PERTResult, max_rows: int | None = None):
+        """
+        Print the task table truncated to max_rows, head and tail, and the summary
+        """
+        max_rows = cls.max_console_rows if max_rows is None else max_rows
+        columns = pert_result.task_columns()
+        n = len(columns)
+
+        headers = [header for header, _ in cls.task_columns(columns)]
+        tasks_table = Table(show_header=True)
+        for header in headers:
+            tasks_table.add_column(header)
+        if n <= max_rows:
+            parts = [(0, n)]
+        else:
+            head = (max_rows + 1) // 2
+            parts = [(0, head), (n - (max_rows - head), n)]
+        for i, (start, stop) in enumerate(parts):
+            if i:
+                tasks_table.add_row(*(["..."] * len(headers)))
+            for rows in cls.iter_task_rows(columns, start, stop):
+                for row in rows:
+                    tasks_table.add_row(*map(str, row))
+        if n > max_rows:
+            tasks_table.caption = f"{max_rows} of {n} tasks shown"
+
+        summary_table = Table(show_header=True)
+        for header in cls.summary_header(pert_result):
+            summary_table.add_column(header)
+        summary_table.add_row(*map(str, cls.summary_row(pert_result)))
+
+        console = Console()
+        console.print(tasks_table)
+        console.print(summary_table)
@@ -1,8 +1,48 @@
+from pathlib import Path
 from fastapi import APIRouter, Request, HTTPException
-from ...functions import IOUtils
+from fastapi.concurrency import run_in_threadpool
+from ...functions import IOUtils, RENDERERS
+from ....core.resource_scheduler import PRIORITIES
+from ....database import ConfigStore
+from ...jobs import Job, JobManager, QueueFullError
+from ...metrics import observe_profile
+from ...result_cache import ResultCache
+from ...sessions import PERTSessions
 
 router = APIRouter(redirect_slashes=False)
 RESULT_DIR = IOUtils.create_dir("cache")
+RESULT_CACHE = ResultCache(RESULT_DIR / "results")
+STORE = ConfigStore(
+    RESULT_DIR / "pert.db", legacy_index=RESULT_DIR / "config_info.json"
+)
+JOB_MANAGER = JobManager()
+SESSIONS = PERTSessions()
+
+
+def artifact_links(config_name: str) -> dict:
+    return {
+        "tasks_csv": f"/api/download/csv/{config_name}_tasks",
+        "summary_csv": f"/api/download/csv/{config_name}_summary",
+        "tables_xlsx": f"/api/download/xlsx/{config_name}_tables",
+        "graph_svg": f"/api/download/svg/{config_name}_graph",
+    }
+
+
+def cached_result(
+    file_location: Path,
+    config_name: str,
+    expected_time: int | None,
+    options: dict,
+) -> tuple[str, dict | None]:
+    """
+    Return the cache key and the cached result, whose artifacts are put
+    back in place, or None on a miss
+    """
+    cache_key = RESULT_CACHE.key(file_location, expected_time, **options)
+    cached = RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        RESULT_CACHE.materialize(cache_key, config_name, RESULT_DIR)
+    return cache_key, cached
 
 
 @router.post("/api/calculate")
@@ -11,21 +51,105 @@ async def calculate(request: Request):
     config_name: str = body.get("config_name")
     expected_time = body.get("expected_time")
     expected_time = int(expected_time) if expected_time else None
+    renderer: str = body.get("renderer") or "svg"
+    # resource -> units, also make a resource-constrained schedule
+    capacities: dict | None = body.get("capacities") or None
+    priority: str = body.get("priority") or "latest_start"
+    # tasks with at most this much slack are critical
+    slack_tolerance = body.get("slack_tolerance") or 0
     if not config_name:
         raise HTTPException(status_code=400, detail="config_name is required")
+    if renderer not in RENDERERS:
+        raise HTTPException(status_code=400, detail=f"Unknown renderer '{renderer}'")
+    if capacities is not None and not (
+        isinstance(capacities, dict)
+        and all(
+            isinstance(units, (int, float)) and units > 0
+            for units in capacities.values()
+        )
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="capacities must map resource names to positive numbers",
+        )
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown priority '{priority}'")
+    if (
+        not isinstance(slack_tolerance, (int, float))
+        or isinstance(slack_tolerance, bool)
+        or slack_tolerance < 0
+    ):
+        raise HTTPException(
+            status_code=400, detail="slack_tolerance must be a non-negative number"
+        )
+
+    file_location = RESULT_DIR / f"{config_name}.json"
+    if not file_location.exists():
+        raise HTTPException(
+            status_code=404, detail=f"Config file {config_name}.json not found"
+        )
+
     try:
-        file_name = f"{config_name}.json"
-        file_location = RESULT_DIR / file_name
-        pert_result = IOUtils.calculate_pert(file_location, time=expected_time)
-        IOUtils.generate_table(
-            pert_result=pert_result,
-            table_format=["csv", "excel"],
-            save_path=RESULT_DIR,
-            config_name=config_name,
+        options: dict = {"renderer": renderer}
+        if capacities:
+            options.update(capacities=sorted(capacities.items()), priority=priority)
+        if slack_tolerance:
+            options.update(slack_tolerance=slack_tolerance)
+        # hashing reads the whole config, keep it off the event loop
+        cache_key, cached = await run_in_threadpool(
+            cached_result, file_location, config_name, expected_time, options
         )
-        IOUtils.generate_graph_svg(
-            pert_result=pert_result, save_path=RESULT_DIR, config_name=config_name
+        if cached is not None:
+            job = JOB_MANAGER.add_finished(
+                cache_key, cached, artifact_links(config_name)
+            )
+            return job.to_dict()
+
+        # file and database writes, JOB_MANAGER runs it in a thread
+        def store(job: Job):
+            observe_profile(job.profile)
+            RESULT_CACHE.put(
+                cache_key, job.result, config_name=config_name, source_dir=RESULT_DIR
+            )
+            STORE.add_result(
+                config_name,
+                job.finished_at,
+                job.result,
+                expected_time=expected_time,
+                cache_key=cache_key,
+            )
+
+        RESULT_CACHE.detach(config_name, RESULT_DIR)
+        job = JOB_MANAGER.submit(
+            f"{config_name}:{cache_key}",
+            IOUtils.calculate_and_export,
+            file_location,
+            RESULT_DIR,
+            config_name,
+            expected_time,
+            renderer,
+            capacities,
+            priority,
+            slack_tolerance,
+            artifacts=artifact_links(config_name),
+            on_done=store,
         )
+        return job.to_dict()
 
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/api/cache/stats")
+async def cache_stats():
+    return RESULT_CACHE.stats()
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from ...artifacts import artifact_response
 from ...functions import IOUtils
+from ...table_export import TableExporter
 import os
 from pathlib import Path
 
@@ -8,18 +10,34 @@ router = APIRouter(redirect_slashes=False)
 RESULT_DIR = IOUtils.create_dir("cache")
 
 
+async def build_workbook(file_path: Path) -> bool:
+    """
+    Build <config>_tables.xlsx from the CSV files of the last calculation
+    Return False if there is nothing to build it from
+    """
+    if not file_path.name.endswith("_tables.xlsx"):
+        return False
+    config_name = file_path.name.removesuffix("_tables.xlsx")
+    tasks_path = RESULT_DIR / f"{config_name}_tasks.csv"
+    summary_path = RESULT_DIR / f"{config_name}_summary.csv"
+    if not (tasks_path.exists() and summary_path.exists()):
+        return False
+    await run_in_threadpool(
+        TableExporter.excel_from_csv, tasks_path, summary_path, file_path
+    )
+    return True
+
+
 @router.get("/api/download/{file_type}/{config_name}")
-async def download_file(config_name: str, file_type: str):
+async def download_file(request: Request, config_name: str, file_type: str):
     if file_type not in ["xlsx", "csv", "svg"]:
         raise HTTPException(status_code=400, detail="File Type Not Allowed")
 
     file_path = Path(RESULT_DIR) / f"{config_name}.{file_type}"
 
     if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
+        # the workbook is only built when someone asks for it
+        if file_type != "xlsx" or not await build_workbook(file_path):
+            raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(
-        file_path,
-        media_type="application/octet-stream",
-        filename=f"{config_name}.{file_type}",
-    )
+    return artifact_response(request, file_path, filename=f"{config_name}.{file_type}")
@@ -1,65 +1,74 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from ...functions import IOUtils
-import json
+from .calculate import STORE
 
 router = APIRouter(redirect_slashes=False)
 RESULT_DIR = IOUtils.create_dir("cache")
+# section -> file, the response key is "<section>_content"
+DETAIL_SECTIONS = {
+    "json": "{config_name}.json",
+    "csv_summary": "{config_name}_summary.csv",
+    "csv_tasks": "{config_name}_tasks.csv",
+    "svg_graph": "{config_name}_graph.svg",
+}
 
 
-@router.get("/api/list_configs")
-async def list_configs():
-    config_info_location = RESULT_DIR / "config_info.json"
+def read_details(config_name: str, sections: list[str]) -> dict:
+    """
+    Read the files of the sections, None for those that do not exist; runs
+    in the threadpool
+    """
+    details = {}
+    for section in sections:
+        path = RESULT_DIR / DETAIL_SECTIONS[section].format(config_name=config_name)
+        if path.exists():
+            with open(path, "r") as f:
+                details[f"{section}_content"] = f.read()
+        else:
+            details[f"{section}_content"] = None
+    return details
+
 
+@router.get("/api/list_configs")
+async def list_configs(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    name: str | None = None,
+    since: int | None = None,
+    until: int | None = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+):
     try:
-        if config_info_location.exists():
-            with open(config_info_location, "r") as f:
-                config_data = json.load(f)
-            return {"configs": config_data}
-        else:
-            return {"configs": []}
+        configs, total = await run_in_threadpool(
+            STORE.list_configs,
+            offset=offset,
+            limit=limit,
+            name=name,
+            since=since,
+            until=until,
+            descending=order == "desc",
+        )
+        return {"configs": configs, "total": total, "offset": offset, "limit": limit}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/api/list_details")
 async def list_details(request: Request):
+    """
+    sections: any of DETAIL_SECTIONS, all of them by default. Sections not
+    asked for are left out of the response instead of being read
+    """
     body = await request.json()
     config_name: str = body.get("config_name")
     if not config_name:
         raise HTTPException(status_code=400, detail="config_name is required")
+    sections = body.get("sections") or list(DETAIL_SECTIONS)
+    unknown = [section for section in sections if section not in DETAIL_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown sections: {', '.join(unknown)}"
+        )
 
-    json_file = RESULT_DIR / f"{config_name}.json"
-    csv_file_summary = RESULT_DIR / f"{config_name}_summary.csv"
-    csv_file_tasks = RESULT_DIR / f"{config_name}_tasks.csv"
-    svg_graph_file = RESULT_DIR / f"{config_name}_graph.svg"
-
-    if json_file.exists():
-        with open(json_file, "r") as f:
-            json_content = f.read()
-    else:
-        json_content = None
-
-    if csv_file_tasks.exists():
-        with open(csv_file_tasks, "r") as f:
-            csv_tasks_content = f.read()
-    else:
-        csv_tasks_content = None
-
-    if csv_file_summary.exists():
-        with open(csv_file_summary, "r") as f:
-            csv_summary_content = f.read()
-    else:
-        csv_summary_content = None
-
-    if svg_graph_file.exists():
-        with open(svg_graph_file, "r") as f:
-            svg_graph_content = f.read()
-    else:
-        svg_graph_content = None
-
-    return {
-        "json_content": json_content,
-        "csv_summary_content": csv_summary_content,
-        "csv_tasks_content": csv_tasks_content,
-        "svg_graph_content": svg_graph_content,
-    }
+    return await run_in_threadpool(read_details, config_name, sections)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from ...metrics import REGISTRY, CONTENT_TYPE
+from .calculate import JOB_MANAGER, RESULT_CACHE
+
+router = APIRouter(redirect_slashes=False)
+
+REGISTRY.gauge(
+    "pert_jobs_in_flight",
+    "Calculations queued or running",
+    lambda: JOB_MANAGER.active,
+)
+REGISTRY.gauge(
+    "pert_result_cache_memory_entries",
+    "Results held in the in-memory cache",
+    lambda: RESULT_CACHE.stats()["memory_entries"],
+)
+REGISTRY.gauge(
+    "pert_result_cache_hit_ratio",
+    "Share of result lookups answered from the cache",
+    lambda: RESULT_CACHE.stats()["hit_ratio"],
+)
+for stat, documentation in (
+    ("memory_hits", "Result lookups answered from memory"),
+    ("disk_hits", "Result lookups answered from disk"),
+    ("misses", "Result lookups that needed a calculation"),
+    ("evictions", "Results evicted from the disk cache"),
+):
+    REGISTRY.counter(
+        f"pert_result_cache_{stat}_total",
+        documentation,
+        lambda stat=stat: RESULT_CACHE.stats()[stat],
+    )
+
+
+@router.get("/metrics")
+async def metrics():
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
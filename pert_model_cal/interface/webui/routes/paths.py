@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ...functions import IOUtils
+from .calculate import SESSIONS
+from ....core.model.output import PathResult
+
+router = APIRouter(redirect_slashes=False)
+RESULT_DIR = IOUtils.create_dir("cache")
+
+# paths returned by one request, the work grows with k
+MAX_K = 1000
+
+
+def paths(config_name: str, k: int) -> list[PathResult]:
+    """
+    Load the session and enumerate the paths; runs in the threadpool
+    """
+    file_location = RESULT_DIR / f"{config_name}.json"
+    try:
+        with SESSIONS.session(config_name, file_location) as pert:
+            try:
+                return pert.longest_paths(k)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/api/configs/{config_name}/paths")
+async def longest_paths(config_name: str, request: Request):
+    """
+    Body: {"k": 10}, the k longest paths, longest first
+    Answered from the in-memory session, the config is only read once
+    """
+    body = await request.json()
+    k = body.get("k", 1)
+    if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_K:
+        raise HTTPException(
+            status_code=400, detail=f"k must be an integer from 1 to {MAX_K}"
+        )
+
+    return await run_in_threadpool(paths, config_name, k)
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ...functions import IOUtils
+from .calculate import SESSIONS
+from ....core.model.output import DeadlineCurve
+
+router = APIRouter(redirect_slashes=False)
+RESULT_DIR = IOUtils.create_dir("cache")
+
+# deadlines plus confidence levels accepted by one request
+MAX_POINTS = 10000
+
+
+def curve(config_name: str, deadlines: list, confidence: list) -> DeadlineCurve:
+    """
+    Load the session and evaluate the curve; runs in the threadpool
+    """
+    file_location = RESULT_DIR / f"{config_name}.json"
+    try:
+        with SESSIONS.session(config_name, file_location) as pert:
+            try:
+                return pert.probability_curve(
+                    deadlines=deadlines, confidence=confidence
+                )
+            except (TypeError, ValueError) as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/api/configs/{config_name}/probability")
+async def probability_curve(config_name: str, request: Request):
+    """
+    Body: {"deadlines": [...], "confidence": [...]}, either may be left out
+    Answered from the in-memory session, the config is only read once
+    """
+    body = await request.json()
+    deadlines = body.get("deadlines") or []
+    confidence = body.get("confidence") or []
+    if not isinstance(deadlines, list) or not isinstance(confidence, list):
+        raise HTTPException(
+            status_code=400, detail="deadlines and confidence must be lists"
+        )
+    if not deadlines and not confidence:
+        raise HTTPException(
+            status_code=400, detail="At least one deadline or confidence is required"
+        )
+    if len(deadlines) + len(confidence) > MAX_POINTS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_POINTS} points per request"
+        )
+
+    return await run_in_threadpool(curve, config_name, deadlines, confidence)
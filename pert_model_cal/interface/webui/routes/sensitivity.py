@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ...functions import IOUtils
+from .calculate import SESSIONS
+from ....core.model.output import SensitivityResult
+
+router = APIRouter(redirect_slashes=False)
+RESULT_DIR = IOUtils.create_dir("cache")
+
+
+def sweep(config_name: str, **options) -> SensitivityResult:
+    """
+    Load the session and run the sweep; runs in the threadpool
+    """
+    file_location = RESULT_DIR / f"{config_name}.json"
+    try:
+        with SESSIONS.session(config_name, file_location) as pert:
+            try:
+                return pert.sensitivity(**options)
+            except (TypeError, ValueError) as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/api/configs/{config_name}/sensitivity")
+async def sensitivity(config_name: str, request: Request):
+    """
+    Body: {"field", "factors", "scenarios", "top"}, all optional
+    field: "optimistic", "most_likely", "pessimistic" (default) or "all"
+    scenarios: {"name": {"label": factor, ...}, ...}
+    """
+    body = await request.json()
+    field = body.get("field") or "pessimistic"
+    factors = body.get("factors") or [1.2]
+    scenarios = body.get("scenarios") or None
+    top = body.get("top", 50)
+    if not isinstance(factors, list) or not (
+        scenarios is None or isinstance(scenarios, dict)
+    ):
+        raise HTTPException(
+            status_code=400, detail="factors must be a list and scenarios an object"
+        )
+    if top is not None and (not isinstance(top, int) or top < 1):
+        raise HTTPException(status_code=400, detail="top must be a positive integer")
+
+    return await run_in_threadpool(
+        sweep, config_name, field=field, factors=factors, scenarios=scenarios, top=top
+    )
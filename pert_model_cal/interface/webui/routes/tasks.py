@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ...functions import IOUtils
+from .calculate import SESSIONS, STORE
+from ....core.model.output import TaskOut
+
+router = APIRouter(redirect_slashes=False)
+RESULT_DIR = IOUtils.create_dir("cache")
+
+# request field -> keyword of PERT.update_task
+TASK_FIELDS = {
+    "optimistic_estimate": "optimistic",
+    "most_likely_estimate": "most_likely",
+    "pessimistic_estimate": "pessimistic",
+    "predecessors": "predecessors",
+}
+
+
+def apply_update(config_name: str, label: str, update: dict) -> dict:
+    """
+    Edit the session, then the config file and its task row; runs in
+    the threadpool
+    The file, the row and the session stay in step: a failed write rolls
+    the row back and drops the edited session so the next request
+    reloads the file
+    """
+    file_location = RESULT_DIR / f"{config_name}.json"
+    try:
+        with SESSIONS.session(config_name, file_location) as pert:
+            try:
+                changed = pert.update_task(
+                    label, **{TASK_FIELDS[key]: value for key, value in update.items()}
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            try:
+                with STORE.updating_task(config_name, label, update):
+                    IOUtils.update_task_in_json(file_location, label, update)
+            except Exception as e:
+                SESSIONS.discard(config_name)
+                raise HTTPException(status_code=500, detail=str(e))
+            # keyed on the mtime of the file just written
+            SESSIONS.put(config_name, file_location, pert)
+
+            return {
+                "expected_duration": pert.expected_time,
+                "expected_probability": pert.expected_probability,
+                "critical_path": pert.critical_path,
+                "updated_tasks": [TaskOut.from_task(pert.tasks[c]) for c in changed],
+            }
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.patch("/api/configs/{config_name}/tasks/{label}")
+async def update_task(config_name: str, label: str, request: Request):
+    body = await request.json()
+    update = {key: body[key] for key in TASK_FIELDS if body.get(key) is not None}
+    if not update:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At least one of {', '.join(TASK_FIELDS)} is required",
+        )
+    return await run_in_threadpool(apply_update, config_name, label, update)
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ....core.input_parser import InputParser
+from ....core.validation import checked_batches
 from ...functions import IOUtils
+from .calculate import STORE
 import time
-import json
+import uuid
 
 router = APIRouter(redirect_slashes=False)
 RESULT_DIR = IOUtils.create_dir("cache")
@@ -10,28 +14,30 @@ RESULT_DIR = IOUtils.create_dir("cache")
 @router.post("/api/uploadfile")
 async def upload_file(file: UploadFile = File(...)):
     timestamp = int(time.time())
-    config_name = f"config_{timestamp}"
-    file_location = RESULT_DIR / f"{config_name}.json"
+    # the config name is only known once the row is inserted
+    upload_location = RESULT_DIR / f".upload_{uuid.uuid4().hex}.json"
 
     try:
-        with open(file_location, "wb") as f:
-            f.write(await file.read())
-
-        config_info = {"name": config_name, "timestamp": timestamp}
-
-        # use config_info.json to store index
-        config_info_location = RESULT_DIR / "config_info.json"
-        if config_info_location.exists():
-            with open(config_info_location, "r") as f:
-                config_data = json.load(f)
-        else:
-            config_data = []
-
-        config_data.append(config_info)
-
-        with open(config_info_location, "w") as f:
-            json.dump(config_data, f)
-
-        return {"message": "File uploaded successfully"}
+        with open(upload_location, "wb") as f:
+            while chunk := await file.read(InputParser.read_size):
+                f.write(chunk)
+
+        try:
+            config_name = await run_in_threadpool(
+                STORE.add_config,
+                timestamp,
+                # rolled back unless the tasks form a valid DAG
+                checked_batches(InputParser.iter_task_batches(upload_location)),
+                file.filename,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid config file: {e}")
+
+        upload_location.replace(RESULT_DIR / f"{config_name}.json")
+        return {"message": "File uploaded successfully", "config_name": config_name}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload_location.unlink(missing_ok=True)
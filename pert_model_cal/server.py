@@ -1,3 +1,5 @@
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -5,9 +7,42 @@ from fastapi.middleware.cors import CORSMiddleware
 from .interface.webui.routes.upload_file import router as file_upload_router
 from .interface.webui.routes.list_configs import router as list_config_router
 from .interface.webui.routes.calculate import router as calculate_router
+from .interface.webui.routes.calculate import JOB_MANAGER, RESULT_CACHE, SESSIONS
 from .interface.webui.routes.download import router as download_router
+from .interface.webui.routes.tasks import router as tasks_router
+from .interface.webui.routes.metrics import router as metrics_router
+from .interface.webui.routes.probability import router as probability_router
+from .interface.webui.routes.sensitivity import router as sensitivity_router
+from .interface.webui.routes.paths import router as paths_router
+from .interface.metrics import REQUEST_SECONDS
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    JOB_MANAGER.shutdown()
+    SESSIONS.clear()
+
+
+def configure(
+    workers: int | None = None,
+    queue_depth: int | None = None,
+    cache_memory_entries: int | None = None,
+    cache_disk_entries: int | None = None,
+):
+    """
+    Set the size of the calculation process pool, the number of
+    calculations that may be queued or running at once and the capacity
+    of both tiers of the result cache
+    """
+    JOB_MANAGER.configure(workers=workers, queue_depth=queue_depth)
+    RESULT_CACHE.configure(
+        max_memory_entries=cache_memory_entries,
+        max_disk_entries=cache_disk_entries,
+    )
+
+
+app = FastAPI(lifespan=lifespan)
 
 # 配置 CORS
 app.add_middleware(
@@ -18,6 +53,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # the route template keeps ids and config names out of the labels
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status),
+        )
+
+
 app.mount(
     "/static",
     StaticFiles(directory="pert_model_cal/interface/webui/static"),
@@ -30,6 +85,11 @@ app.include_router(file_upload_router)
 app.include_router(list_config_router)
 app.include_router(calculate_router)
 app.include_router(download_router)
+app.include_router(tasks_router)
+app.include_router(metrics_router)
+app.include_router(probability_router)
+app.include_router(sensitivity_router)
+app.include_router(paths_router)
 
 
 @app.get("/")
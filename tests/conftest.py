@@ -0,0 +1,124 @@
+import json
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def webapp(tmp_path_factory):
+    """
+    TestClient of the server, run from a scratch directory so its cache
+    stays out of the repository
+    """
+    root = tmp_path_factory.mktemp("server")
+    (root / "pert_model_cal").symlink_to(REPO / "pert_model_cal")
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        from fastapi.testclient import TestClient
+        from pert_model_cal.server import app
+
+        with TestClient(app) as client:
+            yield client
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def upload(webapp):
+    """
+    Upload a task list and return its config name
+    """
+
+    def upload(tasks: list[dict]) -> str:
+        response = webapp.post(
+            "/api/uploadfile",
+            files={"file": ("tasks.json", json.dumps(tasks).encode())},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["config_name"]
+
+    return upload
+
+
+def make_tasks(
+    seed: int, n: int, max_preds: int = 3, resources: dict | None = None
+) -> list[dict]:
+    """
+    A random DAG as task dicts, listed in a shuffled order
+    resources: name -> largest demand, drawn for about half the tasks
+    """
+    rng = random.Random(seed)
+    order = list(range(n))
+    rng.shuffle(order)
+    tasks = []
+    for position, i in enumerate(order):
+        earlier = order[:position]
+        # mostly recent tasks, so random plans also get long chains
+        window = earlier[-rng.choice([1, 4, len(earlier) or 1]) :]
+        preds = rng.sample(window, min(len(window), rng.randint(0, max_preds)))
+        optimistic = rng.randint(1, 9)
+        most_likely = optimistic + rng.randint(0, 5)
+        task = {
+            "label": f"T{i}",
+            "name": None,
+            "optimistic_estimate": optimistic,
+            "most_likely_estimate": most_likely,
+            "pessimistic_estimate": most_likely + rng.randint(0, 9),
+            "predecessors": [f"T{p}" for p in preds],
+        }
+        if resources and rng.random() < 0.5:
+            task["resources"] = {
+                name: rng.randint(1, units)
+                for name, units in resources.items()
+                if rng.random() < 0.7
+            }
+        tasks.append(task)
+    rng.shuffle(tasks)
+    return tasks
+
+
+@pytest.fixture
+def random_tasks():
+    return make_tasks
+
+
+def estimate(task: dict) -> float:
+    return (
+        task["optimistic_estimate"]
+        + 4 * task["most_likely_estimate"]
+        + task["pessimistic_estimate"]
+    ) / 6
+
+
+def networkx_schedule(tasks: list[dict]) -> dict[str, tuple]:
+    """
+    label -> (earliest start, earliest finish, latest start, latest finish),
+    the critical path method over a networkx DiGraph
+    """
+    import networkx
+
+    graph = networkx.DiGraph()
+    duration = {t["label"]: estimate(t) for t in tasks}
+    graph.add_nodes_from(duration)
+    for t in tasks:
+        graph.add_edges_from((p, t["label"]) for p in t["predecessors"])
+    order = list(networkx.topological_sort(graph))
+    ef = {}
+    for v in order:
+        ef[v] = max((ef[u] for u in graph.predecessors(v)), default=0) + duration[v]
+    end = max(ef.values(), default=0)
+    ls = {}
+    for v in reversed(order):
+        lf = min((ls[w] for w in graph.successors(v)), default=end)
+        ls[v] = lf - duration[v]
+    return {v: (ef[v] - duration[v], ef[v], ls[v], ls[v] + duration[v]) for v in order}
+
+
+@pytest.fixture
+def reference_schedule():
+    return networkx_schedule
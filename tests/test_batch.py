@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from pert_model_cal.interface.cli.batch import BatchOptions, expand_paths, run_batch
+
+
+@pytest.fixture
+def files(tmp_path, random_tasks):
+    sizes = [3000, 10, 400, 10]
+    paths = []
+    for i, n in enumerate(sizes):
+        path = tmp_path / f"plan_{i}.json"
+        path.write_text(json.dumps(random_tasks(i, n)))
+        paths.append(path)
+    bad = random_tasks(0, 5)
+    bad[2]["optimistic_estimate"] = "soon"
+    (tmp_path / "plan_4.json").write_text(json.dumps(bad))
+    cyclic = random_tasks(0, 5)
+    cyclic[0]["predecessors"] = ["T1"]
+    cyclic[1]["predecessors"] = [cyclic[0]["label"]]
+    (tmp_path / "plan_5.json").write_text(json.dumps(cyclic))
+    (tmp_path / "plan_6.json").write_text("[{}, ")
+    return expand_paths([str(tmp_path / "plan_*.json")])
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_rows_in_path_order_with_the_real_errors(tmp_path, files, workers):
+    reported = []
+    rows = run_batch(
+        files, tmp_path / "result", BatchOptions(), workers, reported.append
+    )
+    assert [row["file"] for row in rows] == [str(path) for path in files]
+    assert sorted(map(id, reported)) == sorted(map(id, rows))
+    assert [row["status"] for row in rows] == ["done"] * 4 + ["failed"] * 3
+    assert [row["tasks"] for row in rows[:4]] == [3000, 10, 400, 10]
+    errors = [row["error"] for row in rows[4:]]
+    assert errors[0].startswith("Invalid JSON file: ")
+    assert "2.optimistic_estimate" in errors[0]
+    assert errors[1].startswith("Cycle ")
+    assert errors[2].startswith("Invalid JSON file: Unexpected end")
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from pert_model_cal.core.cpm_engine import (
+    CPMEngine,
+    CSRGraph,
+    CycleError,
+    _NarrowRun,
+    find_cycles,
+)
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.model.task_data import TaskTable
+from pert_model_cal.core.pert_calculator import PERT
+
+
+def table(tasks: list[dict]) -> TaskTable:
+    return TaskTable.from_task_inputs([[TaskInput(**t) for t in tasks]])
+
+
+def chain(n: int) -> list[dict]:
+    return [
+        {
+            "label": f"T{i}",
+            "name": None,
+            "optimistic_estimate": 1 + i % 3,
+            "most_likely_estimate": 2 + i % 5,
+            "pessimistic_estimate": 8,
+            "predecessors": [f"T{i - 1}"] if i else [],
+        }
+        for i in range(n)
+    ]
+
+
+def wide(n: int) -> list[dict]:
+    # two sources, n tasks on each, joined by one sink
+    tasks = chain(2)
+    tasks[1]["predecessors"] = []
+    tasks += [
+        {**tasks[0], "label": f"W{i}", "predecessors": [f"T{i % 2}"]}
+        | {"most_likely_estimate": 2 + i % 7}
+        for i in range(n)
+    ]
+    tasks.append(
+        {**tasks[0], "label": "END", "predecessors": [f"W{i}" for i in range(n)]}
+    )
+    return tasks
+
+
+def assert_matches_networkx(tasks, reference_schedule):
+    pert = PERT(table(tasks))
+    pert.calculate_pert()
+    t = pert.table
+    expected = reference_schedule(tasks)
+    columns = np.array([expected[label] for label in t.labels]).reshape(-1, 4)
+    np.testing.assert_allclose(t.earliest_start, columns[:, 0], atol=1e-9)
+    np.testing.assert_allclose(t.earliest_finish, columns[:, 1], atol=1e-9)
+    np.testing.assert_allclose(t.latest_start, columns[:, 2], atol=1e-9)
+    np.testing.assert_allclose(t.latest_finish, columns[:, 3], atol=1e-9)
+    np.testing.assert_allclose(t.slack, columns[:, 2] - columns[:, 0], atol=1e-9)
+    assert pert.expected_time == pytest.approx(columns[:, 1].max(initial=0))
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("n", [1, 15, 80, 400])
+def test_random_dags_match_networkx(random_tasks, reference_schedule, seed, n):
+    assert_matches_networkx(random_tasks(seed, n), reference_schedule)
+
+
+@pytest.mark.parametrize("tasks", [chain(300), wide(300)], ids=["chain", "wide"])
+def test_shapes_match_networkx(reference_schedule, tasks):
+    assert_matches_networkx(tasks, reference_schedule)
+
+
+def braid(n: int) -> list[dict]:
+    # a chain where every third task also waits for the one before last
+    tasks = chain(n)
+    for i in range(2, n, 3):
+        tasks[i]["predecessors"] = [f"T{i - 1}", f"T{i - 2}"]
+    return tasks
+
+
+@pytest.mark.parametrize(
+    "seed, shape",
+    [(seed, "random") for seed in range(4)] + [(0, "chain"), (0, "braid")],
+)
+def test_sampled_durations_match_one_pass_per_sample(random_tasks, seed, shape):
+    tasks = {
+        "random": random_tasks(seed, 200),
+        "chain": chain(300),
+        "braid": braid(300),
+    }
+    t = table(tasks[shape])
+    engine = CPMEngine(t.graph)
+    if shape != "random":
+        # long runs of narrow levels are walked task by task
+        assert any(isinstance(step, _NarrowRun) for step in engine._steps)
+    durations = np.random.default_rng(seed).uniform(1, 10, (len(t), 5))
+    es, ef = engine.forward(durations)
+    end = ef.max(axis=0)
+    ls, lf = engine.backward(durations, end)
+    for s in range(durations.shape[1]):
+        es1, ef1 = engine.forward(durations[:, s])
+        ls1, lf1 = engine.backward(durations[:, s], float(ef1.max()))
+        np.testing.assert_array_equal(es[:, s], es1)
+        np.testing.assert_array_equal(ef[:, s], ef1)
+        np.testing.assert_array_equal(ls[:, s], ls1)
+        np.testing.assert_array_equal(lf[:, s], lf1)
+
+
+def test_cycle_is_reported():
+    import networkx
+
+    # 0 -> 1 -> 2 -> 0 and 3 -> 4 -> 3, task 5 hangs off the first cycle
+    src, dst = [0, 1, 2, 3, 4, 2], [1, 2, 0, 4, 3, 5]
+    graph = CSRGraph.from_edges(6, src, dst)
+    with pytest.raises(CycleError) as error:
+        CPMEngine(graph)
+    edges = set(zip(src, dst))
+    cycles = error.value.cycles
+    assert cycles == find_cycles(graph)
+    assert len(cycles) == len(list(networkx.simple_cycles(networkx.DiGraph(edges))))
+    for cycle in cycles:
+        assert cycle[0] == cycle[-1]
+        assert set(zip(cycle, cycle[1:])) <= edges
+
+
+def test_empty_graph():
+    engine = CPMEngine(CSRGraph.from_edges(0, [], []))
+    es, ef = engine.forward(np.zeros(0))
+    ls, lf = engine.backward(np.zeros(0), 0)
+    assert es.size == ef.size == ls.size == lf.size == 0
@@ -0,0 +1,70 @@
+import json
+import time
+
+import pytest
+
+from pert_model_cal.core.input_parser import InputParser
+
+TASK = b'{"id": "%d", "name": "t\\"}{,", "predecessors": []}'
+
+
+def parse(tmp_path, data: bytes, read_size: int | None = None) -> list[dict]:
+    path = tmp_path / "tasks.json"
+    path.write_bytes(data)
+    objects = []
+    for run in InputParser.iter_json_array(path, read_size=read_size):
+        objects.extend(run)
+    return objects
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 7, None])
+def test_valid_array(tmp_path, read_size):
+    data = b" \n[ " + b" ,\n".join(TASK % i for i in range(5)) + b" ]\n"
+    objects = parse(tmp_path, data, read_size)
+    assert [o["id"] for o in objects] == [str(i) for i in range(5)]
+    assert objects[0]["name"] == 't"}{,'
+
+
+@pytest.mark.parametrize("read_size", [1, None])
+def test_empty_array(tmp_path, read_size):
+    assert parse(tmp_path, b"[ \n ]", read_size) == []
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b'[{"a": 1} {"a": 2}]', "Expected ',' between tasks"),
+        (b'[{"a": 1},, {"a": 2}]', "Expected a task after ','"),
+        (b'[{"a": 1}, {"a": 2},]', "Trailing ',' before the end of the task list"),
+        (b'[, {"a": 1}]', "Expected a task before ','"),
+        (b'[{"a": 1}, [1]]', "Every task must be a JSON object"),
+        (b"[1]", "Every task must be a JSON object"),
+        (b'[{"a": 1}] {"a": 2}', "Unexpected content after the task list"),
+        (b'[{"a": 1}] x', "Unexpected content after the task list"),
+        (b'[{"a": 1}, {"a": 2}', "Unexpected end of the task list"),
+        (b'{"a": 1}', "Json file must contain a list of tasks"),
+    ],
+)
+@pytest.mark.parametrize("read_size", [1, 3, None])
+def test_malformed_array(tmp_path, data, message, read_size):
+    with pytest.raises(json.JSONDecodeError, match=message):
+        parse(tmp_path, data, read_size)
+
+
+def test_invalid_task(tmp_path):
+    with pytest.raises(json.JSONDecodeError, match="Invalid task") as error:
+        parse(tmp_path, b'[{"a": 1}, {"a": tru}]')
+    assert error.value.pos == 17
+
+
+def test_early_error_is_raised_before_the_rest_is_read(tmp_path):
+    tasks = [TASK % i for i in range(200000)]
+    data = b"[" + tasks[0] + b" " + b",".join(tasks[1:]) + b"]"
+    path = tmp_path / "tasks.json"
+    path.write_bytes(data)
+    start = time.perf_counter()
+    with pytest.raises(json.JSONDecodeError, match="Expected ','") as error:
+        for _ in InputParser.iter_json_array(path):
+            pass
+    assert error.value.pos == len(tasks[0]) + 2
+    assert time.perf_counter() - start < 2
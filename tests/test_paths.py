@@ -0,0 +1,75 @@
+import math
+
+import networkx
+import pytest
+
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.model.task_data import TaskTable
+from pert_model_cal.core.pert_calculator import PERT
+
+
+def build(tasks: list[dict]) -> PERT:
+    pert = PERT(TaskTable.from_task_inputs([[TaskInput(**t) for t in tasks]]))
+    pert.calculate_pert()
+    return pert
+
+
+def all_paths(tasks: list[dict]) -> list[list[str]]:
+    graph = networkx.DiGraph()
+    graph.add_nodes_from(t["label"] for t in tasks)
+    for t in tasks:
+        graph.add_edges_from((p, t["label"]) for p in t["predecessors"])
+    sources = [v for v in graph if not graph.in_degree(v)]
+    sinks = {v for v in graph if not graph.out_degree(v)}
+    # a task on its own is a path from a source to a sink as well
+    paths = {(v,) for v in sources if v in sinks}
+    for source in sources:
+        paths.update(map(tuple, networkx.all_simple_paths(graph, source, sinks)))
+    return [list(path) for path in paths]
+
+
+@pytest.mark.parametrize("seed", range(15))
+@pytest.mark.parametrize("k", [1, 4, 30])
+def test_k_longest_match_enumeration(random_tasks, seed, k):
+    tasks = random_tasks(seed, 14)
+    by_label = {t["label"]: t for t in tasks}
+    pert = build(tasks)
+    table = pert.table
+    estimate = {label: table.estimate[i] for label, i in table.index.items()}
+    variance = {label: table.variance[i] for label, i in table.index.items()}
+    lengths = sorted(
+        (sum(estimate[v] for v in path) for path in all_paths(tasks)), reverse=True
+    )
+
+    paths = pert.longest_paths(k)
+    assert [p.duration for p in paths] == pytest.approx(lengths[:k])
+    assert paths[0].duration == pytest.approx(pert.expected_time)
+    assert len({tuple(p.labels) for p in paths}) == len(paths)
+    for path in paths:
+        assert not by_label[path.labels[0]]["predecessors"]
+        assert not any(path.labels[-1] in t["predecessors"] for t in tasks)
+        for u, v in zip(path.labels, path.labels[1:]):
+            assert u in by_label[v]["predecessors"]
+        assert path.duration == pytest.approx(sum(estimate[v] for v in path.labels))
+        assert path.variance == pytest.approx(sum(variance[v] for v in path.labels))
+        assert path.std_duration == pytest.approx(math.sqrt(path.variance))
+        assert path.slack == pytest.approx(paths[0].duration - path.duration)
+
+
+def test_k_must_be_positive(random_tasks):
+    with pytest.raises(ValueError, match="k must be at least 1"):
+        build(random_tasks(0, 5)).longest_paths(0)
+
+
+def test_paths_route(upload, random_tasks, webapp):
+    tasks = random_tasks(1, 12)
+    name = upload(tasks)
+    response = webapp.post(f"/api/configs/{name}/paths", json={"k": 3})
+    assert response.status_code == 200, response.text
+    expected = build(tasks).longest_paths(3)
+    assert [p["labels"] for p in response.json()] == [p.labels for p in expected]
+
+    response = webapp.post(f"/api/configs/{name}/paths", json={"k": 0})
+    assert response.status_code == 400
+    response = webapp.post("/api/configs/missing/paths", json={"k": 1})
+    assert response.status_code == 404
@@ -0,0 +1,98 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.model.task_data import TaskTable
+from pert_model_cal.core.pert_calculator import PERT
+from pert_model_cal.core.plan_file import plan_header, read_plan, write_plan
+from pert_model_cal.interface.functions import IOUtils
+
+COLUMNS = ("optimistic", "most_likely", "pessimistic", "demand")
+GRAPH = ("pred_offsets", "pred_index", "succ_offsets", "succ_index")
+
+
+def table(tasks: list[dict]) -> TaskTable:
+    return TaskTable.from_task_inputs([[TaskInput(**t) for t in tasks]])
+
+
+def assert_same_table(loaded: TaskTable, expected: TaskTable):
+    assert loaded.labels == expected.labels
+    assert loaded.names == expected.names
+    assert loaded.resource_names == expected.resource_names
+    for column in COLUMNS:
+        np.testing.assert_array_equal(
+            getattr(loaded, column), getattr(expected, column)
+        )
+    for column in GRAPH:
+        np.testing.assert_array_equal(
+            getattr(loaded.graph, column), getattr(expected.graph, column)
+        )
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("n", [0, 1, 200])
+def test_round_trip(tmp_path, random_tasks, reference_schedule, seed, n):
+    tasks = random_tasks(seed, n, resources={"crane": 2, "crew": 4})
+    for i, task in enumerate(tasks):
+        task["name"] = None if i % 3 else f"Tâche {i} ✓"
+    expected = table(tasks)
+    path = tmp_path / "tasks.plan"
+    write_plan(expected, path, source={"name": "tasks.json"})
+    loaded = read_plan(path)
+    assert_same_table(loaded, expected)
+    assert plan_header(path)["source"] == {"name": "tasks.json"}
+
+    pert = PERT(loaded)
+    pert.calculate_pert()
+    schedule = reference_schedule(tasks)
+    np.testing.assert_allclose(
+        pert.table.latest_start,
+        [schedule[label][2] for label in pert.table.labels],
+        atol=1e-9,
+    )
+
+
+def test_edits_stay_in_memory(tmp_path, random_tasks):
+    path = tmp_path / "tasks.plan"
+    write_plan(table(random_tasks(0, 20)), path)
+    data = path.read_bytes()
+    pert = PERT(read_plan(path))
+    pert.calculate_pert()
+    pert.update_task("T3", pessimistic=99, predecessors=[])
+    assert pert.table.pessimistic[pert.table.index["T3"]] == 99
+    assert path.read_bytes() == data
+
+
+def test_damaged_plans(tmp_path, random_tasks):
+    path = tmp_path / "tasks.plan"
+    write_plan(table(random_tasks(0, 20)), path)
+    data = path.read_bytes()
+    path.write_bytes(data[:-64])
+    with pytest.raises(ValueError, match="truncated"):
+        read_plan(path)
+    path.write_bytes(b"PERTPLAX" + data[8:])
+    with pytest.raises(ValueError, match="Not a compiled plan"):
+        read_plan(path)
+    path.write_bytes(data[:10])
+    with pytest.raises(ValueError, match="too short"):
+        read_plan(path)
+
+
+def test_load_compiled_follows_the_json(tmp_path, random_tasks):
+    source = tmp_path / "tasks.json"
+    tasks = random_tasks(0, 30)
+    source.write_text(json.dumps(tasks))
+    assert_same_table(IOUtils.load_compiled(source), table(tasks))
+    plan = source.with_suffix(".plan")
+    compiled = plan.stat().st_mtime_ns
+    assert_same_table(IOUtils.load_compiled(source), table(tasks))
+    assert plan.stat().st_mtime_ns == compiled
+
+    tasks[0]["pessimistic_estimate"] += 10
+    source.write_text(json.dumps(tasks))
+    os.utime(source, ns=(compiled + 10**9, compiled + 10**9))
+    assert_same_table(IOUtils.load_compiled(source), table(tasks))
+    assert_same_table(read_plan(plan), table(tasks))
@@ -0,0 +1,106 @@
+import networkx
+import numpy as np
+import pytest
+
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.model.task_data import TaskTable
+from pert_model_cal.core.pert_calculator import PERT
+from pert_model_cal.core.resource_scheduler import PRIORITIES
+
+RESOURCES = {"crane": 2, "crew": 5, "van": 3}
+# the van is not limited
+CAPACITIES = {"crane": 2, "crew": 6}
+
+
+def build(tasks: list[dict]) -> PERT:
+    pert = PERT(TaskTable.from_task_inputs([[TaskInput(**t) for t in tasks]]))
+    pert.calculate_pert()
+    return pert
+
+
+def usage(table: TaskTable, start: np.ndarray, time: float) -> np.ndarray:
+    running = (start <= time) & (time < start + table.estimate)
+    return table.demand[running].sum(axis=0)
+
+
+def reference_sgs(pert: PERT, capacities: dict, priority: str) -> np.ndarray:
+    """
+    Serial SGS over a networkx DiGraph: the eligible task of smallest
+    priority goes first, at the first finish time from its ready time on
+    at which it fits
+    """
+    table = pert.table
+    graph = networkx.DiGraph()
+    graph.add_nodes_from(range(len(table)))
+    src, dst = table.graph.edges()
+    graph.add_edges_from(zip(src.tolist(), dst.tolist()))
+    key = getattr(table, priority)
+    limited = [r for r, name in enumerate(table.resource_names) if name in capacities]
+    capacity = np.array([capacities[table.resource_names[r]] for r in limited])
+    demand, duration = table.demand[:, limited], table.estimate
+
+    start = np.full(len(table), np.nan)
+    while np.isnan(start).any():
+        j = min(
+            (
+                v
+                for v in graph
+                if np.isnan(start[v])
+                and all(not np.isnan(start[u]) for u in graph.predecessors(v))
+            ),
+            key=lambda v: (key[v], v),
+        )
+        ready = max(
+            (start[u] + duration[u] for u in graph.predecessors(j)), default=0.0
+        )
+        done = ~np.isnan(start)
+        finishes = start[done] + duration[done]
+        for t in sorted({ready, *finishes[finishes > ready].tolist()}):
+            end = t + duration[j]
+            checks = [t, *start[done][(start[done] > t) & (start[done] < end)]]
+            if all(
+                (
+                    demand[done & (start <= c) & (c < start + duration)].sum(axis=0)
+                    + demand[j]
+                    <= capacity + 1e-9
+                ).all()
+                for c in checks
+            ):
+                start[j] = t
+                break
+    return start
+
+
+@pytest.mark.parametrize("priority", PRIORITIES)
+@pytest.mark.parametrize("seed", range(4))
+def test_schedule_is_feasible_and_matches_reference(random_tasks, priority, seed):
+    pert = build(random_tasks(seed, 40, resources=RESOURCES))
+    schedule = pert.schedule_resources(CAPACITIES, priority)
+    table = pert.table
+    start, finish = table.scheduled_start, table.scheduled_finish
+
+    np.testing.assert_array_equal(start, reference_sgs(pert, CAPACITIES, priority))
+    assert (start >= table.earliest_start - 1e-9).all()
+    src, dst = table.graph.edges()
+    assert (start[dst] >= finish[src] - 1e-9).all()
+    limited = [table.resource_names.index(name) for name in CAPACITIES]
+    capacity = np.array(list(CAPACITIES.values()))
+    for t in start:
+        assert (usage(table, start, t)[limited] <= capacity + 1e-9).all()
+    assert schedule.duration == pytest.approx(finish.max())
+    assert schedule.delay == pytest.approx(finish.max() - pert.expected_time)
+
+
+def test_ample_capacity_keeps_the_cpm_schedule(random_tasks):
+    pert = build(random_tasks(0, 60, resources=RESOURCES))
+    schedule = pert.schedule_resources({name: 100 for name in RESOURCES})
+    np.testing.assert_array_equal(pert.table.scheduled_start, pert.table.earliest_start)
+    assert schedule.delay == 0
+
+
+def test_demand_above_capacity(random_tasks):
+    pert = build(random_tasks(0, 30, resources=RESOURCES))
+    with pytest.raises(ValueError, match="units of 'crew', the capacity is 0.5"):
+        pert.schedule_resources({"crew": 0.5})
+    with pytest.raises(ValueError, match="must be a positive number"):
+        pert.schedule_resources({"crew": 0})
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+from pert_model_cal.interface.result_cache import ResultCache
+
+
+@pytest.fixture
+def results(tmp_path):
+    results = tmp_path / "results"
+    return results, ResultCache(results, max_memory_entries=2, max_disk_entries=3)
+
+
+def artifacts(directory, config_name: str, content: str = "x"):
+    for suffix in ResultCache.ARTIFACTS:
+        (directory / f"{config_name}_{suffix}").write_text(f"{suffix} {content}")
+
+
+def test_key_ignores_formatting_and_number_types(tmp_path, results):
+    _, cache = results
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    task = {"label": "A", "optimistic_estimate": 1, "predecessors": []}
+    a.write_text(json.dumps([task]))
+    b.write_text(json.dumps([{**task, "optimistic_estimate": 1.0}], indent=2))
+    assert cache.key(a, None) == cache.key(b, None)
+    assert cache.key(a, None) != cache.key(a, 10)
+    assert cache.key(a, None, renderer="svg") != cache.key(a, None, renderer="png")
+
+
+def test_memory_lru_and_disk_fallback(tmp_path, results):
+    _, cache = results
+    artifacts(tmp_path, "config")
+    for key in ("k1", "k2", "k3"):
+        cache.put(key, {"key": key}, "config", tmp_path)
+    assert list(cache._memory) == ["k2", "k3"]
+
+    # k1 left memory but not the disk
+    assert cache.get("k1") == {"key": "k1"}
+    assert (cache.memory_hits, cache.disk_hits) == (0, 1)
+    assert list(cache._memory) == ["k3", "k1"]
+    assert cache.get("k3") == {"key": "k3"}
+    assert cache.memory_hits == 1
+
+    # a new process only has the disk
+    cold = ResultCache(cache.directory)
+    assert cold.get("k2") == {"key": "k2"}
+    assert cold.disk_hits == 1
+    assert cold.get("missing") is None and cold.misses == 1
+
+
+def test_disk_eviction_least_recently_used(tmp_path, results):
+    directory, cache = results
+    artifacts(tmp_path, "config")
+    for i, key in enumerate(("k1", "k2", "k3")):
+        cache.put(key, {}, "config", tmp_path)
+        os.utime(directory / key / "meta.json", (i, i))
+    # a hit makes k1 recent again, k2 is now the oldest
+    cache.get("k1")
+    cache.put("k4", {}, "config", tmp_path)
+    assert sorted(p.name for p in directory.iterdir()) == ["k1", "k3", "k4"]
+    assert cache.evictions == 1
+    assert cache.get("k2") is None
+
+
+def test_incomplete_entry_is_a_miss(tmp_path, results):
+    directory, cache = results
+    artifacts(tmp_path, "config")
+    cache.put("k1", {}, "config", tmp_path)
+    (directory / "k1" / ResultCache.ARTIFACTS[0]).unlink()
+    assert cache.get("k1") is None
+    assert "k1" not in cache._memory
+
+
+def test_artifacts_are_hard_links_and_detach_unlinks_them(tmp_path, results):
+    directory, cache = results
+    artifacts(tmp_path, "config", "first")
+    cache.put("k1", {}, "config", tmp_path)
+    entry = directory / "k1"
+    for suffix in ResultCache.ARTIFACTS:
+        assert os.path.samefile(tmp_path / f"config_{suffix}", entry / suffix)
+
+    # regenerating must not write through the links into the cache entry
+    (tmp_path / "config_tables.xlsx").write_text("derived")
+    cache.detach("config", tmp_path)
+    assert not any(tmp_path.glob("config_*"))
+    artifacts(tmp_path, "config", "second")
+    for suffix in ResultCache.ARTIFACTS:
+        assert (entry / suffix).read_text() == f"{suffix} first"
+
+    cache.materialize("k1", "other", tmp_path)
+    for suffix in ResultCache.ARTIFACTS:
+        assert os.path.samefile(tmp_path / f"other_{suffix}", entry / suffix)
+
+
+def test_configure_evicts(tmp_path, results):
+    directory, cache = results
+    artifacts(tmp_path, "config")
+    for key in ("k1", "k2", "k3"):
+        cache.put(key, {}, "config", tmp_path)
+    cache.configure(max_memory_entries=1, max_disk_entries=1)
+    assert len(cache._memory) == 1
+    assert len(list(directory.iterdir())) == 1
+    assert cache.stats()["evictions"] == 2
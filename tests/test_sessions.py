@@ -0,0 +1,52 @@
+import threading
+import time
+
+from pert_model_cal.interface.sessions import PERTSessions
+
+
+def config(upload, random_tasks, seed: int):
+    from pert_model_cal.interface.webui.routes.calculate import RESULT_DIR
+
+    name = upload(random_tasks(seed, 10))
+    return name, RESULT_DIR / f"{name}.json"
+
+
+def test_sessions_are_bounded_and_locks_dropped(upload, random_tasks):
+    sessions = PERTSessions(max_sessions=2)
+    configs = [config(upload, random_tasks, seed) for seed in range(3)]
+    for name, path in configs:
+        with sessions.session(name, path) as pert:
+            assert len(pert.table) == 10
+        assert sessions._locks == {} and not sessions._users
+    assert list(sessions._sessions) == [name for name, _ in configs[1:]]
+
+    name, path = configs[2]
+    with sessions.session(name, path) as pert:
+        pass
+    with sessions.session(name, path) as again:
+        assert again is pert
+    sessions.discard(name)
+    with sessions.session(name, path) as again:
+        assert again is not pert
+
+
+def test_one_thread_at_a_time(upload, random_tasks):
+    sessions = PERTSessions()
+    name, path = config(upload, random_tasks, 0)
+    inside = []
+    overlap = []
+
+    def use():
+        with sessions.session(name, path):
+            inside.append(1)
+            overlap.append(len(inside))
+            time.sleep(0.01)
+            inside.pop()
+
+    threads = [threading.Thread(target=use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlap == [1, 1, 1, 1]
+    assert sessions._locks == {}
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.model.task_data import TaskTable
+from pert_model_cal.core.pert_calculator import PERT
+
+
+def build(tasks: list[dict]) -> PERT:
+    pert = PERT(TaskTable.from_task_inputs([[TaskInput(**t) for t in tasks]]))
+    pert.calculate_pert()
+    return pert
+
+
+def test_fixed_durations_give_the_cpm_schedule(random_tasks, reference_schedule):
+    tasks = random_tasks(3, 150)
+    for task in tasks:
+        task["optimistic_estimate"] = task["pessimistic_estimate"] = task[
+            "most_likely_estimate"
+        ]
+    pert = build(tasks)
+    result = pert.simulate(500, seed=0, chunk_size=64, workers=1)
+    end = max(finish for _, finish, _, _ in reference_schedule(tasks).values())
+    assert result.mean_duration == pytest.approx(end)
+    assert result.std_duration == pytest.approx(0, abs=1e-9)
+    table = pert.table
+    assert [result.criticality_index[label] for label in table.labels] == [
+        float(flag) for flag in table.critical
+    ]
+
+
+def test_same_result_on_any_number_of_workers(random_tasks):
+    pert = build(random_tasks(1, 100))
+    serial = pert.simulate(3000, seed=5, chunk_size=700, workers=1, time=200)
+    pooled = pert.simulate(3000, seed=5, chunk_size=700, workers=2, time=200)
+    assert pooled == serial
+    assert pert.simulate(3000, seed=6, chunk_size=700, workers=1) != serial
+
+
+def test_spread_and_criticality(random_tasks):
+    pert = build(random_tasks(2, 100))
+    result = pert.simulate(4000, seed=1)
+    values = list(result.percentiles.values())
+    assert values == sorted(values)
+    # the sampled mean is near the PERT estimate, above it on merges
+    assert result.mean_duration >= pert.expected_time * 0.97
+    criticality = np.array(list(result.criticality_index.values()))
+    assert ((0 <= criticality) & (criticality <= 1)).all()
+    # every sample has at least one critical chain
+    assert criticality.max() > 0
+    with pytest.raises(ValueError, match="n_samples must be positive"):
+        pert.simulate(0)
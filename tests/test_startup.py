@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+# only imported by the commands and options that use them
+HEAVY = ("fastapi", "uvicorn", "networkx", "matplotlib", "pandas", "openpyxl")
+
+PROBE = """
+import json, sys
+sys.path.insert(0, {repo!r})
+{code}
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+
+def loaded_modules(code: str, cwd: Path) -> list[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(repo=str(REPO), code=code, heavy=HEAVY)],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_cli_import_is_light(tmp_path):
+    code = "import main\nimport pert_model_cal.interface.cli.cli_handler"
+    assert loaded_modules(code, tmp_path) == []
+
+
+@pytest.mark.parametrize("options", [[], ["--probability", "30"]])
+def test_plain_calculate_is_light(tmp_path, options):
+    (tmp_path / "tasks.json").write_text((REPO / "example.json").read_text())
+    arguments = ["tasks.json", *options]
+    code = f"import main\nmain.calculate({arguments!r}, standalone_mode=False)"
+    assert loaded_modules(code, tmp_path) == []
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+
+import pytest
+
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.database import ConfigStore
+
+TASKS = [
+    TaskInput(
+        label="A",
+        name=None,
+        optimistic_estimate=1,
+        most_likely_estimate=2,
+        pessimistic_estimate=3,
+        resources={"crane": 1},
+    ),
+    TaskInput(
+        label="B",
+        name=None,
+        optimistic_estimate=2,
+        most_likely_estimate=3,
+        pessimistic_estimate=7,
+        predecessors=["A"],
+    ),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ConfigStore(tmp_path / "pert.db")
+
+
+def test_wal_mode(store):
+    with sqlite3.connect(store.db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_add_config_keeps_task_rows(store):
+    name = store.add_config(100, [TASKS[:1], TASKS[1:]], "tasks.json")
+    assert name.startswith("config_100_")
+    tasks = list(store.iter_tasks(name))
+    assert [t["label"] for t in tasks] == ["A", "B"]
+    assert tasks[0]["resources"] == {"crane": 1}
+    assert tasks[1]["predecessors"] == ["A"]
+    configs, total = store.list_configs()
+    assert total == 1
+    assert configs[0]["task_count"] == 2
+    assert configs[0]["filename"] == "tasks.json"
+
+
+def test_add_config_rolls_back_on_error(store):
+    def batches():
+        yield TASKS
+        raise ValueError("cycle")
+
+    with pytest.raises(ValueError):
+        store.add_config(100, batches())
+    assert store.list_configs() == ([], 0)
+    with sqlite3.connect(store.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+
+
+def test_updating_task(store):
+    name = store.add_config(100, [TASKS])
+    with store.updating_task(
+        name, "B", {"pessimistic_estimate": 9, "predecessors": []}
+    ):
+        pass
+    b = list(store.iter_tasks(name))[1]
+    assert b["pessimistic_estimate"] == 9
+    assert b["predecessors"] == []
+
+    with pytest.raises(OSError):
+        with store.updating_task(name, "B", {"optimistic_estimate": 0}):
+            raise OSError("disk full")
+    assert list(store.iter_tasks(name))[1]["optimistic_estimate"] == 2
+
+
+def test_same_second_uploads_get_distinct_names(store):
+    names = {store.add_config(100, [TASKS]) for _ in range(3)}
+    assert len(names) == 3
+
+
+def test_list_configs_filters_and_pages(store):
+    for timestamp in (100, 200, 300):
+        store.add_config(timestamp, [TASKS])
+    configs, total = store.list_configs(since=150, limit=1)
+    assert total == 2
+    assert [c["timestamp"] for c in configs] == [300]
+    configs, total = store.list_configs(since=150, offset=1, descending=False)
+    assert [c["timestamp"] for c in configs] == [300]
+    configs, total = store.list_configs(name="_200_")
+    assert total == 1
+
+
+def test_legacy_index_import(tmp_path):
+    legacy = tmp_path / "config_info.json"
+    legacy.write_text(
+        json.dumps(
+            [
+                {"name": "config_1", "timestamp": 1},
+                {"name": "config_2", "timestamp": 2},
+            ]
+        )
+    )
+    store = ConfigStore(tmp_path / "pert.db", legacy_index=legacy)
+    configs, total = store.list_configs()
+    assert total == 2
+    assert [c["name"] for c in configs] == ["config_2", "config_1"]
+
+    # only once, into an empty store
+    legacy.write_text(json.dumps([{"name": "config_3", "timestamp": 3}]))
+    ConfigStore(tmp_path / "pert.db", legacy_index=legacy)
+    assert store.list_configs()[1] == 2
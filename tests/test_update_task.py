@@ -0,0 +1,148 @@
+import random
+
+import numpy as np
+import pytest
+
+from pert_model_cal.core import cpm_engine
+from pert_model_cal.core.cpm_engine import CPMEngine, CSRGraph, CycleError
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.model.task_data import TaskTable
+from pert_model_cal.core.pert_calculator import PERT
+
+COLUMNS = ("earliest_start", "earliest_finish", "latest_start", "latest_finish")
+
+
+def build(tasks: list[dict]) -> PERT:
+    pert = PERT(TaskTable.from_task_inputs([[TaskInput(**t) for t in tasks]]))
+    pert.calculate_pert()
+    return pert
+
+
+def random_edit(rng: random.Random, tasks: list[dict]) -> tuple[int, dict]:
+    n = len(tasks)
+    i = rng.randrange(n)
+    edit = {}
+    if rng.random() < 0.7:
+        labels = {f"T{rng.randrange(n)}" for _ in range(rng.randint(0, 3))}
+        edit["predecessors"] = sorted(labels - {tasks[i]["label"]})
+    if not edit or rng.random() < 0.5:
+        edit["pessimistic"] = tasks[i]["pessimistic_estimate"] + rng.choice([0, 1, 20])
+    return i, edit
+
+
+@pytest.fixture(params=["local", "fallback"])
+def share(request, monkeypatch):
+    # local_budget is then 0, every cone falls back to the full passes
+    if request.param == "fallback":
+        monkeypatch.setattr(cpm_engine, "LOCAL_UPDATE_SHARE", 0)
+        monkeypatch.setattr(cpm_engine, "SCALAR_WIDTH", 0)
+        assert cpm_engine.local_budget(10**6) == 0
+    return request.param
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("n", [12, 150])
+def test_updates_match_a_fresh_schedule(
+    random_tasks, reference_schedule, share, seed, n
+):
+    rng = random.Random(seed)
+    tasks = random_tasks(seed, n)
+    pert = build(tasks)
+    position = {t["label"]: p for p, t in enumerate(tasks)}
+    updates = 0
+    for _ in range(8):
+        i, edit = random_edit(rng, tasks)
+        label = tasks[i]["label"]
+        before = {c: getattr(pert.table, c).copy() for c in COLUMNS}
+        try:
+            changed = pert.update_task(label, **edit)
+        except ValueError as error:
+            assert str(error).startswith("Cycle")
+            for c in COLUMNS:
+                np.testing.assert_array_equal(getattr(pert.table, c), before[c])
+            continue
+        updates += 1
+        task = dict(tasks[i])
+        if "predecessors" in edit:
+            task["predecessors"] = edit["predecessors"]
+        if "pessimistic" in edit:
+            task["pessimistic_estimate"] = edit["pessimistic"]
+        tasks[i] = task
+
+        expected = reference_schedule(tasks)
+        table = pert.table
+        for k, c in enumerate(COLUMNS):
+            np.testing.assert_allclose(
+                getattr(table, c),
+                [expected[label][k] for label in table.labels],
+                atol=1e-9,
+            )
+        fresh = build(tasks)
+        assert pert.critical_path == fresh.critical_path
+        assert pert.expected_time == pytest.approx(fresh.expected_time)
+        moved = {
+            j
+            for c in COLUMNS[:3]
+            for j in np.flatnonzero(before[c] != getattr(table, c)).tolist()
+        }
+        assert moved <= {table.index[label] for label in changed}
+        assert set(table.index) == set(position)
+    assert updates
+
+
+def test_cycle_leaves_the_plan_unchanged(random_tasks):
+    tasks = random_tasks(0, 50)
+    pert = build(tasks)
+    graph = pert.engine.graph
+    source = next(i for i in range(graph.n) if graph.successors(i).size)
+    successor = pert.table.labels[int(graph.successors(source)[0])]
+    label = pert.table.labels[source]
+    before = {c: getattr(pert.table, c).copy() for c in COLUMNS}
+    with pytest.raises(ValueError, match="^Cycle"):
+        pert.update_task(label, predecessors=[successor], pessimistic=99)
+    assert pert.engine.graph is graph
+    assert pert.table.pessimistic[source] != 99
+    for c in COLUMNS:
+        np.testing.assert_array_equal(getattr(pert.table, c), before[c])
+
+
+def test_unknown_predecessor(random_tasks):
+    pert = build(random_tasks(0, 5))
+    with pytest.raises(ValueError, match="'X' in task 'T0' does not exist"):
+        pert.update_task("T0", predecessors=["X"])
+    with pytest.raises(ValueError, match="'X' does not exist"):
+        pert.update_task("X", pessimistic=1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_updated_engine_matches_a_rebuild(share, seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.choice([2, 20, 200]))
+    # random edges from lower to higher ids, then shuffled ids
+    src = rng.integers(0, n - 1, 2 * n)
+    dst = src + 1 + rng.integers(0, 4, src.size) % (n - 1 - src)
+    ids = rng.permutation(n)
+    engine = CPMEngine(CSRGraph.from_edges(n, ids[src], ids[dst]))
+    for _ in range(5):
+        task = int(rng.integers(n))
+        graph = engine.graph.with_predecessors(task, rng.integers(0, n, 3))
+        try:
+            rebuilt = CPMEngine(graph)
+        except CycleError:
+            with pytest.raises(CycleError) as error:
+                engine.updated(graph, task)
+            for cycle in error.value.cycles:
+                for u, v in zip(cycle, cycle[1:]):
+                    assert u in graph.predecessors(v)
+            continue
+        engine = engine.updated(graph, task)
+        np.testing.assert_array_equal(engine.topo.order, rebuilt.topo.order)
+        np.testing.assert_array_equal(engine.topo.level, rebuilt.topo.level)
+        durations = rng.uniform(1, 5, (n, 3))
+        for d in (durations[:, 0], durations):
+            es, ef = engine.forward(d)
+            np.testing.assert_array_equal(ef, rebuilt.forward(d)[1])
+            end = ef.max(axis=0)
+            np.testing.assert_array_equal(
+                engine.backward(d, end)[0], rebuilt.backward(d, end)[0]
+            )
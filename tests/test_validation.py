@@ -0,0 +1,107 @@
+import random
+import subprocess
+import sys
+
+import networkx
+import pytest
+
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.validation import MAX_ERRORS, validate_inputs
+
+
+def inputs(tasks: list[dict]) -> list[TaskInput]:
+    return [TaskInput(**t) for t in tasks]
+
+
+def with_back_edges(tasks: list[dict], seed: int, count: int) -> list[dict]:
+    """
+    Add count random predecessors, many of them close a cycle and some
+    repeat a predecessor the task already has
+    """
+    rng = random.Random(seed)
+    tasks = [dict(t) for t in tasks]
+    for _ in range(count):
+        task, predecessor = rng.sample(tasks, 2)
+        task["predecessors"] = task["predecessors"] + [predecessor["label"]]
+    return tasks
+
+
+def networkx_components(tasks: list[dict]) -> list[set[str]]:
+    graph = networkx.DiGraph()
+    graph.add_nodes_from(t["label"] for t in tasks)
+    for t in tasks:
+        graph.add_edges_from((p, t["label"]) for p in t["predecessors"])
+    return [c for c in networkx.strongly_connected_components(graph) if len(c) > 1]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_dags_are_valid(random_tasks, seed):
+    report = validate_inputs([inputs(random_tasks(seed, 100))])
+    assert report.ok and report.message() == ""
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("count", [1, 3, 10])
+def test_one_cycle_per_cyclic_component(random_tasks, seed, count):
+    tasks = with_back_edges(random_tasks(seed, 40), seed, count)
+    predecessors = {t["label"]: t["predecessors"] for t in tasks}
+    report = validate_inputs([inputs(tasks)])
+
+    components = networkx_components(tasks)
+    assert len(report.cycles) == len(components)
+    assert report.ok == (not components)
+    for cycle in report.cycles:
+        assert cycle[0] == cycle[-1]
+        for u, v in zip(cycle, cycle[1:]):
+            assert u in predecessors[v]
+        assert sum(set(cycle) <= component for component in components) == 1
+
+
+def test_every_duplicate_and_missing_predecessor(random_tasks):
+    tasks = random_tasks(0, 30)
+    tasks[3] = {**tasks[3], "predecessors": ["X", "Y"]}
+    tasks[7] = {**tasks[7], "predecessors": tasks[7]["predecessors"] + ["X"]}
+    tasks += [tasks[0], tasks[1], tasks[0]]
+    report = validate_inputs([inputs(tasks[:20]), inputs(tasks[20:])])
+    assert report.duplicates == [tasks[0]["label"], tasks[1]["label"]]
+    assert report.missing == [
+        (tasks[3]["label"], "X"),
+        (tasks[3]["label"], "Y"),
+        (tasks[7]["label"], "X"),
+    ]
+    assert not report.ok and not report.cycles
+
+
+def test_message_is_cut_short(random_tasks):
+    tasks = random_tasks(0, 40)
+    for task in tasks:
+        task["predecessors"] = task["predecessors"] + ["X"]
+    message = validate_inputs([inputs(tasks)]).message()
+    assert message.count("does not exist") == MAX_ERRORS
+    assert message.endswith(f"; and {40 - MAX_ERRORS} more")
+
+
+def test_predecessor_listed_twice_in_a_cycle():
+    # scipy's strong components looped forever on the duplicate edge
+    code = """
+from pert_model_cal.core.model.input import TaskInput
+from pert_model_cal.core.validation import validate_inputs
+
+def task(label, predecessors):
+    return TaskInput(
+        label=label,
+        name=None,
+        optimistic_estimate=1,
+        most_likely_estimate=2,
+        pessimistic_estimate=3,
+        predecessors=predecessors,
+    )
+
+report = validate_inputs([[task("A", ["B"]), task("B", ["A", "A"]), task("C", [])]])
+print(report.message())
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() in ("Cycle A -> B -> A", "Cycle B -> A -> B")
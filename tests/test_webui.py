@@ -0,0 +1,137 @@
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+EXAMPLE = json.loads(
+    (Path(__file__).resolve().parent.parent / "example.json").read_text()
+)
+
+
+def test_patch_updates_the_task_row(webapp, upload):
+    from pert_model_cal.interface.webui.routes.calculate import STORE
+
+    name = upload(EXAMPLE)
+    response = webapp.patch(
+        f"/api/configs/{name}/tasks/C",
+        json={"pessimistic_estimate": 24, "predecessors": ["A"]},
+    )
+    assert response.status_code == 200, response.text
+    row = {t["label"]: t for t in STORE.iter_tasks(name)}["C"]
+    assert row["pessimistic_estimate"] == 24
+    assert row["predecessors"] == ["A"]
+
+    # a cycle is refused before the file or the row change
+    response = webapp.patch(
+        f"/api/configs/{name}/tasks/A", json={"predecessors": ["N"]}
+    )
+    assert response.status_code == 400
+    row = {t["label"]: t for t in STORE.iter_tasks(name)}["A"]
+    assert row["predecessors"] == []
+
+
+def calculate(webapp, name: str, **options) -> dict:
+    response = webapp.post("/api/calculate", json={"config_name": name, **options})
+    assert response.status_code == 200, response.text
+    job = response.json()
+    deadline = time.monotonic() + 60
+    while job["status"] not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = webapp.get(f"/api/jobs/{job['job_id']}").json()
+    assert job["status"] == "done", job
+    return job
+
+
+def test_repeated_calculation_is_a_cache_hit(webapp, upload, random_tasks):
+    from pert_model_cal.interface.webui.routes.calculate import (
+        RESULT_CACHE,
+        RESULT_DIR,
+        STORE,
+    )
+
+    name = upload(random_tasks(7, 25))
+    first = calculate(webapp, name)
+    assert not first["cached"]
+    assert first["result"]["expected_duration"] > 0
+    # stored by the completion hook before the job was reported done
+    with sqlite3.connect(STORE.db_path) as conn:
+        rows = conn.execute(
+            "SELECT expected_duration FROM results JOIN configs "
+            "ON configs.id = results.config_id WHERE name = ?",
+            (name,),
+        ).fetchall()
+    assert rows == [(first["result"]["expected_duration"],)]
+
+    hits = RESULT_CACHE.memory_hits
+    again = calculate(webapp, name)
+    assert again["cached"] and again["result"] == first["result"]
+    assert RESULT_CACHE.memory_hits == hits + 1
+
+    # the same tasks under another name reuse the artifacts
+    other = upload(random_tasks(7, 25))
+    assert calculate(webapp, other)["cached"]
+    for link in again["artifacts"].values():
+        response = webapp.get(link.replace(name, other))
+        assert response.status_code == 200, link
+    assert os.path.samefile(
+        RESULT_DIR / f"{name}_tasks.csv", RESULT_DIR / f"{other}_tasks.csv"
+    )
+
+    # other options are another result
+    assert not calculate(webapp, name, expected_time=40)["cached"]
+
+
+def test_artifact_downloads_are_conditional(webapp, upload, random_tasks):
+    name = upload(random_tasks(8, 20))
+    link = calculate(webapp, name)["artifacts"]["tasks_csv"]
+
+    plain = webapp.get(link, headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert "Content-Encoding" not in plain.headers
+    tag = plain.headers["ETag"]
+    response = webapp.get(link, headers={"If-None-Match": tag})
+    assert response.status_code == 304 and not response.content
+    response = webapp.get(
+        link, headers={"If-Modified-Since": plain.headers["Last-Modified"]}
+    )
+    assert response.status_code == 304
+
+    gzipped = webapp.get(link, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] != tag
+    assert gzipped.text == plain.text
+    # any representation of the unchanged file matches
+    response = webapp.get(
+        link,
+        headers={
+            "Accept-Encoding": "identity",
+            "If-None-Match": gzipped.headers["ETag"],
+        },
+    )
+    assert response.status_code == 304
+
+    # a new calculation changes the file and the tag
+    calculate(webapp, name, expected_time=30)
+    response = webapp.get(link, headers={"If-None-Match": tag})
+    assert response.status_code == 200 and response.headers["ETag"] != tag
+
+
+def test_list_details_sections(webapp, upload, random_tasks):
+    tasks = random_tasks(9, 5)
+    name = upload(tasks)
+    response = webapp.post(
+        "/api/list_details", json={"config_name": name, "sections": ["json"]}
+    )
+    assert response.status_code == 200
+    details = response.json()
+    assert list(details) == ["json_content"]
+    assert [t["label"] for t in json.loads(details["json_content"])] == [
+        t["label"] for t in tasks
+    ]
+    details = webapp.post("/api/list_details", json={"config_name": name}).json()
+    assert details["csv_tasks_content"] is None
+    response = webapp.post(
+        "/api/list_details", json={"config_name": name, "sections": ["pdf"]}
+    )
+    assert response.status_code == 400